@@ -0,0 +1,111 @@
+"""Per-chunk cost of handing browser audio to a session's event loop.
+
+Compares the old handle_audio_data path (copy the memoryview with tobytes(),
+hasattr check, run_coroutine_threadsafe(queue.put(...)) per chunk) with
+AudioIngest.push (no copy, call_soon_threadsafe(queue.put_nowait, ...)).
+Chunks are pushed from several threads into sessions whose loops run in
+their own threads, like Socket.IO handlers feeding voice agents.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_audio_ingest --sessions 50 --chunks 2000
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+
+from common.audio_ingest import AudioIngest, as_buffer
+
+
+class Session:
+    def __init__(self):
+        self.queue = asyncio.Queue()
+        self.ingest = AudioIngest(self.queue)
+        self.received = 0
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        while not self.loop.is_running():
+            time.sleep(0.001)
+        self.ingest.attach(self.loop)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._drain())
+
+    async def _drain(self):
+        while True:
+            chunk = await self.queue.get()
+            if chunk is None:
+                return
+            self.received += 1
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, None)
+        self.thread.join()
+        self.loop.close()
+
+
+def push_old(session, audio_buffer):
+    audio_bytes = audio_buffer.tobytes()
+    if not hasattr(push_old, "first_log_done"):
+        pass
+    asyncio.run_coroutine_threadsafe(session.queue.put(audio_bytes), session.loop)
+
+
+def push_new(session, audio_buffer):
+    session.ingest.push(as_buffer(audio_buffer))
+
+
+def run(push, sessions, chunks, threads, chunk_bytes):
+    packet = memoryview(bytes(chunk_bytes))
+    live = [Session() for _ in range(sessions)]
+
+    def producer(first):
+        for _ in range(chunks):
+            for session in live[first::threads]:
+                push(session, packet)
+
+    workers = [threading.Thread(target=producer, args=(t,)) for t in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    pushed = time.perf_counter() - start
+    for session in live:
+        session.close()
+    drained = time.perf_counter() - start
+    total = sessions * chunks
+    assert sum(s.received for s in live) == total
+    return pushed / total * 1e6, drained / total * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument(
+        "--chunk-bytes", type=int, default=8192, help="4096 Int16 samples"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{args.sessions} sessions x {args.chunks} chunks of {args.chunk_bytes} bytes "
+        f"from {args.threads} threads"
+    )
+    for name, push in (("old", push_old), ("new", push_new)):
+        per_push, per_chunk = run(
+            push, args.sessions, args.chunks, args.threads, args.chunk_bytes
+        )
+        print(
+            f"{name}: {per_push:6.2f} us per push, "
+            f"{per_chunk:6.2f} us per chunk until delivered"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Book appointments from hundreds of concurrent sessions and check the ids.
+
+Sessions are spread over several threads, each running its own event loop
+like client.py does, and every session books a few appointments at once.
+The old write path (id from len() read before an await, then append) is run
+the same way for comparison.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_bookings --sessions 400 --wal
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.synthetic import build_dataset
+from common.data_store import MockDataStore
+from common.write_ahead_log import WriteAheadLog
+
+
+def fields(customer):
+    return {
+        "customer_id": customer["id"],
+        "customer_name": customer["name"],
+        "date": "2030-01-01T10:00:00",
+        "service": "Review",
+        "status": "Scheduled",
+    }
+
+
+async def book_new(store, customer, count):
+    for _ in range(count):
+        await asyncio.sleep(0)  # the customer lookup await in schedule_appointment
+        store.book_appointment(fields(customer))
+
+
+async def book_old(store, customer, count):
+    for _ in range(count):
+        appointment_id = f"APT{len(store.appointments):04d}"
+        await asyncio.sleep(0)
+        store.add_appointment({"id": appointment_id, **fields(customer)})
+
+
+def run(store, book, sessions, threads, per_session):
+    def loop_thread(first):
+        async def main():
+            await asyncio.gather(
+                *(
+                    book(store, store.customers[i % len(store.customers)], per_session)
+                    for i in range(first, sessions, threads)
+                )
+            )
+
+        asyncio.run(main())
+
+    before = len(store.appointments)
+    workers = [
+        threading.Thread(target=loop_thread, args=(t,)) for t in range(threads)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    new = store.appointments[before:]
+    duplicates = len(new) - len({a["id"] for a in new})
+    return len(new), duplicates, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=400)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--per-session", type=int, default=5)
+    parser.add_argument("--wal", action="store_true", help="log bookings to a WAL")
+    parser.add_argument("--fsync", action="store_true", help="fsync every WAL append")
+    args = parser.parse_args()
+
+    print("old write path:")
+    store = MockDataStore(build_dataset(1000, appointments=500))
+    booked, duplicates, elapsed = run(
+        store, book_old, args.sessions, args.threads, args.per_session
+    )
+    print(f"  {booked} bookings in {elapsed * 1e3:.1f}ms, {duplicates} duplicate ids")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print("new write path" + (" with WAL" if args.wal else "") + ":")
+        store = MockDataStore(build_dataset(1000, appointments=500))
+        if args.wal:
+            store.attach_log(
+                WriteAheadLog(os.path.join(tmp, "appointments.wal"), args.fsync)
+            )
+        booked, duplicates, elapsed = run(
+            store, book_new, args.sessions, args.threads, args.per_session
+        )
+        print(f"  {booked} bookings in {elapsed * 1e3:.1f}ms "
+              f"({elapsed / booked * 1e6:.1f}us each), {duplicates} duplicate ids")
+
+        if args.wal:
+            store.log.close()
+            start = time.perf_counter()
+            replayed = MockDataStore(build_dataset(1000, appointments=500))
+            replayed.attach_log(WriteAheadLog(os.path.join(tmp, "appointments.wal")))
+            print(f"  replayed {len(replayed.appointments) - 500} bookings in "
+                  f"{(time.perf_counter() - start) * 1e3:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Cost the call recorder adds to the real-time audio paths.
+
+Two threads play the caller and the agent, handing a 20 ms linear16 chunk
+every 20 ms to the audio path, for --seconds. Each handoff is timed three
+ways: no recording, CallRecorder (common/call_recorder.py), and writing the
+chunk to a wave file right there, as a recorder without its own thread
+would. Timings of paced calls include waking from sleep, so the cost of
+a record_uplink call alone is also measured in a tight loop. Also reports
+the recorded length and any dropped bytes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_call_recorder --seconds 10
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+import wave
+
+from common.call_recorder import CallRecorder
+
+SAMPLE_RATE = 16000
+CHUNK = bytes(SAMPLE_RATE // 50 * 2)  # 20 ms
+CHUNK_SECONDS = 0.02
+
+
+def paced(handoff, seconds, times):
+    """Call handoff(chunk) every 20 ms, appending how long each call took."""
+    start = time.perf_counter()
+    for i in range(int(seconds / CHUNK_SECONDS)):
+        delay = start + i * CHUNK_SECONDS - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        before = time.perf_counter()
+        handoff(memoryview(CHUNK))
+        times.append(time.perf_counter() - before)
+
+
+def run(uplink, downlink, seconds):
+    times = []
+    threads = [
+        threading.Thread(target=paced, args=(handoff, seconds, times))
+        for handoff in (uplink, downlink)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    times.sort()
+    return times
+
+
+def report(label, times):
+    print(
+        f"{label:>13}: p50 {times[len(times) // 2] * 1e6:7.1f}us  "
+        f"p99 {times[int(len(times) * 0.99)] * 1e6:7.1f}us  max {times[-1] * 1e6:8.1f}us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        report("no recording", run(lambda chunk: None, lambda chunk: None, args.seconds))
+
+        recorder = CallRecorder(os.path.join(directory, "call.wav"), SAMPLE_RATE).start()
+        report("CallRecorder", run(recorder.record_uplink, recorder.record_downlink, args.seconds))
+        recorder.close()
+
+        spare = CallRecorder(
+            os.path.join(directory, "spare.wav"), SAMPLE_RATE, max_buffered_seconds=1e9
+        ).start()
+        chunk = memoryview(CHUNK)
+        calls = 10_000
+        start = time.perf_counter()
+        for _ in range(calls):
+            spare.record_uplink(chunk)
+        print(f"record_uplink alone: {(time.perf_counter() - start) / calls * 1e9:.0f}ns per chunk")
+        spare.close()
+
+        lock = threading.Lock()
+        with wave.open(os.path.join(directory, "inline.wav"), "wb") as inline:
+            inline.setnchannels(1)
+            inline.setsampwidth(2)
+            inline.setframerate(SAMPLE_RATE)
+
+            def write(chunk):
+                with lock:
+                    inline.writeframes(chunk)
+
+            report("inline write", run(write, write, args.seconds))
+
+    stats = recorder.stats()
+    print(f"Recorded {stats['seconds']}s of stereo audio, dropped {stats['dropped_bytes']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Fuzzy customer lookup latency (common/customer_matcher.py) at scale.
+
+Builds the CustomerMatcher over --customers synthetic customers, then times
+lookups of identifiers as speech-to-text might return them: spoken digits,
+a missing or wrong digit, a spelled-out or misspelled email, a misspelled
+name. Also reports how often the right customer is the top candidate and
+how often it is among the returned candidates. Synthetic phone numbers and
+emails are numbered consecutively, so one wrong digit often lands on another
+customer's identifier; the heard name then decides.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_customer_matcher --customers 1000000
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.synthetic import build_dataset
+from common.customer_matcher import CustomerMatcher
+
+WORDS = "zero one two three four five six seven eight nine".split()
+
+
+def spoken(digits):
+    return " ".join(WORDS[int(d)] for d in digits)
+
+
+def drop_digit(digits, rng):
+    i = rng.randrange(len(digits))
+    return digits[:i] + digits[i + 1 :]
+
+
+def wrong_digit(digits, rng):
+    i = rng.randrange(len(digits))
+    return digits[:i] + str((int(digits[i]) + 1) % 10) + digits[i + 1 :]
+
+
+def misspell(text, rng):
+    i = rng.randrange(len(text) - 1)
+    return text[:i] + text[i + 1] + text[i] + text[i + 2 :]
+
+
+def queries(customer, rng):
+    phone = customer["phone"][2:]
+    local, domain = customer["email"].split("@")
+    return {
+        "spoken phone": {"phone": spoken(phone)},
+        "missing digit": {"phone": spoken(drop_digit(phone, rng))},
+        "wrong digit": {"phone": wrong_digit(phone, rng)},
+        "spelled email": {"email": f"{local} at {domain.replace('.', ' dot ')}"},
+        "misheard email": {"email": misspell(local, rng) + "@" + domain},
+        "name + phone": {"name": customer["name"], "phone": wrong_digit(phone, rng)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--customers", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    customers = build_dataset(args.customers)["customers"]
+    start = time.perf_counter()
+    matcher = CustomerMatcher(customers)
+    print(f"Indexed {args.customers} customers in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(0)
+    sample = [rng.choice(customers) for _ in range(args.queries)]
+    cases = [queries(customer, rng) for customer in sample]
+    for label in cases[0]:
+        times = []
+        hits = found = 0
+        for customer, case in zip(sample, cases):
+            start = time.perf_counter()
+            ranked = matcher.match(**case[label])
+            times.append(time.perf_counter() - start)
+            ids = [c["id"] for _, c, _ in ranked]
+            hits += ids[:1] == [customer["id"]]
+            found += customer["id"] in ids
+        times.sort()
+        print(
+            f"{label:>15}: p50 {times[len(times) // 2] * 1e6:7.1f}us  "
+            f"p99 {times[int(len(times) * 0.99)] * 1e6:7.1f}us  "
+            f"top-1 {hits / len(sample):6.1%}  in candidates {found / len(sample):6.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Time to first agent audio after an order lookup, full list vs paged.
+
+For accounts with more and more orders, get_orders is answered two ways:
+the old full list (every row in one FunctionCallResponse) and the paged
+response (common/pagination.py). The function call, JSON encoding and a
+round trip over a local websocket are measured. A stand-in agent parses the
+response and answers with a first audio chunk. The LLM and TTS can't run
+here, so their share is modeled: the response is prefilled at
+--prefill-tokens-per-second (about 4 bytes per token) before a fixed
+--tts-first-audio delay.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_function_responses --sizes 10 100 1000 5000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import websockets
+
+from benchmarks.synthetic import build_dataset
+from common import business_logic
+from common.agent_functions import FUNCTION_MAP
+from common.data_store import MockDataStore
+
+BYTES_PER_TOKEN = 4
+AUDIO_CHUNK = bytes(640)  # 20 ms of 16 kHz linear16
+
+
+def add_orders(data, customer, count, rng):
+    base = len(data["orders"])
+    for i in range(count):
+        data["orders"].append(
+            {
+                "id": f"ORD{base + i:06d}",
+                "customer_id": customer["id"],
+                "customer_name": customer["name"],
+                "date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(9, 16):02d}:00:00",
+                "items": rng.randint(1, 5),
+                "total": round(rng.uniform(10.0, 500.0), 2),
+                "status": rng.choice(["Pending", "Shipped", "Delivered", "Cancelled"]),
+            }
+        )
+
+
+async def agent(ws):
+    # Stand-in for the agent: read the function response, start speaking
+    async for message in ws:
+        json.loads(json.loads(message)["content"])
+        await ws.send(AUDIO_CHUNK)
+
+
+async def full_list(customer_id):
+    return await business_logic.get_customer_orders(customer_id)
+
+
+async def paged(customer_id):
+    return await FUNCTION_MAP["get_orders"]({"customer_id": customer_id})
+
+
+async def measure(ws, respond, customer_id, repeat):
+    """Median seconds from function call to first audio, and the frame size."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = await respond(customer_id)
+        frame = json.dumps(
+            {
+                "type": "FunctionCallResponse",
+                "id": "call",
+                "name": "get_orders",
+                "content": json.dumps(result),
+            }
+        )
+        await ws.send(frame)
+        await ws.recv()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2], len(frame)
+
+
+async def run(args):
+    rng = random.Random(0)
+    data = build_dataset(len(args.sizes))
+    for customer, size in zip(data["customers"], args.sizes):
+        add_orders(data, customer, size, rng)
+    business_logic._data_store = MockDataStore(data)
+
+    async with websockets.serve(agent, "127.0.0.1", 0, max_size=None) as server:
+        port = server.sockets[0].getsockname()[1]
+        async with websockets.connect(f"ws://127.0.0.1:{port}", max_size=None) as ws:
+            print(f"{'orders':>7} {'mode':>5} {'frame':>10} {'measured':>10} {'est. first audio':>17}")
+            for customer, size in zip(data["customers"], args.sizes):
+                for name, respond in (("full", full_list), ("paged", paged)):
+                    seconds, frame = await measure(ws, respond, customer["id"], args.repeat)
+                    prefill = frame / BYTES_PER_TOKEN / args.prefill_tokens_per_second
+                    estimate = seconds + prefill + args.tts_first_audio
+                    print(
+                        f"{size:7d} {name:>5} {frame / 1024:8.1f}KB {seconds * 1e3:8.2f}ms "
+                        f"{estimate * 1e3:15.0f}ms"
+                    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--prefill-tokens-per-second", type=float, default=5000)
+    parser.add_argument("--tts-first-audio", type=float, default=0.2, help="seconds")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
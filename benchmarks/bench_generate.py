@@ -0,0 +1,55 @@
+"""Time vectorized bulk generation of the mock dataset.
+
+Run from the repository root (requires the "columnar" extra, which installs numpy):
+
+    python -m benchmarks.bench_generate --orders 10000000
+"""
+
+import argparse
+import pathlib
+import shutil
+import tempfile
+import time
+
+from common.bulk_generator import generate_columnar, generate_to_disk, load_columnar
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--customers", type=int, default=1_000_000)
+    parser.add_argument("--appointments", type=int, default=1_000_000)
+    parser.add_argument("--orders", type=int, default=10_000_000)
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    sizes = {
+        "customers": args.customers,
+        "appointments": args.appointments,
+        "orders": args.orders,
+    }
+
+    start = time.perf_counter()
+    store = generate_columnar(sizes, args.seed, args.chunk_size)
+    print(f"in memory: {time.perf_counter() - start:.2f}s, "
+          f"{store.nbytes / 1e6:.0f} MB")
+
+    directory = pathlib.Path(tempfile.mkdtemp()) / "dataset"
+    try:
+        start = time.perf_counter()
+        generate_to_disk(directory, sizes, args.seed, args.chunk_size)
+        print(f"streamed to disk: {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        mapped = load_columnar(directory)
+        print(f"mmap load: {(time.perf_counter() - start) * 1e3:.1f}ms")
+
+        customer_id = f"CUST{args.customers // 2:04d}"
+        assert mapped.get_orders(customer_id) == store.get_orders(customer_id)
+        print(f"{customer_id}: {len(mapped.get_orders(customer_id))} orders, "
+              "identical across runs with the same seed")
+    finally:
+        shutil.rmtree(directory.parent, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Agent-turn latency when the backend has a long tail.
+
+Installs a latency profile (common/latency.py) for the "database" delay and
+runs concurrent sessions through the business_logic functions. Each turn
+looks up a customer, then fetches their orders and appointments. Three ways
+of running a turn are compared:
+
+- sequential: the three calls one after another, as the agent makes them
+- parallel: orders and appointments fetched concurrently, so a turn waits
+  for the slower of two draws
+- cached: the customer lookup is cached per session, since callers keep
+  asking about the same account
+
+For each, the p50/p99 turn time is reported along with the share of turns
+slow enough to need a filler message ("Let me look that up...").
+
+Run from the repository root:
+
+    python -m benchmarks.bench_latency --profile heavy_tail --seed 1
+    python -m benchmarks.bench_latency --profile lognormal \\
+        --override get_customer_orders=heavy_tail
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from benchmarks.synthetic import build_dataset
+from common import business_logic, latency
+from common.data_store import MockDataStore
+
+# Presets for the "database" delay; heavy_tail has a p99 about 10x its p50
+PROFILES = {
+    "constant": {"distribution": "constant", "value": 0.02},
+    "normal": {"distribution": "normal", "mean": 0.02, "stddev": 0.005},
+    "lognormal": {"distribution": "lognormal", "median": 0.02, "sigma": 0.5},
+    "heavy_tail": {
+        "distribution": "heavy_tail",
+        "median": 0.02,
+        "sigma": 0.25,
+        "spike_probability": 0.03,
+        "spike": 0.1,
+        "alpha": 1.5,
+    },
+}
+
+
+def quantile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def turn(customer_id, mode, cache):
+    if mode == "cached" and customer_id in cache:
+        customer = cache[customer_id]
+    else:
+        customer = await business_logic.get_customer(customer_id=customer_id)
+        cache[customer_id] = customer
+    if mode == "parallel":
+        await asyncio.gather(
+            business_logic.get_customer_orders(customer["id"]),
+            business_logic.get_customer_appointments(customer["id"]),
+        )
+    else:
+        await business_logic.get_customer_orders(customer["id"])
+        await business_logic.get_customer_appointments(customer["id"])
+
+
+async def session(customer_ids, turns, mode, rng, times):
+    cache = {}
+    for _ in range(turns):
+        start = time.perf_counter()
+        await turn(rng.choice(customer_ids), mode, cache)
+        times.append(time.perf_counter() - start)
+
+
+async def run(customers, sessions, turns, mode, seed):
+    rng = random.Random(seed)
+    times = []
+    await asyncio.gather(
+        *(
+            # Each caller asks about a handful of accounts
+            session(
+                [f"CUST{rng.randrange(customers):04d}" for _ in range(3)],
+                turns,
+                mode,
+                random.Random(rng.random()),
+                times,
+            )
+            for _ in range(sessions)
+        )
+    )
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="heavy_tail")
+    parser.add_argument(
+        "--override",
+        action="append",
+        default=[],
+        metavar="FUNCTION=PROFILE",
+        help="use another preset for one business_logic function",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--customers", type=int, default=10_000)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument(
+        "--filler-after", type=float, default=0.5, help="seconds before a filler message"
+    )
+    args = parser.parse_args()
+
+    profiles = {"database": PROFILES[args.profile]}
+    for override in args.override:
+        function, preset = override.split("=", 1)
+        profiles[f"database:{function}"] = PROFILES[preset]
+
+    latency.configure(profiles, args.seed)
+    draws = [latency.sample_delay("database") for _ in range(100_000)]
+    p50, p99 = quantile(draws, 0.5), quantile(draws, 0.99)
+    print(
+        f"profile {args.profile}: p50 {p50 * 1e3:.1f}ms  p99 {p99 * 1e3:.1f}ms  "
+        f"(p99/p50 {p99 / p50:.1f}x)"
+    )
+
+    n = args.customers
+    business_logic._data_store = MockDataStore(
+        build_dataset(n, appointments=n // 2, orders=n * 2)
+    )
+    for mode in ("sequential", "parallel", "cached"):
+        # Same delay sequence for every mode when seeded
+        latency.configure(profiles, args.seed)
+        times = asyncio.run(run(n, args.sessions, args.turns, mode, args.seed))
+        filler = sum(t > args.filler_after for t in times) / len(times)
+        print(
+            f"{mode:>10}: turn p50 {quantile(times, 0.5) * 1e3:7.1f}ms  "
+            f"p99 {quantile(times, 0.99) * 1e3:7.1f}ms  "
+            f"needs filler {filler * 100:5.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
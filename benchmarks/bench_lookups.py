@@ -0,0 +1,71 @@
+"""Compare indexed customer/appointment/order lookups with the old linear scans.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_lookups --max-size 1000000
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.synthetic import build_dataset
+from common.data_store import MockDataStore
+
+
+def time_per_call(func, keys):
+    start = time.perf_counter()
+    for key in keys:
+        func(key)
+    return (time.perf_counter() - start) / len(keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-size", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    parser.add_argument(
+        "--max-scan-size",
+        type=int,
+        default=100_000,
+        help="Largest size for which the linear-scan baseline is timed",
+    )
+    args = parser.parse_args()
+
+    size = 1_000
+    print(f"{'customers':>10} {'build':>8} {'by_id':>9} {'by_phone':>9} "
+          f"{'by_email':>9} {'orders':>9} {'scan':>11}")
+    while size <= args.max_size:
+        data = build_dataset(size, appointments=size // 2, orders=size * 2)
+        start = time.perf_counter()
+        store = MockDataStore(data)
+        build = time.perf_counter() - start
+
+        rng = random.Random(1)
+        picks = [rng.randrange(size) for _ in range(args.lookups)]
+        ids = [f"CUST{i:04d}" for i in picks]
+        phones = [f"+1555{i:07d}" for i in picks]
+        emails = [f"customer{i}@example.com" for i in picks]
+
+        by_id = time_per_call(store.get_customer_by_id, ids)
+        by_phone = time_per_call(store.get_customer_by_phone, phones)
+        by_email = time_per_call(store.get_customer_by_email, emails)
+        orders = time_per_call(store.get_orders, ids)
+
+        scan = "-"
+        if size <= args.max_scan_size:
+            customers = data["customers"]
+            scan_keys = phones[:20]
+            per_call = time_per_call(
+                lambda p: next((c for c in customers if c["phone"] == p), None),
+                scan_keys,
+            )
+            scan = f"{per_call * 1e6:9.1f}us"
+
+        print(f"{size:>10} {build:7.2f}s {by_id * 1e6:7.2f}us {by_phone * 1e6:7.2f}us "
+              f"{by_email * 1e6:7.2f}us {orders * 1e6:7.2f}us {scan:>11}")
+        size *= 10
+
+
+if __name__ == "__main__":
+    main()
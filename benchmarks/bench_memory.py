@@ -0,0 +1,63 @@
+"""Compare memory per row of the dict-based and columnar data stores.
+
+Run from the repository root (requires numpy):
+
+    python -m benchmarks.bench_memory --customers 100000
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from benchmarks.synthetic import build_dataset
+from common.columnar_store import ColumnarDataStore
+from common.data_store import MockDataStore
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--customers", type=int, default=100_000)
+    args = parser.parse_args()
+    n = args.customers
+
+    data, rows_bytes, _ = measure(
+        lambda: build_dataset(n, appointments=n // 2, orders=n * 2)
+    )
+    rows = n + n // 2 + n * 2
+    store, index_bytes, _ = measure(lambda: MockDataStore(data))
+    columnar, columnar_bytes, elapsed = measure(
+        lambda: ColumnarDataStore.from_rows(data)
+    )
+
+    print(f"rows: {rows}")
+    print(f"dict rows:        {rows_bytes / rows:8.1f} B/row")
+    print(f"dict + indexes:   {(rows_bytes + index_bytes) / rows:8.1f} B/row")
+    print(f"columnar:         {columnar_bytes / rows:8.1f} B/row "
+          f"(built in {elapsed:.2f}s)")
+
+    rng = random.Random(1)
+    ids = [f"CUST{rng.randrange(n):04d}" for _ in range(10_000)]
+    for name, s in (("dict", store), ("columnar", columnar)):
+        start = time.perf_counter()
+        for customer_id in ids:
+            s.get_customer_by_id(customer_id)
+            s.get_orders(customer_id)
+        per_call = (time.perf_counter() - start) / len(ids)
+        print(f"{name:>8} customer + orders lookup: {per_call * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
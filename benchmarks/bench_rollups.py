@@ -0,0 +1,72 @@
+"""Answer "how much have I spent" from the rollups vs by scanning the orders.
+
+Times order_summary() for one customer and for all orders against a full
+scan of MOCK_DATA["orders"], and the cost the rollups add to each write.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_rollups --orders 1000000
+"""
+
+import argparse
+import time
+from collections import Counter
+
+from benchmarks.synthetic import build_dataset
+from common.data_store import MockDataStore
+
+
+def scan(orders, customer_id):
+    count = cents = 0
+    statuses = Counter()
+    for order in orders:
+        if customer_id is None or order["customer_id"] == customer_id:
+            count += 1
+            cents += round(order["total"] * 100)
+            statuses[order["status"]] += 1
+    return count, cents, statuses
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--customers", type=int, default=10_000)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--writes", type=int, default=100_000)
+    args = parser.parse_args()
+
+    data = build_dataset(args.customers, orders=args.orders)
+    start = time.perf_counter()
+    store = MockDataStore(data)
+    print(f"Indexed {args.orders} orders (with rollups) in {time.perf_counter() - start:.2f}s")
+
+    for label, customer_id in (("one customer", "CUST0001"), ("all orders", None)):
+        scan_s = timed(lambda: scan(data["orders"], customer_id), 3)
+        rollup_s = timed(lambda: store.order_summary(customer_id), 1000)
+        print(
+            f"{label:>13}: scan {scan_s * 1e3:9.2f}ms  rollup {rollup_s * 1e6:7.1f}us  "
+            f"x{scan_s / rollup_s:,.0f}"
+        )
+
+    orders = [
+        {**data["orders"][i % args.orders], "id": f"NEW{i:07d}"} for i in range(args.writes)
+    ]
+    start = time.perf_counter()
+    for order in orders:
+        store.add_order(order)
+    add_s = (time.perf_counter() - start) / args.writes
+    start = time.perf_counter()
+    for order in orders:
+        store.update_order_status(order["id"], "Delivered")
+    update_s = (time.perf_counter() - start) / args.writes
+    print(f"add_order {add_s * 1e6:.1f}us  update_order_status {update_s * 1e6:.1f}us per write")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Throughput of serve.py with 1 to N worker processes.
+
+For each worker count the runner is started on free ports. Load-generator
+processes then drive Socket.IO sessions over HTTP long-polling through the
+sticky front end. Each session is a handshake, a connect, --events small
+events and a close. Every request after the handshake must land on the worker
+that issued the session id, so any non-200 answer counts as a routing error.
+Each load thread keeps --connections keep-alive connections and sends a
+session's requests on them in turn, as a browser does, so one connection
+carries requests for sessions on different workers.
+
+Run from the repository root (needs the full requirements, including PyAudio):
+
+    python -m benchmarks.bench_scaling --max-workers 4 --seconds 10
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+SOCKETIO_PATH = "/socket.io/?EIO=4&transport=polling"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/industries")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+def send(conns, method, path, body=None):
+    """Send a request on the next connection in turn; returns (status, body)."""
+    conn = conns[0]
+    conns.rotate(-1)
+    headers = {"Content-Type": "text/plain"} if body is not None else {}
+    conn.request(method, path, body=body, headers=headers)
+    response = conn.getresponse()
+    return response.status, response.read()
+
+
+def run_session(conns, events):
+    """One Socket.IO session; returns (requests, errors)."""
+    status, body = send(conns, "GET", SOCKETIO_PATH)
+    if status != 200:
+        return 1, 1
+    sid = json.loads(body[1:])["sid"]
+    path = f"{SOCKETIO_PATH}&sid={sid}"
+    packets = [b"40"] + [b'42["bench_ping",{}]'] * events + [b"1"]
+    requests, errors = 1, 0
+    for i, packet in enumerate(packets):
+        status, _ = send(conns, "POST", path, packet)
+        requests += 1
+        errors += status != 200
+        if i == 0:
+            # Collect the connect acknowledgement
+            status, _ = send(conns, "GET", path)
+            requests += 1
+            errors += status != 200
+    return requests, errors
+
+
+def connect(port, connections):
+    return deque(
+        http.client.HTTPConnection("127.0.0.1", port, timeout=30) for _ in range(connections)
+    )
+
+
+def load_process(port, threads, connections, seconds, events, results):
+    totals = [0, 0, 0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def worker():
+        conns = connect(port, connections)
+        sessions = requests = errors = 0
+        while time.monotonic() < deadline:
+            try:
+                r, e = run_session(conns, events)
+            except (OSError, http.client.HTTPException, ValueError):
+                for conn in conns:
+                    conn.close()
+                conns = connect(port, connections)
+                r, e = 0, 1
+            sessions += 1
+            requests += r
+            errors += e
+        for conn in conns:
+            conn.close()
+        with lock:
+            totals[0] += sessions
+            totals[1] += requests
+            totals[2] += errors
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    results.put(totals)
+
+
+def measure(workers, clients, threads, connections, seconds, events):
+    port, base_port, queue_port = free_port(), free_port(), free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "serve.py",
+            "--workers", str(workers),
+            "--port", str(port),
+            "--worker-base-port", str(base_port),
+            "--message-queue", f"local://127.0.0.1:{queue_port}",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        for index in range(workers):
+            wait_for(base_port + index)
+        results = multiprocessing.Queue()
+        loaders = [
+            multiprocessing.Process(
+                target=load_process, args=(port, threads, connections, seconds, events, results)
+            )
+            for _ in range(clients)
+        ]
+        for loader in loaders:
+            loader.start()
+        totals = [0, 0, 0]
+        for _ in loaders:
+            for i, value in enumerate(results.get()):
+                totals[i] += value
+        for loader in loaders:
+            loader.join()
+        return totals
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--clients", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--connections", type=int, default=3)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--events", type=int, default=10)
+    args = parser.parse_args()
+
+    counts = sorted({1, *(2**i for i in range(1, 8) if 2**i < args.max_workers), args.max_workers})
+    baseline = None
+    print(
+        f"{args.clients} load processes x {args.threads} threads x {args.connections} "
+        f"connections, {args.seconds}s per run"
+    )
+    for workers in counts:
+        sessions, requests, errors = measure(
+            workers, args.clients, args.threads, args.connections, args.seconds, args.events
+        )
+        rate = requests / args.seconds
+        baseline = baseline or rate
+        print(
+            f"{workers:3d} workers: {sessions / args.seconds:8.1f} sessions/s "
+            f"{rate:9.1f} requests/s  x{rate / baseline:4.2f}  routing errors: {errors}"
+        )
+
+
+if __name__ == "__main__":
+    main()
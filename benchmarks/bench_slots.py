@@ -0,0 +1,80 @@
+"""Compare slot availability via the SlotIndex with the old per-hour linear scan.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_slots --appointments 100000 --days 30
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from common.slot_index import SlotIndex, to_seconds
+
+
+def linear_scan(appointments, start, end):
+    slots = []
+    current = start
+    while current <= end:
+        if 9 <= current.hour < 17:
+            slot_time = current.isoformat()
+            if not any(a["date"] == slot_time for a in appointments):
+                slots.append(slot_time)
+        current += timedelta(hours=1)
+    return slots
+
+
+def indexed(index, start, end):
+    candidates = []
+    current = start
+    while current <= end:
+        if 9 <= current.hour < 17:
+            s = to_seconds(current)
+            candidates.append((s, s + 3600))
+        current += timedelta(hours=1)
+    return index.free_slots(candidates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--appointments", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--skip-baseline", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    horizon = args.days * 4 * 24
+    appointments = [
+        {
+            "date": (start + timedelta(minutes=15 * rng.randrange(horizon))).isoformat(),
+            "duration_minutes": rng.choice([15, 30, 60, 90]),
+            "status": "Scheduled",
+        }
+        for _ in range(args.appointments)
+    ]
+    end = start + timedelta(days=args.days)
+
+    t = time.perf_counter()
+    index = SlotIndex()
+    index.add_appointments(appointments)
+    print(f"index build ({args.appointments} appointments): "
+          f"{time.perf_counter() - t:.3f}s")
+
+    t = time.perf_counter()
+    runs = 20
+    for _ in range(runs):
+        indexed(index, start, end)
+    print(f"indexed query ({args.days} days): "
+          f"{(time.perf_counter() - t) / runs * 1e3:.2f}ms")
+
+    if not args.skip_baseline:
+        t = time.perf_counter()
+        linear_scan(appointments, start, end)
+        print(f"linear scan ({args.days} days): "
+              f"{(time.perf_counter() - t) * 1e3:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
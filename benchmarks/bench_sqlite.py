@@ -0,0 +1,102 @@
+"""Compare the SQLite backend with the in-memory store under concurrent sessions.
+
+Each simulated session looks up a customer and then fetches their orders and
+appointments, like a caller asking about their account. A ticker task
+measures how late the event loop wakes it up, which shows whether store
+calls block the loop.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_sqlite --customers 100000 --sessions 200
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.synthetic import build_dataset
+from common.data_store import MockDataStore, call_store
+from common.sqlite_store import SQLiteDataStore
+
+
+async def session(store, customer_ids, rounds, latencies):
+    for customer_id in customer_ids[:rounds]:
+        start = time.perf_counter()
+        customer = await call_store(store.get_customer_by_id, customer_id)
+        await call_store(store.get_orders, customer["id"])
+        await call_store(store.get_appointments, customer["id"])
+        latencies.append(time.perf_counter() - start)
+
+
+async def ticker(stop, lags, interval=0.001):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run(store, customers, sessions, rounds):
+    rng = random.Random(0)
+    latencies, lags = [], []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            session(
+                store,
+                [f"CUST{rng.randrange(customers):04d}" for _ in range(rounds)],
+                rounds,
+                latencies,
+            )
+            for _ in range(sessions)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    latencies.sort()
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[int(len(latencies) * 0.99)],
+        "max_loop_lag": max(lags) if lags else 0.0,
+        "mean_loop_lag": statistics.mean(lags) if lags else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+
+    n = args.customers
+    data = build_dataset(n, appointments=n // 2, orders=n * 2)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_store = SQLiteDataStore(os.path.join(tmp, "bench.db"), args.pool_size)
+        start = time.perf_counter()
+        sqlite_store.load_rows(data)
+        print(f"sqlite load: {time.perf_counter() - start:.1f}s")
+
+        stores = {"memory": MockDataStore(data), "sqlite": sqlite_store}
+        for name, store in stores.items():
+            result = asyncio.run(run(store, n, args.sessions, args.rounds))
+            print(
+                f"{name:>7}: {result['throughput']:8.0f} lookups/s  "
+                f"p50 {result['p50'] * 1e3:6.2f}ms  p99 {result['p99'] * 1e3:6.2f}ms  "
+                f"loop lag mean {result['mean_loop_lag'] * 1e3:.2f}ms "
+                f"max {result['max_loop_lag'] * 1e3:.2f}ms"
+            )
+        sqlite_store.close()
+
+
+if __name__ == "__main__":
+    main()
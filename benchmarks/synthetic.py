@@ -0,0 +1,57 @@
+"""Fast synthetic datasets for the benchmarks, shaped like generate_mock_data()."""
+
+import random
+from datetime import datetime, timedelta
+
+
+def build_dataset(customers, appointments=0, orders=0, seed=0):
+    """Build a mock dataset without the per-row datetime work of the real generator."""
+    rng = random.Random(seed)
+    base = datetime.now().replace(minute=0, second=0, microsecond=0)
+    dates = [(base + timedelta(hours=h)).isoformat() for h in range(24 * 7)]
+
+    customer_rows = [
+        {
+            "id": f"CUST{i:04d}",
+            "name": f"Customer {i}",
+            "phone": f"+1555{i:07d}",
+            "email": f"customer{i}@example.com",
+            "joined_date": dates[i % len(dates)],
+        }
+        for i in range(customers)
+    ]
+    appointment_rows = []
+    for i in range(appointments):
+        customer = customer_rows[rng.randrange(customers)]
+        appointment_rows.append(
+            {
+                "id": f"APT{i:04d}",
+                "customer_id": customer["id"],
+                "customer_name": customer["name"],
+                "date": rng.choice(dates),
+                "service": rng.choice(
+                    ["Consultation", "Follow-up", "Review", "Planning"]
+                ),
+                "status": rng.choice(["Scheduled", "Completed", "Cancelled"]),
+            }
+        )
+    order_rows = []
+    for i in range(orders):
+        customer = customer_rows[rng.randrange(customers)]
+        order_rows.append(
+            {
+                "id": f"ORD{i:04d}",
+                "customer_id": customer["id"],
+                "customer_name": customer["name"],
+                "date": rng.choice(dates),
+                "items": rng.randint(1, 5),
+                "total": round(rng.uniform(10.0, 500.0), 2),
+                "status": rng.choice(["Pending", "Shipped", "Delivered", "Cancelled"]),
+            }
+        )
+    return {
+        "customers": customer_rows,
+        "appointments": appointment_rows,
+        "orders": order_rows,
+        "sample_data": [],
+    }
@@ -1,29 +1,51 @@
 from dotenv import load_dotenv
 load_dotenv()
-from flask import Flask, render_template, jsonify
+from flask import Flask, Response, render_template, jsonify, request
 from flask_socketio import SocketIO
 import pyaudio
 import asyncio
 import websockets
 import os
 import json
+import hmac
 import threading
 import janus
 import queue
 import sys
 import time
-import requests
+import uuid
 from datetime import datetime
-from common.agent_functions import FUNCTION_MAP
+from common.agent_functions import FUNCTION_MAP, registry
 from common.agent_templates import AgentTemplates, AGENT_AUDIO_SAMPLE_RATE
 import logging
-from common.business_logic import MOCK_DATA
+from common.business_logic import (
+    FAREWELL_MESSAGES,
+    FILLER_MESSAGES,
+    MOCK_DATA,
+    get_customer_matcher,
+)
 from common.log_formatter import CustomFormatter
+from common.config import AUDIO_CLIPS, CALL_RECORDING, TRANSCRIPTS, TTS_MODELS_CACHE
+from common.tts_models import TTSModelCache
+from common.audio_devices import audio_context
+from common.audio_clips import ClipCache, ClipRecorder, chunks
+from common.call_recorder import CallRecorder
+from common import static_assets
+from common.audio_frames import FrameFormatError, FrameStream, negotiate
+from common.audio_ingest import AudioIngest, as_buffer
+from common.message_queue import socketio_options
+from common.sticky_proxy import tag_session_ids
+from common.transcripts import transcript_store
 
 
 # Configure Flask and SocketIO
 app = Flask(__name__, static_folder="./static", static_url_path="/")
-socketio = SocketIO(app)
+# serve.py runs several copies of this app; emits then go through the message queue
+socketio = SocketIO(app, **socketio_options(os.environ.get("SOCKETIO_MESSAGE_QUEUE")))
+if os.environ.get("VOICE_AGENT_WORKER"):
+    tag_session_ids(socketio, int(os.environ["VOICE_AGENT_WORKER"]))
+assets = static_assets.init_app(app)
+index_page = static_assets.PageCache()
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -37,6 +59,17 @@ logger.addHandler(console_handler)
 # Remove any existing handlers from the root logger to avoid duplicate messages
 logging.getLogger().handlers = []
 
+tts_models = TTSModelCache(
+    lambda: os.environ.get("DEEPGRAM_API_KEY"),
+    ttl=TTS_MODELS_CACHE["ttl"],
+    timeout=(TTS_MODELS_CACHE["connect_timeout"], TTS_MODELS_CACHE["read_timeout"]),
+)
+
+# Recorded greeting and filler lines, shared by all sessions of this process
+audio_clips = ClipCache(AUDIO_CLIPS["directory"])
+# Recent turns of live sessions, and the full transcripts on disk
+transcripts = transcript_store()
+
 
 class VoiceAgent:
     def __init__(
@@ -45,22 +78,30 @@ class VoiceAgent:
         voiceModel="aura-2-thalia-en",
         voiceName="",
         browser_audio=False,
+        sid=None,
     ):
+        self.sid = sid  # Socket.IO session of the browser driving this agent
         self.mic_audio_queue = asyncio.Queue()
+        self.ingest = AudioIngest(self.mic_audio_queue)
         self.speaker = None
         self.ws = None
         self.is_running = False
         self.loop = None
-        self.audio = None
         self.stream = None
         self.input_device_id = None
         self.output_device_id = None
         self.browser_audio = browser_audio  # For browser microphone input
         self.browser_output = browser_audio  # Use same setting for browser output
+        self.capture = None  # FrameStream when the browser sends binary audio frames
         self.agent_templates = AgentTemplates(industry, voiceModel, voiceName)
+        self.greeting_clip = None  # Recorded greeting, played locally instead of by the agent
+        self.session_started = None
+        self.transcript = None
+        self.recorder = None  # CallRecorder when CALL_RECORDING is enabled
 
     def set_loop(self, loop):
         self.loop = loop
+        self.ingest.attach(loop)
 
     async def setup(self):
         dg_api_key = os.environ.get("DEEPGRAM_API_KEY")
@@ -68,49 +109,52 @@ class VoiceAgent:
             logger.error("DEEPGRAM_API_KEY env var not present")
             return False
 
-        settings = self.agent_templates.settings
+        # Pre-serialized and shared between sessions with the same configuration
+        settings_payload = self.agent_templates.settings_payload
+        if AUDIO_CLIPS["enable"]:
+            templates = self.agent_templates
+            self.greeting_clip = audio_clips.get(
+                templates.first_message, templates.voiceModel, templates.agent_audio_sample_rate
+            )
+            if self.greeting_clip is not None:
+                # The receiver plays the greeting, so the agent must not say it too
+                settings_payload = templates.settings_payload_without_greeting
+            if AUDIO_CLIPS["prefetch"]:
+                audio_clips.prefetch(
+                    FILLER_MESSAGES.values(),
+                    templates.voiceModel,
+                    templates.agent_audio_sample_rate,
+                    dg_api_key,
+                )
 
+        self.session_started = time.time()
         try:
             self.ws = await websockets.connect(
                 self.agent_templates.voice_agent_url,
                 extra_headers={"Authorization": f"Token {dg_api_key}"},
             )
-            await self.ws.send(json.dumps(settings))
+            await self.ws.send(settings_payload)
             return True
         except Exception as e:
             logger.error(f"Failed to connect to Deepgram: {e}")
             return False
 
     def audio_callback(self, input_data, frame_count, time_info, status_flag):
-        if self.is_running and self.loop and not self.loop.is_closed():
-            try:
-                future = asyncio.run_coroutine_threadsafe(
-                    self.mic_audio_queue.put(input_data), self.loop
-                )
-                future.result(timeout=1)  # Add timeout to prevent blocking
-            except Exception as e:
-                logger.error(f"Error in audio callback: {e}")
+        if self.is_running:
+            # Runs on the PortAudio thread, so never wait on the event loop here
+            self.ingest.push(input_data)
         return (input_data, pyaudio.paContinue)
 
     async def start_microphone(self):
         try:
-            self.audio = pyaudio.PyAudio()
-
-            # List available input devices
-            info = self.audio.get_host_api_info_by_index(0)
-            numdevices = info.get("deviceCount")
-            logger.info(f"Number of devices: {numdevices}")
+            # Input devices are enumerated once and cached by the shared context
+            available_devices = [d["index"] for d in audio_context.input_devices()]
+            logger.info(f"Number of input devices: {len(available_devices)}")
             logger.info(
                 f"Selected input device index from frontend: {self.input_device_id}"
             )
 
-            # Log all available input devices
-            available_devices = []
-            for i in range(0, numdevices):
-                device_info = self.audio.get_device_info_by_host_api_device_index(0, i)
-                if device_info.get("maxInputChannels") > 0:
-                    available_devices.append(i)
-
+            input_device_index = None
             # If a specific device index was provided from the frontend, use it
             if self.input_device_id and self.input_device_id.isdigit():
                 requested_index = int(self.input_device_id)
@@ -131,7 +175,7 @@ class VoiceAgent:
             if input_device_index is None:
                 raise Exception("No input device found")
 
-            self.stream = self.audio.open(
+            self.stream = audio_context.open(
                 format=pyaudio.paInt16,
                 channels=1,
                 rate=self.agent_templates.user_audio_sample_rate,
@@ -142,27 +186,42 @@ class VoiceAgent:
             )
             self.stream.start_stream()
             logger.info("Microphone started successfully")
-            return self.stream, self.audio
+            return self.stream
         except Exception as e:
             logger.error(f"Error starting microphone: {e}")
-            if self.audio:
-                self.audio.terminate()
             raise
 
+    def start_recording(self):
+        templates = self.agent_templates
+        if templates.user_audio_sample_rate != templates.agent_audio_sample_rate:
+            logger.warning("Call recording needs the same sample rate for caller and agent")
+            return
+        name = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}.{CALL_RECORDING['format']}"
+        try:
+            self.recorder = CallRecorder(
+                os.path.join(CALL_RECORDING["directory"], name),
+                templates.agent_audio_sample_rate,
+                max_buffered_seconds=CALL_RECORDING["max_buffered_seconds"],
+                flush_interval=CALL_RECORDING["flush_interval"],
+            ).start()
+            logger.info(f"Recording call to {self.recorder.path}")
+        except (OSError, RuntimeError) as e:
+            logger.error(f"Call recording not started: {e}")
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            logger.info(f"Call recording finished: {self.recorder.stats()}")
+            self.recorder = None
+
     def cleanup(self):
         """Clean up audio resources"""
         if self.stream:
             try:
-                self.stream.stop_stream()
-                self.stream.close()
+                audio_context.close(self.stream)
             except Exception as e:
                 logger.error(f"Error closing audio stream: {e}")
-
-        if self.audio:
-            try:
-                self.audio.terminate()
-            except Exception as e:
-                logger.error(f"Error terminating audio: {e}")
+            self.stream = None
 
     async def sender(self):
         try:
@@ -184,6 +243,8 @@ class VoiceAgent:
 
                     # Send the audio data to Deepgram
                     await self.ws.send(data)
+                    if self.recorder is not None:
+                        self.recorder.record_uplink(data)
 
         except Exception as e:
             logger.error(f"Error in sender: {e}")
@@ -192,14 +253,65 @@ class VoiceAgent:
 
             logger.error(traceback.format_exc())
 
+    def clip_recorder(self):
+        """Records the agent saying a cacheable line that has no clip yet."""
+        templates = self.agent_templates
+        texts = []
+        if AUDIO_CLIPS["enable"]:
+            texts = [
+                templates.first_message,
+                *FILLER_MESSAGES.values(),
+                *FAREWELL_MESSAGES.values(),
+            ]
+        return ClipRecorder(
+            audio_clips, texts, templates.voiceModel, templates.agent_audio_sample_rate
+        )
+
+    def filler_clip(self):
+        if not AUDIO_CLIPS["enable"]:
+            return None
+        return audio_clips.get(
+            FILLER_MESSAGES["lookup"],
+            self.agent_templates.voiceModel,
+            self.agent_templates.agent_audio_sample_rate,
+        )
+
+    def record_turn(self, message_json):
+        if not TRANSCRIPTS["enable"]:
+            return
+        if self.transcript is None:
+            # Text before the Welcome message; the session has no id from the agent yet
+            self.transcript = transcripts.open(uuid.uuid4().hex)
+        self.transcript.add(message_json.get("role"), message_json.get("content"))
+
+    async def play_clip(self, pcm):
+        # 100 ms chunks, so a barge-in (speaker.stop) cuts the clip off like agent audio
+        for chunk in chunks(pcm, self.agent_templates.agent_audio_bytes_per_sec // 10):
+            await self.speaker.play(chunk)
+
     async def receiver(self):
         try:
-            self.speaker = Speaker(browser_output=self.browser_output)
+            self.speaker = Speaker(
+                browser_output=self.browser_output, recorder=self.recorder, sid=self.sid
+            )
+            recorder = self.clip_recorder()
             last_user_message = None
             last_function_response_time = None
+            first_audio_pending = False
             in_function_chain = False
+            greeting_pending = True
+            filler_played = False
+            # Start of a slow function call the caller waited through in silence
+            silent_call_started = None
 
             with self.speaker:
+                if self.greeting_clip is not None:
+                    await self.play_clip(self.greeting_clip)
+                    greeting_pending = False
+                    latency = time.time() - self.session_started
+                    audio_clips.stats.record("greeting", "clip", latency)
+                    logger.info(f"Greeting played from the clip cache after {latency:.3f}s")
+
                 async for message in self.ws:
                     if isinstance(message, str):
                         logger.info(f"Server: {message}")
@@ -209,15 +321,24 @@ class VoiceAgent:
 
                         if message_type == "UserStartedSpeaking":
                             self.speaker.stop()
+                            recorder.cancel()
                         elif message_type == "ConversationText":
                             # Emit the conversation text to the client
-                            socketio.emit("conversation_update", message_json)
+                            socketio.emit("conversation_update", message_json, to=self.sid)
+                            self.record_turn(message_json)
 
                             if message_json.get("role") == "user":
                                 last_user_message = current_time
                                 in_function_chain = False
+                                filler_played = False
                             elif message_json.get("role") == "assistant":
                                 in_function_chain = False
+                                recorder.on_text(message_json.get("content"))
+
+                        elif message_type == "AgentAudioDone":
+                            cached = recorder.on_done()
+                            if cached:
+                                logger.info(f"Cached a clip of: {cached}")
 
                         elif message_type == "FunctionCalling":
                             if in_function_chain and last_function_response_time:
@@ -240,26 +361,46 @@ class VoiceAgent:
                                 )
                             function_name = functions[0].get("name")
                             function_call_id = functions[0].get("id")
-                            parameters = json.loads(functions[0].get("arguments", {}))
+                            arguments = functions[0].get("arguments") or "{}"
 
                             logger.info(f"Function call received: {function_name}")
-                            logger.info(f"Parameters: {parameters}")
+                            logger.info(f"Parameters: {arguments}")
 
                             start_time = time.time()
                             try:
+                                parameters = json.loads(arguments)
                                 func = FUNCTION_MAP.get(function_name)
                                 if not func:
                                     raise ValueError(
                                         f"Function {function_name} not found"
                                     )
 
-                                # ACTIVE - Simple function calling
-                                result = await func(parameters)
+                                # ACTIVE - Simple function calling; the arguments are
+                                # validated against the function's schema first
+                                call = asyncio.ensure_future(func(parameters))
+                                filler_clip = None if filler_played else self.filler_clip()
+                                if filler_clip is not None:
+                                    # Fill a slow lookup with the recorded filler line
+                                    done, _ = await asyncio.wait(
+                                        {call}, timeout=AUDIO_CLIPS["filler_after"]
+                                    )
+                                    if not done:
+                                        await self.play_clip(filler_clip)
+                                        filler_played = True
+                                        audio_clips.stats.record(
+                                            "filler", "clip", time.time() - start_time
+                                        )
+                                result = await call
 
                                 execution_time = time.time() - start_time
                                 logger.info(
                                     f"Function Execution Latency: {execution_time:.3f}s"
                                 )
+                                if (
+                                    execution_time >= AUDIO_CLIPS["filler_after"]
+                                    and not filler_played
+                                ):
+                                    silent_call_started = start_time
 
                                 # Send the response back
                                 response = {
@@ -268,13 +409,15 @@ class VoiceAgent:
                                     "name": function_name,
                                     "content": json.dumps(result),
                                 }
-                                await self.ws.send(json.dumps(response))
+                                content = json.dumps(response)
+                                await self.ws.send(content)
                                 logger.info(
-                                    f"Function response sent: {json.dumps(result)}"
+                                    f"Function response sent ({len(content)} bytes): {response['content']}"
                                 )
 
                                 # Update the last function response time
                                 last_function_response_time = time.time()
+                                first_audio_pending = True
 
                             except Exception as e:
                                 logger.error(f"Error executing function: {str(e)}")
@@ -288,15 +431,36 @@ class VoiceAgent:
                                 await self.ws.send(json.dumps(response))
 
                         elif message_type == "Welcome":
-                            logger.info(
-                                f"Connected with session ID: {message_json.get('session_id')}"
-                            )
+                            session_id = message_json.get("session_id")
+                            logger.info(f"Connected with session ID: {session_id}")
+                            if TRANSCRIPTS["enable"] and self.transcript is None:
+                                try:
+                                    self.transcript = transcripts.open(session_id or "")
+                                except ValueError:
+                                    self.transcript = transcripts.open(uuid.uuid4().hex)
                         elif message_type == "CloseConnection":
                             logger.info("Closing connection...")
                             await self.ws.close()
                             break
 
                     elif isinstance(message, bytes):
+                        if greeting_pending:
+                            greeting_pending = False
+                            latency = time.time() - self.session_started
+                            audio_clips.stats.record("greeting", "agent", latency)
+                            logger.info(f"Greeting audio from the agent after {latency:.3f}s")
+                        if first_audio_pending:
+                            first_audio_pending = False
+                            latency = time.time() - last_function_response_time
+                            logger.info(
+                                f"Time to first agent audio after function response: {latency:.3f}s"
+                            )
+                            if silent_call_started is not None:
+                                audio_clips.stats.record(
+                                    "filler", "agent", time.time() - silent_call_started
+                                )
+                                silent_call_started = None
+                        recorder.on_audio(message)
                         await self.speaker.play(message)
 
         except Exception as e:
@@ -307,10 +471,12 @@ class VoiceAgent:
             return
 
         self.is_running = True
+        if CALL_RECORDING["enable"]:
+            self.start_recording()
         try:
             # Only start the microphone if not using browser audio
             if not self.browser_audio:
-                stream, audio = await self.start_microphone()
+                await self.start_microphone()
 
             await asyncio.gather(
                 self.sender(),
@@ -321,12 +487,17 @@ class VoiceAgent:
         finally:
             self.is_running = False
             self.cleanup()
+            self.stop_recording()
+            if self.transcript is not None:
+                transcripts.close(self.transcript)
             if self.ws:
                 await self.ws.close()
 
 
 class Speaker:
-    def __init__(self, agent_audio_sample_rate=None, browser_output=False):
+    def __init__(
+        self, agent_audio_sample_rate=None, browser_output=False, recorder=None, sid=None
+    ):
         self._queue = None
         self._stream = None
         self._thread = None
@@ -335,10 +506,11 @@ class Speaker:
             agent_audio_sample_rate if agent_audio_sample_rate else 16000
         )
         self.browser_output = browser_output
+        self.recorder = recorder
+        self.sid = sid
 
     def __enter__(self):
-        audio = pyaudio.PyAudio()
-        self._stream = audio.open(
+        self._stream = audio_context.open(
             format=pyaudio.paInt16,
             channels=1,
             rate=self.agent_audio_sample_rate,
@@ -349,7 +521,14 @@ class Speaker:
         self._stop = threading.Event()
         self._thread = threading.Thread(
             target=_play,
-            args=(self._queue, self._stream, self._stop, self.browser_output),
+            args=(
+                self._queue,
+                self._stream,
+                self._stop,
+                self.browser_output,
+                self.recorder,
+                self.sid,
+            ),
             daemon=True,
         )
         self._thread.start()
@@ -357,7 +536,7 @@ class Speaker:
     def __exit__(self, exc_type, exc_value, traceback):
         self._stop.set()
         self._thread.join()
-        self._stream.close()
+        audio_context.close(self._stream)
         self._stream = None
         self._queue = None
         self._thread = None
@@ -375,20 +554,24 @@ class Speaker:
                     break
 
 
-def _play(audio_out, stream, stop, browser_output=False):
+def _play(audio_out, stream, stop, browser_output=False, recorder=None, sid=None):
     while not stop.is_set():
         try:
             data = audio_out.sync_q.get(True, 0.05)
             # Play audio through system speakers
             stream.write(data)
+            if recorder is not None:
+                # Only queued here; the recorder's own thread writes the file
+                recorder.record_downlink(data)
 
             # If browser output is enabled, send audio to browser via WebSocket
             if browser_output and socketio:
                 try:
-                    # Send audio data to browser clients with sample rate information
+                    # Send audio data to the session's browser with sample rate information
                     socketio.emit(
                         "audio_output",
                         {"audio": data, "sampleRate": AGENT_AUDIO_SAMPLE_RATE},
+                        to=sid,
                     )
                 except Exception as e:
                     logger.error(f"Error sending audio to browser: {e}")
@@ -458,20 +641,9 @@ async def close_websocket_with_timeout(ws, timeout=5):
 
 
 # Get available audio devices
-def get_audio_devices():
+def get_audio_devices(refresh=False):
     try:
-        audio = pyaudio.PyAudio()
-        info = audio.get_host_api_info_by_index(0)
-        numdevices = info.get("deviceCount")
-
-        input_devices = []
-        for i in range(0, numdevices):
-            device_info = audio.get_device_info_by_host_api_device_index(0, i)
-            if device_info.get("maxInputChannels") > 0:
-                input_devices.append({"index": i, "name": device_info.get("name")})
-
-        audio.terminate()
-        return input_devices
+        return audio_context.input_devices(refresh=refresh)
     except Exception as e:
         logger.error(f"Error getting audio devices: {e}")
         return []
@@ -482,13 +654,17 @@ def get_audio_devices():
 def index():
     # Get the sample data from MOCK_DATA
     sample_data = MOCK_DATA.get("sample_data", [])
-    return render_template("index.html", sample_data=sample_data)
+    # Re-render only when the sample data or a static file's version changes
+    key = (json.dumps(sample_data, sort_keys=True, default=str), assets.fingerprint())
+    return index_page.response(
+        key, lambda: render_template("index.html", sample_data=sample_data)
+    )
 
 
 @app.route("/audio-devices")
 def audio_devices():
-    # Get available audio devices
-    devices = get_audio_devices()
+    # Get available audio devices; ?refresh=1 rescans after a device change
+    devices = get_audio_devices(refresh=request.args.get("refresh") == "1")
     return {"devices": devices}
 
 
@@ -498,68 +674,70 @@ def get_industries():
     return AgentTemplates.get_available_industries()
 
 
-@app.route("/tts-models")
-def get_tts_models():
-    # Get TTS models from Deepgram API
-    try:
-        dg_api_key = os.environ.get("DEEPGRAM_API_KEY")
-        if not dg_api_key:
-            return jsonify({"error": "DEEPGRAM_API_KEY not set"}), 500
+@app.route("/function-stats")
+def function_stats():
+    # Per-function call counts, rejected calls and latency for this process
+    return registry.stats()
 
-        response = requests.get(
-            "https://api.deepgram.com/v1/models",
-            headers={"Authorization": f"Token {dg_api_key}"},
-        )
 
-        if response.status_code != 200:
-            return (
-                jsonify(
-                    {"error": f"API request failed with status {response.status_code}"}
-                ),
-                500,
-            )
+@app.route("/audio-clip-stats")
+def audio_clip_stats():
+    # Time to first audio with a cached greeting/filler clip vs waiting for the agent
+    return audio_clips.stats.summary()
+
+
+def transcripts_denied():
+    """An error response unless transcript export is enabled and the token matches."""
+    if not TRANSCRIPTS["export"]:
+        return jsonify({"error": "Not found"}), 404
+    token = os.environ.get("TRANSCRIPTS_TOKEN")
+    sent = request.headers.get("Authorization", "")
+    if not token or not hmac.compare_digest(sent.encode(), f"Bearer {token}".encode()):
+        return jsonify({"error": "Unauthorized"}), 401
+    return None
 
-        data = response.json()
-
-        # Process TTS models
-        formatted_models = []
-
-        # Check if 'tts' key exists in the response
-        if "tts" in data:
-            # Filter for only aura-2 models
-            for model in data["tts"]:
-                if model.get("architecture") == "aura-2":
-                    # Extract language from languages array if available
-                    language = "en"
-                    if model.get("languages") and len(model.get("languages")) > 0:
-                        language = model["languages"][0]
-
-                    # Extract metadata for additional information
-                    metadata = model.get("metadata", {})
-                    accent = metadata.get("accent", "")
-                    tags = ", ".join(metadata.get("tags", []))
-
-                    formatted_models.append(
-                        {
-                            "name": model.get("canonical_name", model.get("name")),
-                            "display_name": model.get("name"),
-                            "language": language,
-                            "accent": accent,
-                            "tags": tags,
-                            "description": f"{accent} accent. {tags}",
-                        }
-                    )
 
-        return jsonify({"models": formatted_models})
+@app.route("/transcripts")
+def list_transcripts():
+    denied = transcripts_denied()
+    if denied:
+        return denied
+    return {"sessions": transcripts.sessions()}
+
+
+@app.route("/transcripts/<session_id>")
+def export_transcript(session_id):
+    denied = transcripts_denied()
+    if denied:
+        return denied
+    # Streamed one turn per line, so a long transcript is never loaded whole
+    lines = transcripts.export(session_id)
+    if lines is None:
+        return jsonify({"error": "Unknown session"}), 404
+    return Response(lines, mimetype="application/x-ndjson")
+
+
+@app.route("/tts-models")
+def get_tts_models():
+    # Get TTS models from Deepgram API (cached, refreshed in the background)
+    try:
+        models, etag = tts_models.get()
     except Exception as e:
         logger.error(f"Error fetching TTS models: {e}")
         return jsonify({"error": str(e)}), 500
 
+    response = jsonify({"models": models})
+    response.set_etag(etag)
+    # Let the browser keep the list but revalidate it, getting a 304 when unchanged
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
 
-voice_agent = None
+# One agent per browser, keyed by the Socket.IO sid that started it
+voice_agents = {}
 
 
-def run_async_voice_agent():
+def run_async_voice_agent(voice_agent):
     try:
         # Create a new event loop for this thread
         loop = asyncio.new_event_loop()
@@ -592,14 +770,18 @@ def run_async_voice_agent():
                 loop.run_until_complete(loop.shutdown_asyncgens())
             finally:
                 loop.close()
+                # An agent that ended on its own lets its browser start a new one
+                if voice_agents.get(voice_agent.sid) is voice_agent:
+                    voice_agents.pop(voice_agent.sid, None)
     except Exception as e:
         logger.error(f"Error in voice agent thread setup: {e}")
 
 
 @socketio.on("start_voice_agent")
 def handle_start_voice_agent(data=None):
-    global voice_agent
+    ack = None
     logger.info(f"Starting voice agent with data: {data}")
+    voice_agent = voice_agents.get(request.sid)
     if voice_agent is None:
         # Get industry from data or default to deepgram
         industry = data.get("industry", "deepgram") if data else "deepgram"
@@ -616,95 +798,90 @@ def handle_start_voice_agent(data=None):
             voiceModel=voiceModel,
             voiceName=voiceName,
             browser_audio=browser_audio,
+            sid=request.sid,
         )
         if data:
             voice_agent.input_device_id = data.get("inputDeviceId")
             voice_agent.output_device_id = data.get("outputDeviceId")
+        # Negotiate the binary frame format once, instead of sending it with every chunk
+        capture_format = data.get("captureFormat") if data else None
+        if browser_audio and capture_format:
+            try:
+                voice_agent.capture = FrameStream(
+                    negotiate(
+                        capture_format, voice_agent.agent_templates.user_audio_sample_rate
+                    )
+                )
+            except FrameFormatError as e:
+                logger.warning(f"Browser will send audio_data chunks instead: {e}")
+                ack = {"error": str(e)}
+        voice_agents[request.sid] = voice_agent
         # Start the voice agent in a background thread
-        socketio.start_background_task(target=run_async_voice_agent)
+        socketio.start_background_task(run_async_voice_agent, voice_agent)
+
+    # The return value is the acknowledgement the browser receives
+    if voice_agent is not None and voice_agent.capture is not None:
+        ack = voice_agent.capture.format.to_dict()
+    return ack
+
+
+def stop_voice_agent(voice_agent):
+    voice_agent.is_running = False
+    if voice_agent.loop and not voice_agent.loop.is_closed():
+        try:
+            # Cancel all running tasks
+            for task in asyncio.all_tasks(voice_agent.loop):
+                task.cancel()
+        except Exception as e:
+            logger.error(f"Error stopping voice agent: {e}")
 
 
 @socketio.on("stop_voice_agent")
 def handle_stop_voice_agent():
-    global voice_agent
+    voice_agent = voice_agents.pop(request.sid, None)
     if voice_agent:
-        voice_agent.is_running = False
-        if voice_agent.loop and not voice_agent.loop.is_closed():
-            try:
-                # Cancel all running tasks
-                for task in asyncio.all_tasks(voice_agent.loop):
-                    task.cancel()
-            except Exception as e:
-                logger.error(f"Error stopping voice agent: {e}")
-        voice_agent = None
+        stop_voice_agent(voice_agent)
 
 
-@socketio.on("audio_data")
-def handle_audio_data(data):
-    global voice_agent
-    if voice_agent and voice_agent.is_running and voice_agent.browser_audio:
-        try:
-            # Get the audio buffer and sample rate
-            audio_buffer = data.get("audio")
-            sample_rate = data.get(
-                "sampleRate", 44100
-            )  # Default to 44.1kHz if not specified
+@socketio.on("disconnect")
+def handle_disconnect():
+    # A closed tab doesn't send stop_voice_agent
+    voice_agent = voice_agents.pop(request.sid, None)
+    if voice_agent:
+        stop_voice_agent(voice_agent)
 
-            if audio_buffer:
-                try:
-                    # Convert the binary data to bytes
-                    # Socket.IO binary data can come as either memoryview or bytes
-                    if isinstance(audio_buffer, memoryview):
-                        # Convert memoryview to bytes
-                        audio_bytes = audio_buffer.tobytes()
-
-                        # Log detailed info about the first chunk
-                        if not hasattr(handle_audio_data, "first_log_done"):
-                            import numpy as np
-
-                            # Peek at the data to verify it's in the right format
-                            int16_peek = np.frombuffer(
-                                audio_buffer[:20], dtype=np.int16
-                            )
-                            logger.info(f"First few samples: {int16_peek}")
-                    elif isinstance(audio_buffer, bytes):
-                        # Already bytes, use directly
-                        audio_bytes = audio_buffer
-                    else:
-                        # Unexpected type, try to convert and log a warning
-                        logger.warning(
-                            f"Unexpected audio buffer type: {type(audio_buffer)}"
-                        )
-                        try:
-                            audio_bytes = bytes(audio_buffer)
-                        except Exception as e:
-                            logger.error(
-                                f"Failed to convert audio buffer to bytes: {e}"
-                            )
-                            return
 
-                    # Log the first time we receive audio data
-                    if not hasattr(handle_audio_data, "first_log_done"):
-                        logger.info(
-                            f"Received first browser audio chunk: {len(audio_bytes)} bytes, sample rate: {sample_rate}Hz"
-                        )
-                        handle_audio_data.first_log_done = True
+@socketio.on("audio_frame")
+def handle_audio_frame(frame):
+    agent = voice_agents.get(request.sid)
+    if agent is None or agent.capture is None or not agent.is_running:
+        return
+    try:
+        # A memoryview into the received frame; the audio is not copied
+        payload = agent.capture.accept(frame)
+    except (FrameFormatError, TypeError) as e:
+        logger.warning(f"Dropping audio frame: {e}")
+        return
+    agent.ingest.push(payload)
 
-                    # Put the audio data in the queue for processing
-                    if voice_agent.loop and not voice_agent.loop.is_closed():
-                        asyncio.run_coroutine_threadsafe(
-                            voice_agent.mic_audio_queue.put(audio_bytes),
-                            voice_agent.loop,
-                        )
-                except Exception as e:
-                    logger.error(
-                        f"Error converting audio buffer: {e}, type: {type(audio_buffer)}"
-                    )
-                    import traceback
 
-                    logger.error(traceback.format_exc())
-        except Exception as e:
-            logger.error(f"Error processing browser audio data: {e}")
+@socketio.on("audio_data")
+def handle_audio_data(data):
+    agent = voice_agents.get(request.sid)
+    if agent is None or not agent.browser_audio or not agent.is_running:
+        return
+    try:
+        audio_buffer = data.get("audio")
+        if not audio_buffer:
+            return
+        # Socket.IO binary data arrives as bytes or a memoryview; queue it as is
+        if agent.ingest.push(as_buffer(audio_buffer)) and agent.ingest.chunks == 1:
+            logger.info(
+                f"Received first browser audio chunk: {len(audio_buffer)} bytes, "
+                f"sample rate: {data.get('sampleRate', 44100)}Hz"
+            )
+    except Exception as e:
+        logger.error(f"Error processing browser audio data: {e}")
 
 
 if __name__ == "__main__":
@@ -718,4 +895,8 @@ if __name__ == "__main__":
     print("\nPress Ctrl+C to stop the server\n")
     print("=" * 60 + "\n")
 
+    static_assets.precompress(app.static_folder)
+    tts_models.prefetch()
+    # Build the fuzzy customer index before the first caller needs it
+    threading.Thread(target=get_customer_matcher, name="customer-matcher", daemon=True).start()
     socketio.run(app, debug=True)
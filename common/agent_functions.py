@@ -1,6 +1,18 @@
 import json
 from datetime import datetime
 import asyncio
+from typing import Annotated
+
+from common import business_logic
+from common.config import DOC_SEARCH, FUNCTION_RESPONSE
+from common.cpu_pool import cpu_bound
+from common.customer_matcher import EXACT
+from common.function_registry import FunctionRegistry
+from common.doc_search import get_search_index
+from common.documentation import DOCS_DIR
+from common.pagination import decode_cursor, paginate
+
+registry = FunctionRegistry()
 
 # COMMENTED OUT - Original complex imports
 # from datetime import datetime, timedelta
@@ -15,7 +27,14 @@ import asyncio
 # )
 
 # ACTIVE - Simple function for current date
-async def get_current_date(params):
+@registry.function(
+    description="""Get the current date and time. Use this function when:
+        - User asks 'What's today's date?'
+        - User asks 'What time is it?'
+        - User asks about the current date or time
+        - User wants to know what day it is"""
+)
+async def get_current_date():
     """Get the current date and time."""
     now = datetime.now()
     
@@ -30,24 +49,166 @@ async def get_current_date(params):
         "iso_format": now.isoformat()
     }
 
-async def set_appointment(params):
+@registry.function(
+    description="""Use this function to set an doctor's appointment for a customer.
+        Use this function when:
+        - User asks to set an appointment
+        - User provides a date and name for an appointment
+        - User wants to schedule a doctor's appointment
+        """
+)
+async def set_appointment(
+    name: Annotated[str, "The name of the customer."] = None,
+    date: Annotated[str, "The date of the appointment."] = None,
+):
     """Set an appointment for a customer."""
-    try:
-        name = params.get("name")
-        date = params.get("date")
-
-        return {
-            "appointment_set": True,
-                "appointment_date": date,
-                "customer_name": name
-            }
-    except Exception as e:
-        return {
-            "error": str(e)
-        }
-    
+    return {
+        "appointment_set": True,
+        "appointment_date": date,
+        "customer_name": name
+    }
     
 
+@registry.function(
+    description="""Search the Deepgram documentation and return the most relevant passages.
+        Use this function when:
+        - User asks how a Deepgram product or feature works
+        - User asks about API parameters, models, or SDK usage
+        - You need documentation details to answer accurately
+        Base your answer on the returned passages."""
+)
+@cpu_bound()
+def search_documentation(
+    query: Annotated[str, "Keywords or a question describing what to look up.", {"minLength": 1}],
+    top_k: Annotated[int, "Number of passages to return (default 3).", {"minimum": 1}] = None,
+):
+    """Search the product documentation for passages relevant to a question."""
+    top_k = top_k or DOC_SEARCH["top_k"]
+
+    # Runs in the CPU pool: indexing and BM25 scoring would otherwise hold the
+    # GIL that the session's audio needs. Each worker keeps its own index,
+    # loaded from the saved copy.
+    hits = get_search_index(DOCS_DIR, DOC_SEARCH["index_path"]).search(query, top_k)
+    limit = DOC_SEARCH["max_passage_chars"]
+    return {
+        "query": query,
+        "results": [
+            {"topic": topic, "passage": passage[:limit], "score": round(score, 3)}
+            for score, topic, passage in hits
+        ],
+    }
+
+
+
+PAGE_PARAMETERS = {
+    "cursor": "next_cursor from the previous page, to continue the list. Omit for the first page.",
+    "limit": f"Maximum number of rows to return (default {FUNCTION_RESPONSE['page_size']}).",
+    "fields": "Only return these fields of each row, e.g. [\"id\", \"date\", \"status\"].",
+}
+
+
+async def _page(get_page, customer_id, item_name, cursor, limit, fields):
+    page = await get_page(
+        customer_id,
+        decode_cursor(cursor) if cursor else None,
+        min(limit or FUNCTION_RESPONSE["page_size"], FUNCTION_RESPONSE["max_page_size"]),
+    )
+    return paginate(
+        page, fields=fields, max_bytes=FUNCTION_RESPONSE["max_bytes"], item_name=item_name
+    )
+
+
+@registry.function(
+    description="""Retrieve a customer's orders, newest first, one page at a time.
+        Use this function when:
+        - A customer asks about their orders or order status
+        - A customer asks 'Where is my order?' or 'What did I order?'
+        If the result has a next_cursor, more orders exist; its summary covers all of
+        them. Only fetch the next page if the customer needs those orders."""
+)
+async def get_orders(
+    customer_id: Annotated[str, "Customer's ID in CUSTXXXX format."],
+    cursor: Annotated[str, PAGE_PARAMETERS["cursor"]] = None,
+    limit: Annotated[int, PAGE_PARAMETERS["limit"], {"minimum": 1}] = None,
+    fields: Annotated[list, PAGE_PARAMETERS["fields"]] = None,
+):
+    """Get a page of a customer's orders."""
+    page = await _page(
+        business_logic.get_customer_orders_page, customer_id, "orders", cursor, limit, fields
+    )
+    return {"customer_id": customer_id, **page}
+
+
+@registry.function(
+    description="""Retrieve a customer's appointments, newest first, one page at a time.
+        Use this function when:
+        - A customer asks about their upcoming or past appointments
+        - A customer asks 'When is my next appointment?'
+        If the result has a next_cursor, more appointments exist; its summary covers all
+        of them. Only fetch the next page if the customer needs those appointments."""
+)
+async def get_appointments(
+    customer_id: Annotated[str, "Customer's ID in CUSTXXXX format."],
+    cursor: Annotated[str, PAGE_PARAMETERS["cursor"]] = None,
+    limit: Annotated[int, PAGE_PARAMETERS["limit"], {"minimum": 1}] = None,
+    fields: Annotated[list, PAGE_PARAMETERS["fields"]] = None,
+):
+    """Get a page of a customer's appointments."""
+    page = await _page(
+        business_logic.get_customer_appointments_page,
+        customer_id,
+        "appointments",
+        cursor,
+        limit,
+        fields,
+    )
+    return {"customer_id": customer_id, **page}
+
+
+
+@registry.function(
+    description="""Identify the caller's customer account from what they said. Pass each
+        identifier exactly as heard; spoken digits, spelled-out emails and small
+        recognition errors are handled. Use this function when:
+        - A customer gives a phone number, email, name or customer ID
+        - Before looking up a customer's orders or appointments
+        If the result has a customer, use it. If it only has candidates, confirm with
+        the caller which one (e.g. by name) or ask for another identifier."""
+)
+async def find_customer(
+    phone: Annotated[str, "Phone number as heard, e.g. 'five five five one two three four five six seven'."] = None,
+    email: Annotated[str, "Email address as heard, e.g. 'j dot smith at example dot com'."] = None,
+    name: Annotated[str, "Customer's name as heard."] = None,
+    customer_id: Annotated[str, "Customer ID or number as heard, e.g. 'CUST0042' or '42'."] = None,
+):
+    """Find the caller's account, tolerating speech recognition errors."""
+    result = await business_logic.find_customer_candidates(phone, email, name, customer_id)
+    candidates = result.get("candidates")
+    if not candidates:
+        return result if "error" in result else {"error": "Customer not found"}
+    # Identified: an exact match on some identifier that no other candidate ties
+    top = candidates[0]
+    if top["score"] >= EXACT and (len(candidates) == 1 or candidates[1]["score"] < top["score"]):
+        return {"customer": top["customer"], "matched": top["matched"]}
+    return result
+
+
+@registry.function(
+    description="""Get order totals: number of orders, amount spent, orders by status, and
+        the last 7/30/90 days. Use this function when:
+        - A customer asks how much they have spent
+        - A customer asks how many orders they have, or how many are pending or shipped
+        - A customer asks what they ordered recently, in aggregate
+        Prefer this over get_orders for questions about counts and totals.
+        Omit customer_id for totals across all customers."""
+)
+async def get_order_summary(
+    customer_id: Annotated[str, "Customer's ID in CUSTXXXX format."] = None,
+):
+    """Get precomputed order totals for a customer or for all orders."""
+    return await business_logic.get_order_summary(customer_id)
+
+
 # COMMENTED OUT - Original complex functions
 # async def find_customer(params):
 #     """Look up a customer by phone, email, or ID."""
@@ -123,45 +284,9 @@ async def set_appointment(params):
 #     return result
 
 
-# ACTIVE - Simple function definitions for Voice Agent API
-FUNCTION_DEFINITIONS = [
-    {
-        "name": "get_current_date",
-        "description": """Get the current date and time. Use this function when:
-        - User asks 'What's today's date?'
-        - User asks 'What time is it?'
-        - User asks about the current date or time
-        - User wants to know what day it is""",
-        "parameters": {
-            "type": "object",
-            "properties": {},
-            "required": [],
-        },
-    },
-    {
-        "name": "set_appointment",
-        "description": """Use this function to set an doctor's appointment for a customer.
-        Use this function when:
-        - User asks to set an appointment
-        - User provides a date and name for an appointment
-        - User wants to schedule a doctor's appointment
-        """,
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "name": {
-                    "type": "string",
-                    "description": "The name of the customer."
-                },
-                "date": {
-                    "type": "string",
-                    "description": "The date of the appointment."
-                }
-            },
-            "required": []
-        }
-    }
-]
+# ACTIVE - Simple function definitions for Voice Agent API, generated from the
+# signatures of the functions registered above
+FUNCTION_DEFINITIONS = registry.definitions
 
 # COMMENTED OUT - Original complex function definitions
 # FUNCTION_DEFINITIONS = [
@@ -348,11 +473,9 @@ FUNCTION_DEFINITIONS = [
 #     },
 # ]
 
-# ACTIVE - Simple function map
-FUNCTION_MAP = {
-    "get_current_date": get_current_date,
-    "set_appointment": set_appointment,
-}
+# ACTIVE - Simple function map: name -> async f(params), which validates params
+# before calling the function
+FUNCTION_MAP = registry.function_map
 
 # COMMENTED OUT - Original complex function map
 # FUNCTION_MAP = {
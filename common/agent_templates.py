@@ -1,31 +1,23 @@
 from common.agent_functions import FUNCTION_DEFINITIONS
+from common.documentation import DOCS_DIR, get_documentation_cache
 from common.prompt_templates import DEEPGRAM_PROMPT_TEMPLATE, PROMPT_TEMPLATE, CUSTOMER_SERVICE_PROMPT_TEMPLATE
+from collections import OrderedDict
 from datetime import datetime
-import os
-import glob
+import copy
+import json
+import threading
 
 
 # Function to read documentation files from the deepgram-docs/fern/docs directory
 def read_documentation_files(docs_dir):
-    """Read all .mdx files in the specified directory and return their contents as a dictionary."""
-    documentation = {}
-    if not os.path.exists(docs_dir):
-        return documentation
-
-    # Get all .mdx files in the directory
-    mdx_files = glob.glob(os.path.join(docs_dir, "*.mdx"))
-
-    for file_path in mdx_files:
-        try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                content = file.read()
-                # Use the filename without extension as the key
-                key = os.path.basename(file_path).replace(".mdx", "")
-                documentation[key] = content
-        except Exception as e:
-            print(f"Error reading {file_path}: {e}")
-
-    return documentation
+    """Return the .mdx files in the specified directory as a topic -> content mapping.
+
+    Served from a process-wide cache that only re-reads files whose mtime or
+    size changed, so repeated calls don't re-read the whole corpus.
+    """
+    return get_documentation_cache(docs_dir)
+
+
 VOICE = "aura-2-thalia-en"
 
 # audio settings
@@ -86,6 +78,48 @@ AGENT_SETTINGS = {
 
 SETTINGS = {"type": "Settings", "audio": AUDIO_SETTINGS, "agent": AGENT_SETTINGS}
 
+# Serialized Settings payloads keyed by (industry, voiceModel, voiceName, date, docs version)
+SETTINGS_CACHE_SIZE = 32
+_settings_cache = OrderedDict()
+_settings_cache_lock = threading.Lock()
+
+
+def build_settings(voice_model, prompt, greeting):
+    """Return a fresh Settings message; the module-level SETTINGS is never mutated.
+
+    With greeting None the key is left out, so the agent doesn't speak first.
+    """
+    settings = copy.deepcopy(SETTINGS)
+    settings["agent"]["speak"]["provider"]["model"] = voice_model
+    settings["agent"]["think"]["prompt"] = prompt
+    if greeting is None:
+        del settings["agent"]["greeting"]
+    else:
+        settings["agent"]["greeting"] = greeting
+    return settings
+
+
+def cached_settings_payload(key, build):
+    """Return the JSON Settings payload for `key`, serializing `build()` on a miss.
+
+    The cache is bounded (least recently used entries are evicted) and shared
+    by all sessions, so starting a session with a known configuration skips
+    building and json.dumps-ing the large prompt.
+    """
+    with _settings_cache_lock:
+        payload = _settings_cache.get(key)
+        if payload is not None:
+            _settings_cache.move_to_end(key)
+            return payload
+
+    payload = json.dumps(build())
+
+    with _settings_cache_lock:
+        _settings_cache[key] = payload
+        while len(_settings_cache) > SETTINGS_CACHE_SIZE:
+            _settings_cache.popitem(last=False)
+    return payload
+
 
 class AgentTemplates:
     def __init__(
@@ -93,7 +127,7 @@ class AgentTemplates:
         industry="deepgram",
         voiceModel="aura-2-thalia-en",
         voiceName="",
-        docs_dir="deepgram-docs/fern/docs",
+        docs_dir=DOCS_DIR,
     ):
         self.voiceModel = voiceModel
         if voiceName == "":
@@ -107,9 +141,9 @@ class AgentTemplates:
         self.capabilities = ""
 
         self.industry = industry
+        self.documentation = None
 
         self.voice_agent_url = VOICE_AGENT_URL
-        self.settings = SETTINGS
         self.user_audio_sample_rate = USER_AUDIO_SAMPLE_RATE
         self.user_audio_secs_per_chunk = USER_AUDIO_SECS_PER_CHUNK
         self.user_audio_samples_per_chunk = USER_AUDIO_SAMPLES_PER_CHUNK
@@ -154,12 +188,34 @@ class AgentTemplates:
 
         self.first_message = f"Hello! I'm Friday from {self.company} customer service. {self.capabilities} How can I help you today?"
 
-        self.settings["agent"]["speak"]["provider"]["model"] = self.voiceModel
-        self.settings["agent"]["think"]["prompt"] = self.prompt
-        self.settings["agent"]["greeting"] = self.first_message
+        prompt = self.prompt
+        self._settings_key = (
+            self.industry,
+            self.voiceModel,
+            self.voiceName,
+            datetime.now().strftime("%Y-%m-%d"),
+            # The deepgram prompt lists the documentation topics
+            self.documentation.version if self.documentation is not None else None,
+        )
+        self._build_settings = lambda greeting: build_settings(self.voiceModel, prompt, greeting)
+        self.settings_payload = cached_settings_payload(
+            self._settings_key, lambda: self._build_settings(self.first_message)
+        )
 
         self.prompt = self.personality + "\n\n" + self.prompt
 
+    @property
+    def settings_payload_without_greeting(self):
+        """Settings with no greeting, for when the client plays a recorded one itself."""
+        return cached_settings_payload(
+            self._settings_key + ("no greeting",), lambda: self._build_settings(None)
+        )
+
+    @property
+    def settings(self):
+        """This session's Settings message as a new dict, safe to modify."""
+        return json.loads(self.settings_payload)
+
     def deepgram(self, company="Deepgram"):
         self.company = company
         self.personality = f"You are {self.voiceName}, a friendly and professional customer service representative for {self.company}, a Voice API company who provides STT and TTS capabilities via API. Your role is to assist potential customers with general inquiries about Deepgram."
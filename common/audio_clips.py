@@ -0,0 +1,185 @@
+"""On-disk cache of synthesized agent phrases, played locally.
+
+The greeting and the canned filler and farewell lines are the same words
+every time, yet the agent synthesizes them again in every session. ClipCache
+keeps their linear16 PCM in `directory`, one file per phrase, named by the
+SHA-256 of (text, voice model, sample rate), so a clip is found again for the
+same words and voice and a changed greeting or voice simply misses.
+
+Clips come from audio the agent already sent: ClipRecorder collects the
+audio of an assistant turn whose text is one of the cached phrases, up to
+AgentAudioDone. Phrases the agent never speaks on its own (the fillers) can
+be fetched once from the Deepgram TTS endpoint with prefetch().
+"""
+
+import hashlib
+import os
+import threading
+from collections import defaultdict
+
+import requests
+
+SPEAK_URL = "https://api.deepgram.com/v1/speak"
+
+# A phrase longer than this is not a canned line; drop what was collected
+MAX_CLIP_SECONDS = 30
+
+
+def clip_key(text, voice_model, sample_rate):
+    material = "\0".join((text.strip(), voice_model, str(sample_rate), "linear16"))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def chunks(pcm, size):
+    """Split a clip into playback chunks, so barge-in can drop the rest."""
+    view = memoryview(pcm)
+    return [bytes(view[i : i + size]) for i in range(0, len(view), size)]
+
+
+class ClipStats:
+    """Time to first audio, by occasion ("greeting", "filler") and source ("clip", "agent")."""
+
+    def __init__(self):
+        self._samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def record(self, occasion, source, seconds):
+        with self._lock:
+            self._samples[occasion, source].append(seconds)
+
+    def summary(self):
+        with self._lock:
+            samples = {key: sorted(values) for key, values in self._samples.items()}
+        result = defaultdict(dict)
+        for (occasion, source), values in samples.items():
+            result[occasion][source] = {
+                "count": len(values),
+                "p50_ms": round(values[len(values) // 2] * 1000, 1),
+            }
+        for sources in result.values():
+            if "clip" in sources and "agent" in sources:
+                sources["saved_ms"] = round(
+                    sources["agent"]["p50_ms"] - sources["clip"]["p50_ms"], 1
+                )
+        return dict(result)
+
+
+class ClipCache:
+    def __init__(self, directory):
+        self.directory = directory
+        self.stats = ClipStats()
+        self._clips = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pcm")
+
+    def get(self, text, voice_model, sample_rate):
+        """The cached PCM for this phrase and voice, or None."""
+        key = clip_key(text, voice_model, sample_rate)
+        with self._lock:
+            pcm = self._clips.get(key)
+        if pcm is not None:
+            return pcm
+        try:
+            with open(self._path(key), "rb") as f:
+                pcm = f.read()
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self._clips[key] = pcm
+        return pcm
+
+    def put(self, text, voice_model, sample_rate, pcm):
+        key = clip_key(text, voice_model, sample_rate)
+        os.makedirs(self.directory, exist_ok=True)
+        # Write then rename, so a reader never sees half a clip
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(pcm)
+        os.replace(tmp_path, self._path(key))
+        with self._lock:
+            self._clips[key] = bytes(pcm)
+
+    def prefetch(self, texts, voice_model, sample_rate, api_key, timeout=(3.05, 10)):
+        """Synthesize the phrases not cached yet, in a background thread."""
+        missing = [text for text in texts if self.get(text, voice_model, sample_rate) is None]
+        if not missing or not api_key:
+            return None
+
+        def fetch():
+            with requests.Session() as session:
+                for text in missing:
+                    try:
+                        response = session.post(
+                            SPEAK_URL,
+                            params={
+                                "model": voice_model,
+                                "encoding": "linear16",
+                                "sample_rate": sample_rate,
+                                "container": "none",
+                            },
+                            headers={"Authorization": f"Token {api_key}"},
+                            json={"text": text},
+                            timeout=timeout,
+                        )
+                        if response.status_code == 200 and response.content:
+                            self.put(text, voice_model, sample_rate, response.content)
+                    except requests.RequestException:
+                        # Not cached this time; the phrase is tried again next session
+                        pass
+
+        thread = threading.Thread(target=fetch, name="audio-clips", daemon=True)
+        thread.start()
+        return thread
+
+
+class ClipRecorder:
+    """Collects the agent's audio for cacheable phrases as a session runs.
+
+    Feed it the session's assistant ConversationText, binary audio,
+    AgentAudioDone and UserStartedSpeaking (a barge-in cuts the clip short,
+    so that take is dropped).
+    """
+
+    def __init__(self, cache, texts, voice_model, sample_rate):
+        self.cache = cache
+        self.voice_model = voice_model
+        self.sample_rate = sample_rate
+        self.max_bytes = MAX_CLIP_SECONDS * sample_rate * 2
+        self._wanted = {
+            text.strip()
+            for text in texts
+            if text and cache.get(text, voice_model, sample_rate) is None
+        }
+        self._text = None
+        self._audio = bytearray()
+
+    def on_text(self, content):
+        # A second text in the same turn means the audio would cover both
+        self.cancel()
+        text = (content or "").strip()
+        if text in self._wanted:
+            self._text = text
+
+    def on_audio(self, data):
+        if self._text is None:
+            return
+        self._audio += data
+        if len(self._audio) > self.max_bytes:
+            self.cancel()
+
+    def on_done(self):
+        """Store the finished phrase; returns its text, or None."""
+        text = self._text
+        if text is None or not self._audio:
+            self.cancel()
+            return None
+        self.cache.put(text, self.voice_model, self.sample_rate, bytes(self._audio))
+        self._wanted.discard(text)
+        self.cancel()
+        return text
+
+    def cancel(self):
+        self._text = None
+        self._audio = bytearray()
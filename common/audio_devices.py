@@ -0,0 +1,90 @@
+"""One PortAudio context shared by the microphone, the speaker and /audio-devices.
+
+Initializing PortAudio rescans every host API (ALSA, JACK, ...) and can take
+hundreds of milliseconds, so the PyAudio instance and the input device list
+are created once and reused. PortAudio only sees added or removed devices
+after it is re-initialized: invalidate() marks the list stale, and the next
+lookup re-initializes once no stream is using the context.
+"""
+
+import atexit
+import threading
+
+import pyaudio
+
+
+class AudioContext:
+    def __init__(self):
+        self._audio = None
+        self._input_devices = None
+        self._open_streams = 0
+        self._stale = False
+        self._lock = threading.RLock()
+
+    def _pyaudio(self):
+        if self._stale and self._open_streams == 0:
+            self._terminate()
+        if self._audio is None:
+            self._audio = pyaudio.PyAudio()
+        return self._audio
+
+    def _terminate(self):
+        if self._audio is not None:
+            self._audio.terminate()
+            self._audio = None
+        self._input_devices = None
+        self._stale = False
+
+    def terminate(self):
+        with self._lock:
+            self._terminate()
+
+    def invalidate(self):
+        """Mark the device list stale, e.g. after a device was plugged in or removed."""
+        with self._lock:
+            self._stale = True
+
+    def input_devices(self, refresh=False):
+        """Return the input devices as [{"index", "name"}], cached until invalidated.
+
+        With `refresh` PortAudio is re-initialized first, unless a stream is
+        open; then the refresh happens once the last stream closes.
+        """
+        with self._lock:
+            if refresh:
+                self._stale = True
+            audio = self._pyaudio()
+            if self._input_devices is None:
+                numdevices = audio.get_host_api_info_by_index(0).get("deviceCount")
+                devices = []
+                for i in range(0, numdevices):
+                    device_info = audio.get_device_info_by_host_api_device_index(0, i)
+                    if device_info.get("maxInputChannels") > 0:
+                        devices.append({"index": i, "name": device_info.get("name")})
+                self._input_devices = devices
+            return list(self._input_devices)
+
+    def open(self, **kwargs):
+        """Open a stream on the shared context; release it with close()."""
+        with self._lock:
+            try:
+                stream = self._pyaudio().open(**kwargs)
+            except Exception:
+                # The device may have gone away; enumerate again next time
+                self._stale = True
+                raise
+            self._open_streams += 1
+            return stream
+
+    def close(self, stream):
+        try:
+            if stream.is_active():
+                stream.stop_stream()
+            stream.close()
+        finally:
+            with self._lock:
+                self._open_streams -= 1
+
+
+audio_context = AudioContext()
+atexit.register(audio_context.terminate)
@@ -0,0 +1,111 @@
+"""Binary audio frames sent by the browser's AudioWorklet capture.
+
+Each `audio_frame` Socket.IO message is one raw binary frame: an 8-byte
+little-endian header followed by the PCM payload.
+
+    offset  size  field
+    0       1     format id, assigned by the server at start_voice_agent
+    1       1     reserved (0)
+    2       2     sequence number, wrapping at 65536
+    4       4     capture timestamp in milliseconds, wrapping at 2**32
+
+The capture format (encoding, sample rate, channels, frame length) is sent
+once in start_voice_agent and answered with the format id, so frames carry
+no per-chunk metadata. parse_frame() returns the payload as a memoryview
+into the received buffer, so no audio bytes are copied.
+"""
+
+import struct
+
+HEADER = struct.Struct("<BxHI")
+HEADER_SIZE = HEADER.size
+FRAME_PROTOCOL = "frames-v1"
+SUPPORTED_ENCODINGS = ("linear16",)
+MAX_FRAME_MS = 100
+
+
+class FrameFormatError(ValueError):
+    pass
+
+
+class CaptureFormat:
+    """The capture parameters a browser negotiated for its frames."""
+
+    def __init__(self, format_id, encoding, sample_rate, channels, frame_ms):
+        self.format_id = format_id
+        self.encoding = encoding
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frame_ms = frame_ms
+        self.frame_bytes = sample_rate * frame_ms // 1000 * channels * 2
+
+    def to_dict(self):
+        return {
+            "protocol": FRAME_PROTOCOL,
+            "formatId": self.format_id,
+            "headerBytes": HEADER_SIZE,
+            "encoding": self.encoding,
+            "sampleRate": self.sample_rate,
+            "channels": self.channels,
+            "frameMs": self.frame_ms,
+        }
+
+
+def negotiate(requested, sample_rate, format_id=1):
+    """Validate a browser's requested capture format against what the agent expects.
+
+    `requested` is the `captureFormat` dict from start_voice_agent. Raises
+    FrameFormatError if the frames could not be forwarded as they are.
+    """
+    if requested.get("protocol") != FRAME_PROTOCOL:
+        raise FrameFormatError(f"Unsupported protocol: {requested.get('protocol')}")
+    encoding = requested.get("encoding", "linear16")
+    if encoding not in SUPPORTED_ENCODINGS:
+        raise FrameFormatError(f"Unsupported encoding: {encoding}")
+    if requested.get("sampleRate") != sample_rate:
+        raise FrameFormatError(
+            f"Sample rate {requested.get('sampleRate')} does not match {sample_rate}"
+        )
+    channels = requested.get("channels", 1)
+    if channels != 1:
+        raise FrameFormatError(f"Expected mono audio, got {channels} channels")
+    frame_ms = requested.get("frameMs", 20)
+    if not isinstance(frame_ms, int) or not 0 < frame_ms <= MAX_FRAME_MS:
+        raise FrameFormatError(f"Unsupported frame length: {frame_ms} ms")
+    return CaptureFormat(format_id, encoding, sample_rate, channels, frame_ms)
+
+
+def parse_frame(buffer):
+    """Split a frame into (format_id, sequence, timestamp_ms, payload) without copying."""
+    view = memoryview(buffer)
+    if len(view) < HEADER_SIZE:
+        raise FrameFormatError(f"Frame of {len(view)} bytes is shorter than its header")
+    format_id, sequence, timestamp_ms = HEADER.unpack_from(view)
+    return format_id, sequence, timestamp_ms, view[HEADER_SIZE:]
+
+
+class FrameStream:
+    """Checks incoming frames against the negotiated format and counts gaps."""
+
+    def __init__(self, capture_format):
+        self.format = capture_format
+        self.frames = 0
+        self.lost = 0
+        self._next_sequence = None
+
+    def accept(self, buffer):
+        """Return the frame's payload, or raise FrameFormatError if it does not belong."""
+        format_id, sequence, _, payload = parse_frame(buffer)
+        if format_id != self.format.format_id:
+            raise FrameFormatError(f"Unexpected format id {format_id}")
+        if len(payload) % 2:
+            raise FrameFormatError("Payload is not whole 16-bit samples")
+        gap = 0
+        if self._next_sequence is not None:
+            gap = (sequence - self._next_sequence) & 0xFFFF
+        # Up to half the sequence space ahead counts as lost frames, behind as a late one
+        if gap < 0x8000:
+            self.lost += gap
+            self._next_sequence = (sequence + 1) & 0xFFFF
+        self.frames += 1
+        return payload
@@ -0,0 +1,41 @@
+"""Hand microphone audio from Socket.IO and PortAudio threads to a session's loop.
+
+Chunks are queued as the buffers they arrived in (bytes or a memoryview
+into the received packet), never copied, and the handoff is one
+call_soon_threadsafe(queue.put_nowait, chunk) rather than a coroutine plus
+a Future per chunk.
+"""
+
+
+def as_buffer(audio):
+    """Return `audio` as a bytes-like object, copying only if it is not one already."""
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        return audio
+    return bytes(audio)
+
+
+class AudioIngest:
+    """Feeds one session's mic_audio_queue from other threads."""
+
+    def __init__(self, queue):
+        self.queue = queue
+        self.loop = None
+        self.chunks = 0
+        self.bytes = 0
+
+    def attach(self, loop):
+        self.loop = loop
+
+    def push(self, chunk):
+        """Queue a chunk on the session's loop; returns False if the loop is gone."""
+        loop = self.loop
+        if loop is None:
+            return False
+        try:
+            loop.call_soon_threadsafe(self.queue.put_nowait, chunk)
+        except RuntimeError:
+            # The loop closed while the session was stopping
+            return False
+        self.chunks += 1
+        self.bytes += chunk.nbytes if isinstance(chunk, memoryview) else len(chunk)
+        return True
@@ -0,0 +1,286 @@
+"""Vectorized NumPy generator for large synthetic business datasets.
+
+Ids, dates, statuses and totals are drawn in batches straight into the
+column layout of common.columnar_store, without building a dict per row.
+generate_to_disk() streams each batch into memory-mapped .npy files, so the
+full dataset never has to fit in memory and later starts can mmap it back.
+
+Output is reproducible from the seed: every chunk draws from its own
+generator seeded with (seed, table, chunk number), and dates are anchored
+to the start of the generation day like generate_mock_data().
+
+Requires NumPy, from requirements.txt or the ``columnar`` extra
+(``pip install -e ".[columnar]"``).
+"""
+
+import json
+import os
+import pathlib
+import random
+import shutil
+from datetime import datetime
+
+try:
+    import numpy as np
+    from numpy.lib.format import open_memmap
+except ImportError as e:
+    raise ImportError(
+        'The bulk generator requires numpy: pip install -e ".[columnar]"'
+    ) from e
+
+from common.columnar_store import (
+    Categorical,
+    ColumnarDataStore,
+    GroupIndex,
+    PatternStrings,
+    to_micros,
+)
+from common.config import MOCK_DATA_SEED, MOCK_DATA_SIZE
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+FORMAT_VERSION = 1
+
+HOUR = 3_600_000_000
+DAY = 24 * HOUR
+
+SERVICES = ["Consultation", "Follow-up", "Review", "Planning"]
+APPOINTMENT_STATUSES = ["Scheduled", "Completed", "Cancelled"]
+ORDER_STATUSES = ["Pending", "Shipped", "Delivered", "Cancelled"]
+
+TABLES = ("customers", "appointments", "orders")
+COLUMN_DTYPES = {
+    "customers": {"joined_date": np.int64},
+    "appointments": {
+        "customer": np.int32,
+        "date": np.int64,
+        "service": np.uint8,
+        "status": np.uint8,
+        "duration_minutes": np.int16,
+        "provider": np.int16,
+    },
+    "orders": {
+        "customer": np.int32,
+        "date": np.int64,
+        "items": np.uint8,
+        "total_cents": np.int32,
+        "status": np.uint8,
+    },
+}
+
+
+def _today_micros():
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return to_micros(today)
+
+
+def _generate_chunk(table, count, rng, today, customer_count):
+    if table == "customers":
+        return {
+            "joined_date": today
+            - rng.integers(0, 8, count) * DAY
+            - rng.integers(0, DAY, count),
+        }
+    if table == "appointments":
+        return {
+            "customer": rng.integers(0, customer_count, count, dtype=np.int32),
+            "date": today
+            + rng.integers(0, 8, count) * DAY
+            + rng.integers(9, 17, count) * HOUR,
+            "service": rng.integers(0, len(SERVICES), count, dtype=np.uint8),
+            "status": rng.integers(0, len(APPOINTMENT_STATUSES), count, dtype=np.uint8),
+            "duration_minutes": np.zeros(count, dtype=np.int16),
+            "provider": np.zeros(count, dtype=np.int16),
+        }
+    return {
+        "customer": rng.integers(0, customer_count, count, dtype=np.int32),
+        "date": today - rng.integers(0, 8, count) * DAY - rng.integers(0, DAY, count),
+        "items": rng.integers(1, 6, count, dtype=np.uint8),
+        "total_cents": np.round(rng.uniform(10.0, 500.0, count) * 100).astype(
+            np.int32
+        ),
+        "status": rng.integers(0, len(ORDER_STATUSES), count, dtype=np.uint8),
+    }
+
+
+def iter_chunks(sizes, seed, chunk_size=DEFAULT_CHUNK_SIZE, today=None):
+    """Yield (table, start_row, columns) batches of at most `chunk_size` rows."""
+    today = _today_micros() if today is None else today
+    for table_no, table in enumerate(TABLES):
+        total = sizes[table]
+        for chunk_no, start in enumerate(range(0, total, chunk_size)):
+            rng = np.random.default_rng([seed, table_no, chunk_no])
+            count = min(chunk_size, total - start)
+            yield table, start, _generate_chunk(
+                table, count, rng, today, sizes["customers"]
+            )
+
+
+def _fill(arrays, sizes, seed, chunk_size, today):
+    for table, start, columns in iter_chunks(sizes, seed, chunk_size, today):
+        for name, values in columns.items():
+            arrays[table][name][start : start + len(values)] = values
+
+
+def _build_store(arrays, sizes, group_indexes=None):
+    n = sizes["customers"]
+    customers = {
+        "id": PatternStrings("CUST", n, width=4),
+        "name": PatternStrings("Customer ", n),
+        "phone": PatternStrings("+1555", n, width=7),
+        "email": PatternStrings("customer", n, suffix="@example.com"),
+        "joined_date": arrays["customers"]["joined_date"],
+    }
+    a = arrays["appointments"]
+    appointments = {
+        "id": PatternStrings("APT", sizes["appointments"], width=4),
+        "customer": a["customer"],
+        "date": a["date"],
+        "service": Categorical(a["service"], SERVICES),
+        "status": Categorical(a["status"], APPOINTMENT_STATUSES),
+        "duration_minutes": a["duration_minutes"],
+        "provider": Categorical(a["provider"], [None]),
+    }
+    o = arrays["orders"]
+    orders = {
+        "id": PatternStrings("ORD", sizes["orders"], width=4),
+        "customer": o["customer"],
+        "date": o["date"],
+        "items": o["items"],
+        "total_cents": o["total_cents"],
+        "status": Categorical(o["status"], ORDER_STATUSES),
+    }
+    return ColumnarDataStore(customers, appointments, orders, group_indexes)
+
+
+def generate_columnar(
+    sizes=MOCK_DATA_SIZE, seed=MOCK_DATA_SEED, chunk_size=DEFAULT_CHUNK_SIZE
+):
+    """Generate the dataset into in-memory columns and return a ColumnarDataStore."""
+    arrays = {
+        table: {
+            name: np.empty(sizes[table], dtype=dtype) for name, dtype in columns.items()
+        }
+        for table, columns in COLUMN_DTYPES.items()
+    }
+    _fill(arrays, sizes, seed, chunk_size, _today_micros())
+    return _build_store(arrays, sizes)
+
+
+def generate_to_disk(
+    directory, sizes=MOCK_DATA_SIZE, seed=MOCK_DATA_SEED, chunk_size=DEFAULT_CHUNK_SIZE
+):
+    """Stream the dataset chunk by chunk into .npy files under `directory`.
+
+    Files are written to a temporary directory that is renamed into place
+    once complete, so concurrent workers never load a partial dataset.
+    """
+    directory = pathlib.Path(directory)
+    tmp_dir = directory.with_name(f"{directory.name}.{os.getpid()}.tmp")
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    today = _today_micros()
+
+    arrays = {
+        table: {
+            name: open_memmap(
+                tmp_dir / f"{table}.{name}.npy",
+                mode="w+",
+                dtype=dtype,
+                shape=(sizes[table],),
+            )
+            for name, dtype in columns.items()
+        }
+        for table, columns in COLUMN_DTYPES.items()
+    }
+    _fill(arrays, sizes, seed, chunk_size, today)
+
+    for table in ("appointments", "orders"):
+        index = GroupIndex.build(arrays[table]["customer"], sizes["customers"])
+        np.save(tmp_dir / f"{table}.by_customer.rows.npy", index.rows)
+        np.save(tmp_dir / f"{table}.by_customer.offsets.npy", index.offsets)
+    for columns in arrays.values():
+        for array in columns.values():
+            array.flush()
+    del arrays
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "seed": seed,
+        "sizes": {table: sizes[table] for table in TABLES},
+        "today": today,
+    }
+    (tmp_dir / "manifest.json").write_text(json.dumps(manifest))
+
+    try:
+        os.replace(tmp_dir, directory)
+    except OSError:
+        # Another process finished first; use its copy
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def load_columnar(directory):
+    """Memory-map a dataset written by generate_to_disk()."""
+    directory = pathlib.Path(directory)
+    manifest = json.loads((directory / "manifest.json").read_text())
+    if manifest["format_version"] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported dataset format in {directory}")
+    sizes = manifest["sizes"]
+    arrays = {
+        table: {
+            name: np.load(directory / f"{table}.{name}.npy", mmap_mode="r")
+            for name in columns
+        }
+        for table, columns in COLUMN_DTYPES.items()
+    }
+    group_indexes = tuple(
+        GroupIndex(
+            np.load(directory / f"{table}.by_customer.rows.npy", mmap_mode="r"),
+            np.load(directory / f"{table}.by_customer.offsets.npy", mmap_mode="r"),
+        )
+        for table in ("appointments", "orders")
+    )
+    return _build_store(arrays, sizes, group_indexes)
+
+
+def load_or_generate(
+    directory, sizes=MOCK_DATA_SIZE, seed=MOCK_DATA_SEED, chunk_size=DEFAULT_CHUNK_SIZE
+):
+    """Memory-map the dataset in `directory`, generating it there first if missing."""
+    directory = pathlib.Path(directory)
+    if not (directory / "manifest.json").exists():
+        generate_to_disk(directory, sizes, seed, chunk_size)
+    return load_columnar(directory)
+
+
+def sample_data(store, seed=MOCK_DATA_SEED, count=3):
+    """Build the UI's sample_data list (see generate_mock_data) from a store."""
+    rng = random.Random(seed)
+    samples = []
+    for row in rng.sample(range(len(store.customers)), count):
+        customer = store.customers[row]
+        samples.append(
+            {
+                "Customer": customer["name"],
+                "ID": customer["id"],
+                "Phone": customer["phone"],
+                "Email": customer["email"],
+                "Appointments": [
+                    {
+                        "Service": apt["service"],
+                        "Date": apt["date"][:10],
+                        "Status": apt["status"],
+                    }
+                    for apt in store.get_appointments(customer["id"])[:2]
+                ],
+                "Orders": [
+                    {
+                        "ID": order["id"],
+                        "Total": f"${order['total']}",
+                        "Status": order["status"],
+                        "Date": order["date"][:10],
+                        "# Items": order["items"],
+                    }
+                    for order in store.get_orders(customer["id"])[:2]
+                ],
+            }
+        )
+    return samples
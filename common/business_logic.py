@@ -1,15 +1,35 @@
 import asyncio
 import json
+from collections.abc import MutableMapping
 from datetime import datetime, timedelta
+import os
+import pickle
 import random
-from common.config import ARTIFICIAL_DELAY, MOCK_DATA_SIZE
+import shutil
+import threading
+from common.config import (
+    APPOINTMENT_LOG,
+    DATABASE_CONFIG,
+    DATA_BACKEND,
+    MOCK_DATA_JSON_DUMP,
+    MOCK_DATA_SEED,
+    MOCK_DATA_SIZE,
+    MOCK_DATA_SNAPSHOT,
+)
+from common.customer_matcher import CustomerMatcher
+from common.data_store import MockDataStore, call_store
+from common.latency import sample_delay
+from common.slot_index import to_seconds
+from common.write_ahead_log import WriteAheadLog
 import pathlib
 
+MOCK_DATA_DIR = pathlib.Path("mock_data_outputs")
+
 
 def save_mock_data(data):
     """Save mock data to a timestamped file in mock_data_outputs directory."""
     # Create mock_data_outputs directory if it doesn't exist
-    output_dir = pathlib.Path("mock_data_outputs")
+    output_dir = MOCK_DATA_DIR
     output_dir.mkdir(exist_ok=True)
 
     # Clean up old mock data files
@@ -26,17 +46,123 @@ def save_mock_data(data):
     print(f"\nMock data saved to: {output_file}")
 
 
-def cleanup_mock_data_files(output_dir):
-    """Remove all existing mock data files in the output directory."""
-    for file in output_dir.glob("mock_data_*.json"):
+def cleanup_mock_data_files(output_dir, pattern="mock_data_*.json", keep=None):
+    """Remove existing mock data files matching `pattern`, except `keep`."""
+    for file in output_dir.glob(pattern):
+        if file == keep:
+            continue
         try:
             file.unlink()
         except Exception as e:
             print(f"Warning: Could not delete {file}: {e}")
 
 
+def snapshot_path(seed=MOCK_DATA_SEED, day=None):
+    """Binary snapshot location for a seed, dataset size and generation day."""
+    day = day or datetime.now().date()
+    sizes = "_".join(
+        str(MOCK_DATA_SIZE[k]) for k in ("customers", "appointments", "orders")
+    )
+    return MOCK_DATA_DIR / f"mock_data_{seed}_{sizes}_{day:%Y%m%d}.pickle"
+
+
+def write_snapshot(data, path):
+    """Atomically write a pickle snapshot so concurrent workers never read a partial file."""
+    path.parent.mkdir(exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path):
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Warning: Could not load mock data snapshot {path}: {e}")
+        return None
+
+
+def load_mock_data(seed=MOCK_DATA_SEED):
+    """Load today's mock data snapshot, generating and saving it if missing.
+
+    Later starts (and every other worker process) deserialize the binary
+    snapshot instead of regenerating. Snapshot cleanup and the optional JSON
+    dump run on a background thread, off the startup path.
+    """
+    if DATA_BACKEND == "columnar":
+        return load_columnar_mock_data(seed)
+
+    path = snapshot_path(seed)
+    if MOCK_DATA_SNAPSHOT:
+        data = read_snapshot(path)
+        if data is not None:
+            return data
+
+    data = generate_mock_data(seed)
+    # Copy the row lists so bookings made while saving don't end up in the
+    # snapshot (they are replayed from the appointment log instead)
+    saved = {key: list(rows) for key, rows in data.items()}
+
+    def persist():
+        if MOCK_DATA_SNAPSHOT:
+            write_snapshot(saved, path)
+            cleanup_mock_data_files(MOCK_DATA_DIR, "mock_data_*.pickle", keep=path)
+        if MOCK_DATA_JSON_DUMP:
+            save_mock_data(saved)
+
+    threading.Thread(target=persist, name="mock-data-persist").start()
+    return data
+
+
+def load_columnar_mock_data(seed=MOCK_DATA_SEED):
+    """Generate the dataset straight into NumPy columns, skipping dict rows.
+
+    With snapshots enabled the columns are streamed to .npy files next to the
+    pickle snapshots and memory-mapped, so later starts map them instead of
+    regenerating. The JSON dump is skipped for this backend.
+    """
+    from common.bulk_generator import generate_columnar, load_or_generate, sample_data
+
+    if MOCK_DATA_SNAPSHOT:
+        directory = snapshot_path(seed).with_suffix(".columns")
+        store = load_or_generate(directory, MOCK_DATA_SIZE, seed)
+        threading.Thread(
+            target=cleanup_mock_data_dirs,
+            args=(MOCK_DATA_DIR, "mock_data_*.columns", directory),
+            name="mock-data-cleanup",
+        ).start()
+    else:
+        store = generate_columnar(MOCK_DATA_SIZE, seed)
+
+    return {
+        "customers": store.customers,
+        "appointments": store.appointments,
+        "orders": store.orders,
+        "sample_data": sample_data(store, seed),
+    }
+
+
+def cleanup_mock_data_dirs(output_dir, pattern, keep=None):
+    """Remove stale column snapshot directories matching `pattern`, except `keep`."""
+    for directory in output_dir.glob(pattern):
+        if directory != keep:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
 # Mock data generation
-def generate_mock_data():
+def generate_mock_data(seed=MOCK_DATA_SEED):
+    """Generate the mock dataset.
+
+    Dates are anchored to the start of today, so a given seed produces the
+    same data for the whole day.
+    """
+    rng = random.Random(seed)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
     customers = []
     appointments = []
     orders = []
@@ -49,43 +175,45 @@ def generate_mock_data():
             "phone": f"+1555{i:07d}",
             "email": f"customer{i}@example.com",
             "joined_date": (
-                datetime.now() - timedelta(days=random.randint(0, 7))
+                today - timedelta(days=rng.randint(0, 7), seconds=rng.randrange(86400))
             ).isoformat(),
         }
         customers.append(customer)
 
     # Generate appointments
     for i in range(MOCK_DATA_SIZE["appointments"]):
-        customer = random.choice(customers)
+        customer = rng.choice(customers)
         appointment = {
             "id": f"APT{i:04d}",
             "customer_id": customer["id"],
             "customer_name": customer["name"],
-            "date": (datetime.now() + timedelta(days=random.randint(0, 7))).isoformat(),
-            "service": random.choice(
-                ["Consultation", "Follow-up", "Review", "Planning"]
-            ),
-            "status": random.choice(["Scheduled", "Completed", "Cancelled"]),
+            "date": (
+                today + timedelta(days=rng.randint(0, 7), hours=rng.randint(9, 16))
+            ).isoformat(),
+            "service": rng.choice(["Consultation", "Follow-up", "Review", "Planning"]),
+            "status": rng.choice(["Scheduled", "Completed", "Cancelled"]),
         }
         appointments.append(appointment)
 
     # Generate orders
     for i in range(MOCK_DATA_SIZE["orders"]):
-        customer = random.choice(customers)
+        customer = rng.choice(customers)
         order = {
             "id": f"ORD{i:04d}",
             "customer_id": customer["id"],
             "customer_name": customer["name"],
-            "date": (datetime.now() - timedelta(days=random.randint(0, 7))).isoformat(),
-            "items": random.randint(1, 5),
-            "total": round(random.uniform(10.0, 500.0), 2),
-            "status": random.choice(["Pending", "Shipped", "Delivered", "Cancelled"]),
+            "date": (
+                today - timedelta(days=rng.randint(0, 7), seconds=rng.randrange(86400))
+            ).isoformat(),
+            "items": rng.randint(1, 5),
+            "total": round(rng.uniform(10.0, 500.0), 2),
+            "status": rng.choice(["Pending", "Shipped", "Delivered", "Cancelled"]),
         }
         orders.append(order)
 
     # Format sample data for display
     sample_data = []
-    sample_customers = random.sample(customers, 3)
+    sample_customers = rng.sample(customers, 3)
     for customer in sample_customers:
         customer_data = {
             "Customer": customer["name"],
@@ -132,64 +260,216 @@ def generate_mock_data():
         "sample_data": sample_data,
     }
 
-    # Save the mock data
-    save_mock_data(mock_data)
-
     return mock_data
 
 
-# Initialize mock data
-MOCK_DATA = generate_mock_data()
+class LazyMockData(MutableMapping):
+    """Dict-like MOCK_DATA that loads the dataset on first access, not at import."""
+
+    def __init__(self, loader=load_mock_data):
+        self._loader = loader
+        self._data = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    def _get(self):
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    self._data = self._loader()
+        return self._data
+
+    def __getitem__(self, key):
+        return self._get()[key]
+
+    def __setitem__(self, key, value):
+        self._get()[key] = value
+
+    def __delitem__(self, key):
+        del self._get()[key]
+
+    def __iter__(self):
+        return iter(self._get())
+
+    def __len__(self):
+        return len(self._get())
+
+
+# Mock data is generated or loaded from the snapshot on first access
+MOCK_DATA = LazyMockData()
+
+_data_store = None
+_data_store_lock = threading.Lock()
+
+
+def get_data_store():
+    """Return the indexed data access layer over MOCK_DATA."""
+    global _data_store
+    if _data_store is None:
+        with _data_store_lock:
+            if _data_store is None:
+                _data_store = _create_data_store()
+    return _data_store
+
 
+def _create_data_store():
+    if DATABASE_CONFIG["enable"]:
+        from common.sqlite_store import SQLiteDataStore
+
+        store = SQLiteDataStore(
+            DATABASE_CONFIG["path"], DATABASE_CONFIG.get("pool_size", 4)
+        )
+        # Seed a new database from the mock data; existing data is kept as is
+        if store.is_empty():
+            store.load_rows(MOCK_DATA)
+        return store
+    if DATA_BACKEND == "columnar":
+        # load_columnar_mock_data() fills MOCK_DATA with views over the store
+        store = MOCK_DATA["customers"].store
+    else:
+        store = MockDataStore(MOCK_DATA)
+    if APPOINTMENT_LOG["enable"]:
+        store.attach_log(
+            WriteAheadLog(APPOINTMENT_LOG["path"], fsync=APPOINTMENT_LOG["fsync"])
+        )
+    return store
+
+
+_customer_matcher = None
 
-async def simulate_delay(delay_type):
-    """Simulate processing delay based on operation type."""
-    await asyncio.sleep(ARTIFICIAL_DELAY[delay_type])
+
+def get_customer_matcher():
+    """Return the CustomerMatcher over the store's customers, built on first use."""
+    global _customer_matcher
+    if _customer_matcher is None:
+        store = get_data_store()
+        with _data_store_lock:
+            if _customer_matcher is None:
+                # The SQLite store was seeded from (and has the same customers as) MOCK_DATA
+                customers = getattr(store, "customers", None)
+                if customers is None:
+                    customers = MOCK_DATA["customers"]
+                _customer_matcher = CustomerMatcher(customers)
+    return _customer_matcher
+
+
+async def simulate_delay(delay_type, function=None):
+    """Simulate processing delay based on operation type (and calling function)."""
+    await asyncio.sleep(sample_delay(delay_type, function))
 
 
 async def get_customer(phone=None, email=None, customer_id=None):
     """Look up a customer by phone, email, or ID."""
-    await simulate_delay("database")
+    await simulate_delay("database", "get_customer")
 
+    store = get_data_store()
     if phone:
-        customer = next(
-            (c for c in MOCK_DATA["customers"] if c["phone"] == phone), None
-        )
+        customer = await call_store(store.get_customer_by_phone, phone)
     elif email:
-        customer = next(
-            (c for c in MOCK_DATA["customers"] if c["email"] == email), None
-        )
+        customer = await call_store(store.get_customer_by_email, email)
     elif customer_id:
-        customer = next(
-            (c for c in MOCK_DATA["customers"] if c["id"] == customer_id), None
-        )
+        customer = await call_store(store.get_customer_by_id, customer_id)
     else:
         return {"error": "No search criteria provided"}
 
     return customer if customer else {"error": "Customer not found"}
 
 
+async def find_customer_candidates(
+    phone=None, email=None, name=None, customer_id=None, limit=5
+):
+    """Rank customers matching a heard phone, email, name or ID, tolerating ASR errors."""
+    await simulate_delay("database", "find_customer_candidates")
+
+    if not any((phone, email, name, customer_id)):
+        return {"error": "No search criteria provided"}
+    matches = get_customer_matcher().match(phone, email, name, customer_id, limit)
+    return {
+        "candidates": [
+            {"customer": customer, "score": round(score, 2), "matched": fields}
+            for score, customer, fields in matches
+        ]
+    }
+
+
 async def get_customer_appointments(customer_id):
     """Get all appointments for a customer."""
-    await simulate_delay("database")
+    await simulate_delay("database", "get_customer_appointments")
 
-    appointments = [
-        a for a in MOCK_DATA["appointments"] if a["customer_id"] == customer_id
-    ]
+    appointments = await call_store(get_data_store().get_appointments, customer_id)
     return {"customer_id": customer_id, "appointments": appointments}
 
 
 async def get_customer_orders(customer_id):
     """Get all orders for a customer."""
-    await simulate_delay("database")
+    await simulate_delay("database", "get_customer_orders")
 
-    orders = [o for o in MOCK_DATA["orders"] if o["customer_id"] == customer_id]
+    orders = await call_store(get_data_store().get_orders, customer_id)
     return {"customer_id": customer_id, "orders": orders}
 
 
-async def schedule_appointment(customer_id, date, service):
+async def get_customer_appointments_page(customer_id, before=None, limit=10):
+    """Get up to `limit` appointments older than the (date, id) key `before`, newest first.
+
+    Also returns totals over all the customer's appointments and how many
+    are older than `before`, so the caller knows what is left.
+    """
+    await simulate_delay("database", "get_customer_appointments")
+
+    store = get_data_store()
+    return await _page(
+        store.get_appointments_page, store.count_appointments, customer_id, before, limit
+    )
+
+
+async def get_customer_orders_page(customer_id, before=None, limit=10):
+    """Get up to `limit` orders older than the (date, id) key `before`, newest first.
+
+    Also returns totals over all the customer's orders and how many are
+    older than `before`, so the caller knows what is left.
+    """
+    await simulate_delay("database", "get_customer_orders")
+
+    store = get_data_store()
+    return await _page(store.get_orders_page, store.count_orders, customer_id, before, limit)
+
+
+async def _page(get_page, count, customer_id, before, limit):
+    rows = await call_store(get_page, customer_id, before, limit)
+    totals = await call_store(count, customer_id, None)
+    if before is not None:
+        totals_before = await call_store(count, customer_id, before)
+    else:
+        totals_before = totals
+    return {
+        "customer_id": customer_id,
+        "rows": rows,
+        "older": totals_before["count"],
+        "totals": totals,
+    }
+
+
+async def get_order_summary(customer_id=None):
+    """Get order totals for a customer, or for all orders."""
+    await simulate_delay("database", "get_order_summary")
+
+    store = get_data_store()
+    if customer_id is not None:
+        customer = await call_store(store.get_customer_by_id, customer_id)
+        if not customer:
+            return {"error": "Customer not found"}
+    summary = await call_store(store.order_summary, customer_id)
+    return {"customer_id": customer_id, **summary}
+
+
+async def schedule_appointment(
+    customer_id, date, service, duration_minutes=None, provider=None
+):
     """Schedule a new appointment."""
-    await simulate_delay("database")
+    await simulate_delay("database", "schedule_appointment")
 
     # Verify customer exists
     customer = await get_customer(customer_id=customer_id)
@@ -197,43 +477,70 @@ async def schedule_appointment(customer_id, date, service):
         return customer
 
     # Create new appointment
-    appointment_id = f"APT{len(MOCK_DATA['appointments']):04d}"
+    # The store allocates the id when it inserts, so concurrent bookings can't collide
     appointment = {
-        "id": appointment_id,
         "customer_id": customer_id,
         "customer_name": customer["name"],
         "date": date,
         "service": service,
         "status": "Scheduled",
     }
+    if duration_minutes:
+        appointment["duration_minutes"] = duration_minutes
+    if provider:
+        appointment["provider"] = provider
 
-    MOCK_DATA["appointments"].append(appointment)
-    return appointment
+    try:
+        return await call_store(get_data_store().book_appointment, appointment)
+    except ValueError as e:
+        # The store checks the date before writing anything
+        return {"error": str(e)}
 
 
-async def get_available_appointment_slots(start_date, end_date):
+async def get_available_appointment_slots(
+    start_date, end_date, duration_minutes=60, provider=None
+):
     """Get available appointment slots."""
-    await simulate_delay("database")
+    await simulate_delay("database", "get_available_appointment_slots")
 
     # Convert dates to datetime objects
     start = datetime.fromisoformat(start_date)
     end = datetime.fromisoformat(end_date)
+    duration = timedelta(minutes=duration_minutes)
 
-    # Generate available slots (9 AM to 5 PM, 1-hour slots)
-    slots = []
+    # Candidate slots: 9 AM to 5 PM, starting on the hour
+    candidates = {}
     current = start
     while current <= end:
         if current.hour >= 9 and current.hour < 17:
-            slot_time = current.isoformat()
-            # Check if slot is already taken
-            taken = any(a["date"] == slot_time for a in MOCK_DATA["appointments"])
-            if not taken:
-                slots.append(slot_time)
+            slot_start = to_seconds(current)
+            candidates[slot_start] = current.isoformat()
         current += timedelta(hours=1)
 
+    # Drop the ones that overlap an existing booking
+    length = duration.total_seconds()
+    free = await call_store(
+        get_data_store().slots.free_slots,
+        [(s, s + length) for s in candidates],
+        provider,
+    )
+    slots = [candidates[slot_start] for slot_start, _ in free]
+
     return {"available_slots": slots}
 
 
+# Canned lines; the client also plays cached recordings of these (common/audio_clips.py)
+FILLER_MESSAGES = {
+    "lookup": "Let me look that up for you...",
+    "general": "One moment please...",
+}
+FAREWELL_MESSAGES = {
+    "thanks": "Thank you for calling! Have a great day!",
+    "help": "I'm glad I could help! Have a wonderful day!",
+    "general": "Goodbye! Have a nice day!",
+}
+
+
 async def prepare_agent_filler_message(websocket, message_type):
     """
     Handle agent filler messages while maintaining proper function call protocol.
@@ -243,16 +550,10 @@ async def prepare_agent_filler_message(websocket, message_type):
     result = {"status": "queued", "message_type": message_type}
 
     # Prepare the inject message but don't send it yet
-    if message_type == "lookup":
-        inject_message = {
-            "type": "InjectAgentMessage",
-            "message": "Let me look that up for you...",
-        }
-    else:
-        inject_message = {
-            "type": "InjectAgentMessage",
-            "message": "One moment please...",
-        }
+    inject_message = {
+        "type": "InjectAgentMessage",
+        "message": FILLER_MESSAGES.get(message_type, FILLER_MESSAGES["general"]),
+    }
 
     # Return the result first - this becomes the function call response
     # The caller can then send the inject message after handling the function response
@@ -262,12 +563,7 @@ async def prepare_agent_filler_message(websocket, message_type):
 async def prepare_farewell_message(websocket, farewell_type):
     """End the conversation with an appropriate farewell message and close the connection."""
     # Prepare farewell message based on type
-    if farewell_type == "thanks":
-        message = "Thank you for calling! Have a great day!"
-    elif farewell_type == "help":
-        message = "I'm glad I could help! Have a wonderful day!"
-    else:  # general
-        message = "Goodbye! Have a nice day!"
+    message = FAREWELL_MESSAGES.get(farewell_type, FAREWELL_MESSAGES["general"])
 
     # Prepare messages but don't send them
     inject_message = {"type": "InjectAgentMessage", "message": message}
@@ -0,0 +1,178 @@
+"""Both sides of a call recorded to a stereo WAV (or FLAC) file.
+
+Writing the file from sender() or _play would put disk writes on the
+real-time audio paths. Instead they only hand their chunk to
+CallRecorder.record_uplink / record_downlink, which appends the buffer
+itself (bytes or a memoryview, not copied) and its arrival time to a deque.
+Each deque has one producer and the writer thread as its only consumer, so
+no lock is taken; a deque append is atomic. Producers must not reuse a
+buffer they handed over, the same contract as AudioIngest.
+
+The writer thread wakes every `flush_interval` seconds, places each chunk on
+a shared timeline by its arrival time (silence fills the gaps: the agent
+only sends audio while it talks), interleaves caller (left) and agent
+(right) and appends the block to the file in one large sequential write.
+It stays `lag` seconds behind real time so late chunks still land in place.
+
+Memory is bounded: a side whose queued audio reaches `max_buffered_seconds`
+drops new chunks and counts the bytes instead of blocking the audio path.
+"""
+
+import os
+import threading
+import time
+import wave
+from collections import deque
+
+try:
+    import soundfile
+except ImportError:
+    soundfile = None
+
+SAMPLE_WIDTH = 2  # linear16
+
+
+def _size(chunk):
+    return chunk.nbytes if isinstance(chunk, memoryview) else len(chunk)
+
+
+class _Channel:
+    """One side's chunks, pushed by one thread and drained by the writer."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._chunks = deque()
+        # Each counter has a single writing thread
+        self.pushed = 0
+        self.drained = 0
+        self.dropped = 0
+        self.buffer = bytearray()  # Writer-side audio not written yet
+
+    def push(self, chunk, now):
+        size = _size(chunk)
+        if self.pushed - self.drained + size > self.max_bytes:
+            self.dropped += size
+            return
+        self.pushed += size
+        self._chunks.append((now, chunk))
+
+    def drain(self, written, origin, rate):
+        """Move queued chunks onto the timeline, from sample `written` on."""
+        while self._chunks:
+            now, chunk = self._chunks.popleft()
+            size = _size(chunk)
+            self.drained += size
+            end = self.end(written)
+            # The chunk ends when it arrived; anything before it was silence
+            start = round((now - origin) * rate) - size // SAMPLE_WIDTH
+            if start > end:
+                self.buffer += bytes((start - end) * SAMPLE_WIDTH)
+            self.buffer += chunk
+
+    def end(self, written):
+        return written + len(self.buffer) // SAMPLE_WIDTH
+
+    def take(self, samples):
+        size = samples * SAMPLE_WIDTH
+        block = self.buffer[:size]
+        del self.buffer[:size]
+        if len(block) < size:
+            block += bytes(size - len(block))
+        return block
+
+
+class CallRecorder:
+    def __init__(
+        self,
+        path,
+        sample_rate,
+        max_buffered_seconds=10,
+        flush_interval=1.0,
+        lag=0.5,
+    ):
+        if path.endswith(".flac") and soundfile is None:
+            raise RuntimeError("FLAC recording requires the soundfile package")
+        self.path = path
+        self.sample_rate = sample_rate
+        self.flush_interval = flush_interval
+        self.lag = lag
+        max_bytes = int(max_buffered_seconds * sample_rate * SAMPLE_WIDTH)
+        self.uplink = _Channel(max_bytes)
+        self.downlink = _Channel(max_bytes)
+        self.written = 0  # Stereo frames in the file
+        self._origin = None
+        self._file = None
+        self._wave = None
+        self._closed = threading.Event()
+        self._thread = None
+
+    def start(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if self.path.endswith(".flac"):
+            self._file = soundfile.SoundFile(
+                self.path, "w", self.sample_rate, 2, subtype="PCM_16", format="FLAC"
+            )
+        else:
+            self._file = open(self.path, "wb", buffering=1 << 20)
+            self._wave = wave.open(self._file, "wb")
+            self._wave.setnchannels(2)
+            self._wave.setsampwidth(SAMPLE_WIDTH)
+            self._wave.setframerate(self.sample_rate)
+        self._origin = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="call-recorder", daemon=True)
+        self._thread.start()
+        return self
+
+    def record_uplink(self, chunk):
+        """Caller audio, from the path that sends it to the agent."""
+        if self._origin is not None and not self._closed.is_set():
+            self.uplink.push(chunk, time.monotonic())
+
+    def record_downlink(self, chunk):
+        """Agent audio, as it is played."""
+        if self._origin is not None and not self._closed.is_set():
+            self.downlink.push(chunk, time.monotonic())
+
+    def _run(self):
+        while not self._closed.wait(self.flush_interval):
+            horizon = round((time.monotonic() - self._origin - self.lag) * self.sample_rate)
+            self._write(horizon)
+
+    def _write(self, horizon):
+        for channel in (self.uplink, self.downlink):
+            channel.drain(self.written, self._origin, self.sample_rate)
+        frames = horizon - self.written
+        if frames <= 0:
+            return
+        left = self.uplink.take(frames)
+        right = self.downlink.take(frames)
+        block = bytearray(frames * 2 * SAMPLE_WIDTH)
+        block[0::4] = left[0::2]
+        block[1::4] = left[1::2]
+        block[2::4] = right[0::2]
+        block[3::4] = right[1::2]
+        if self._wave is not None:
+            self._wave.writeframesraw(block)
+        else:
+            self._file.buffer_write(block, dtype="int16")
+        self.written = horizon
+
+    def close(self):
+        """Write what is left and finish the file."""
+        if self._thread is None or self._closed.is_set():
+            return
+        self._closed.set()
+        self._thread.join()
+        for channel in (self.uplink, self.downlink):
+            channel.drain(self.written, self._origin, self.sample_rate)
+        self._write(max(self.uplink.end(self.written), self.downlink.end(self.written)))
+        if self._wave is not None:
+            self._wave.close()
+        self._file.close()
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "seconds": round(self.written / self.sample_rate, 2),
+            "dropped_bytes": {"uplink": self.uplink.dropped, "downlink": self.downlink.dropped},
+        }
@@ -0,0 +1,645 @@
+"""Compact columnar backend for the mock business dataset.
+
+Rows are stored as NumPy columns instead of one dict per row: repeated
+strings (service, status, provider) are interned into small lookup tables,
+unique strings (ids, phones, emails) are packed into a single UTF-8 blob,
+dates are int64 microseconds and totals are integer cents. Appointments and
+orders reference their customer by row number, so ``customer_name`` is not
+copied onto every row. Dict rows are only materialized when a lookup
+returns them.
+
+Requires NumPy, from requirements.txt or the ``columnar`` extra
+(``pip install -e ".[columnar]"``).
+"""
+
+import threading
+import zlib
+from collections import defaultdict
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(
+        'The columnar backend requires numpy: pip install -e ".[columnar]"'
+    ) from e
+
+from common.data_store import (
+    appointment_number,
+    count_rows,
+    newest_rows,
+    replay_logged_appointments,
+)
+from common.order_rollups import OrderRollups
+from common.slot_index import SlotIndex, appointment_interval
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_MICROS_PER_DAY = 86_400_000_000
+
+
+def to_micros(value):
+    """Convert an ISO string or naive datetime to int microseconds since the epoch."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def from_micros(value):
+    return (_EPOCH + timedelta(microseconds=int(value))).isoformat()
+
+
+class PackedStrings(Sequence):
+    """Immutable list of strings stored as one UTF-8 blob plus offsets.
+
+    Offsets are uint32 unless the blob outgrows 4 GiB.
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_list(cls, strings):
+        encoded = [s.encode("utf-8") for s in strings]
+        lengths = np.fromiter((len(e) for e in encoded), np.int64, len(encoded))
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        if offsets[-1] <= np.iinfo(np.uint32).max:
+            offsets = offsets.astype(np.uint32)
+        return cls(b"".join(encoded), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.blob[self.offsets[i] : self.offsets[i + 1]].decode("utf-8")
+
+    @property
+    def nbytes(self):
+        return len(self.blob) + self.offsets.nbytes
+
+
+class PatternStrings(Sequence):
+    """Strings that follow prefix + row number + suffix, stored as just the pattern.
+
+    Sequential ids, phones and emails of generated data cost no memory per row,
+    and lookups parse the row number back out of the value.
+    """
+
+    def __init__(self, prefix, count, width=0, suffix=""):
+        self.prefix = prefix
+        self.count = count
+        self.width = width
+        self.suffix = suffix
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        return f"{self.prefix}{int(i):0{self.width}d}{self.suffix}"
+
+    def find(self, value):
+        if not (value.startswith(self.prefix) and value.endswith(self.suffix)):
+            return None
+        digits = value[len(self.prefix) : len(value) - len(self.suffix)]
+        if not digits.isdigit():
+            return None
+        row = int(digits)
+        # Reject non-canonical spellings such as extra leading zeros
+        if row >= self.count or self[row] != value:
+            return None
+        return row
+
+    nbytes = 0
+
+
+class Categorical(Sequence):
+    """Low-cardinality string column: small integer codes into an interned table."""
+
+    def __init__(self, codes, values):
+        self.codes = codes
+        self.values = list(values)
+
+    @classmethod
+    def from_list(cls, strings, dtype=np.uint8):
+        table = {}
+        codes = np.fromiter(
+            (table.setdefault(s, len(table)) for s in strings), dtype, len(strings)
+        )
+        return cls(codes, table)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        return self.values[self.codes[i]]
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes
+
+
+class HashIndex:
+    """Sorted CRC32 keys mapping a string column back to row numbers.
+
+    Lookups are a binary search over a uint32 array followed by a check of
+    the candidate rows, so collisions are resolved without extra storage.
+    """
+
+    def __init__(self, column):
+        self.column = column
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in column), np.uint32, len(column)
+        )
+        self.rows = np.argsort(hashes, kind="stable").astype(np.int32)
+        self.keys = hashes[self.rows]
+
+    def find(self, value):
+        # Keep the key uint32 so searchsorted doesn't upcast the whole array
+        key = np.uint32(zlib.crc32(value.encode("utf-8")))
+        i = int(self.keys.searchsorted(key))
+        while i < len(self.keys) and self.keys[i] == key:
+            row = int(self.rows[i])
+            if self.column[row] == value:
+                return row
+            i += 1
+        return None
+
+    @property
+    def nbytes(self):
+        return self.keys.nbytes + self.rows.nbytes
+
+
+def string_index(column):
+    """Lookup index for a string column; pattern columns index themselves."""
+    if isinstance(column, PatternStrings):
+        return column
+    return HashIndex(column)
+
+
+class GroupIndex:
+    """CSR-style index from customer row to the rows that reference it."""
+
+    def __init__(self, rows, offsets):
+        self.rows = rows
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, customer_rows, customer_count):
+        rows = np.argsort(customer_rows, kind="stable").astype(np.int32)
+        offsets = np.searchsorted(
+            customer_rows[rows], np.arange(customer_count + 1)
+        ).astype(np.int64)
+        return cls(rows, offsets)
+
+    def get(self, customer_row):
+        return self.rows[self.offsets[customer_row] : self.offsets[customer_row + 1]]
+
+    @property
+    def nbytes(self):
+        return self.rows.nbytes + self.offsets.nbytes
+
+
+class RowView(Sequence):
+    """Read-only sequence that materializes dict rows on access."""
+
+    def __init__(self, length, materialize, extra=(), store=None):
+        self._length = length
+        self._materialize = materialize
+        self._extra = extra
+        self.store = store
+
+    def __len__(self):
+        return self._length + len(self._extra)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("row index out of range")
+        if i >= self._length:
+            return self._extra[i - self._length]
+        return self._materialize(i)
+
+
+class ColumnarSlotIndex:
+    """Booked slots as sorted NumPy start/end arrays per provider.
+
+    Bookings added after construction go to a regular SlotIndex, and a slot
+    is free only when both agree.
+    """
+
+    def __init__(self, starts, ends, providers, default_duration):
+        self.delta = SlotIndex()
+        self._bookings = {}
+        self._longest = {}
+        for code, provider in enumerate(providers.values):
+            mask = providers.codes == code
+            order = np.argsort(starts[mask], kind="stable")
+            s = starts[mask][order]
+            e = ends[mask][order]
+            self._bookings[provider] = (s, e)
+            self._longest[provider] = float((e - s).max()) if len(s) else 0.0
+        self.default_duration = default_duration
+
+    def add_appointment(self, appointment, interval=None):
+        self.delta.add_appointment(appointment, interval)
+
+    def overlapping(self, start, end, provider=None):
+        result = self.delta.overlapping(start, end, provider)
+        if provider in self._bookings:
+            s, e = self._bookings[provider]
+            lo = np.searchsorted(s, start - self._longest[provider], "right")
+            hi = np.searchsorted(s, end, "left")
+            mask = e[lo:hi] > start
+            result += list(zip(s[lo:hi][mask].tolist(), e[lo:hi][mask].tolist()))
+        return sorted(result)
+
+    def is_free(self, start, end, provider=None):
+        return not self.overlapping(start, end, provider)
+
+    def free_slots(self, candidates, provider=None):
+        candidates = self.delta.free_slots(candidates, provider)
+        if provider not in self._bookings:
+            return candidates
+        s, e = self._bookings[provider]
+        if not len(s):
+            return candidates
+        starts = np.array([c[0] for c in candidates], dtype=np.float64)
+        ends = np.array([c[1] for c in candidates], dtype=np.float64)
+        lo = np.searchsorted(s, starts - self._longest[provider], "right")
+        hi = np.searchsorted(s, ends, "left")
+        return [
+            candidate
+            for candidate, a, b in zip(candidates, lo, hi)
+            if a == b or e[a:b].max() <= candidate[0]
+        ]
+
+
+class ColumnarDataStore:
+    """Array-backed alternative to MockDataStore with the same lookup API."""
+
+    def __init__(self, customers, appointments, orders, group_indexes=None):
+        """Wrap prebuilt column dicts.
+
+        `group_indexes` may supply the (appointments, orders) GroupIndex pair,
+        e.g. loaded from disk, instead of sorting the customer columns again.
+        """
+        self.customer_columns = customers
+        self.appointment_columns = appointments
+        self.order_columns = orders
+
+        customer_count = len(customers["id"])
+        self._by_id = string_index(customers["id"])
+        self._by_phone = string_index(customers["phone"])
+        self._by_email = string_index(customers["email"])
+        if group_indexes is None:
+            group_indexes = (
+                GroupIndex.build(appointments["customer"], customer_count),
+                GroupIndex.build(orders["customer"], customer_count),
+            )
+        self._appointments_by_customer, self._orders_by_customer = group_indexes
+
+        # Rows written after the initial load stay as dicts
+        self._new_appointments = []
+        self._new_appointments_by_customer = defaultdict(list)
+        self._new_orders = []
+        self._new_orders_by_customer = defaultdict(list)
+        self._new_orders_by_id = {}
+        # Status changes to loaded orders; the columns may be read-only memory maps
+        self._order_status = {}
+        self._order_ids = None
+
+        self.customers = RowView(customer_count, self._customer_row, store=self)
+        self.appointments = RowView(
+            len(appointments["id"]),
+            self._appointment_row,
+            self._new_appointments,
+            store=self,
+        )
+        self.orders = RowView(
+            len(orders["id"]), self._order_row, self._new_orders, store=self
+        )
+
+        self._slots = None
+        self._rollups = None
+
+        self._write_lock = threading.Lock()
+        self._next_appointment_number = len(appointments["id"])
+        self.log = None
+
+    @classmethod
+    def from_rows(cls, data):
+        """Build the columns from the list-of-dicts layout of generate_mock_data()."""
+        customers = data["customers"]
+        row_of = {c["id"]: i for i, c in enumerate(customers)}
+        customer_columns = {
+            "id": PackedStrings.from_list([c["id"] for c in customers]),
+            "name": PackedStrings.from_list([c["name"] for c in customers]),
+            "phone": PackedStrings.from_list([c["phone"] for c in customers]),
+            "email": PackedStrings.from_list([c["email"] for c in customers]),
+            "joined_date": np.array(
+                [to_micros(c["joined_date"]) for c in customers], dtype=np.int64
+            ),
+        }
+
+        appointments = data["appointments"]
+        appointment_columns = {
+            "id": PackedStrings.from_list([a["id"] for a in appointments]),
+            "customer": np.array(
+                [row_of[a["customer_id"]] for a in appointments], dtype=np.int32
+            ),
+            "date": np.array(
+                [to_micros(a["date"]) for a in appointments], dtype=np.int64
+            ),
+            "service": Categorical.from_list([a["service"] for a in appointments]),
+            "status": Categorical.from_list([a["status"] for a in appointments]),
+            "duration_minutes": np.array(
+                [a.get("duration_minutes") or 0 for a in appointments],
+                dtype=np.int16,
+            ),
+            "provider": Categorical.from_list(
+                [a.get("provider") for a in appointments], np.int16
+            ),
+        }
+
+        orders = data["orders"]
+        order_columns = {
+            "id": PackedStrings.from_list([o["id"] for o in orders]),
+            "customer": np.array(
+                [row_of[o["customer_id"]] for o in orders], dtype=np.int32
+            ),
+            "date": np.array([to_micros(o["date"]) for o in orders], dtype=np.int64),
+            "items": np.array([o["items"] for o in orders], dtype=np.uint8),
+            "total_cents": np.array(
+                [round(o["total"] * 100) for o in orders], dtype=np.int32
+            ),
+            "status": Categorical.from_list([o["status"] for o in orders]),
+        }
+        return cls(customer_columns, appointment_columns, order_columns)
+
+    def _customer_row(self, i):
+        c = self.customer_columns
+        return {
+            "id": c["id"][i],
+            "name": c["name"][i],
+            "phone": c["phone"][i],
+            "email": c["email"][i],
+            "joined_date": from_micros(c["joined_date"][i]),
+        }
+
+    def _appointment_row(self, i):
+        a = self.appointment_columns
+        customer = int(a["customer"][i])
+        row = {
+            "id": a["id"][i],
+            "customer_id": self.customer_columns["id"][customer],
+            "customer_name": self.customer_columns["name"][customer],
+            "date": from_micros(a["date"][i]),
+            "service": a["service"][i],
+            "status": a["status"][i],
+        }
+        if a["duration_minutes"][i]:
+            row["duration_minutes"] = int(a["duration_minutes"][i])
+        provider = a["provider"][i]
+        if provider is not None:
+            row["provider"] = provider
+        return row
+
+    def _order_row(self, i):
+        o = self.order_columns
+        customer = int(o["customer"][i])
+        return {
+            "id": o["id"][i],
+            "customer_id": self.customer_columns["id"][customer],
+            "customer_name": self.customer_columns["name"][customer],
+            "date": from_micros(o["date"][i]),
+            "items": int(o["items"][i]),
+            "total": int(o["total_cents"][i]) / 100,
+            "status": self._order_status.get(i) or o["status"][i],
+        }
+
+    def get_customer_by_id(self, customer_id):
+        row = self._by_id.find(customer_id)
+        return None if row is None else self._customer_row(row)
+
+    def get_customer_by_phone(self, phone):
+        row = self._by_phone.find(phone)
+        return None if row is None else self._customer_row(row)
+
+    def get_customer_by_email(self, email):
+        row = self._by_email.find(email)
+        return None if row is None else self._customer_row(row)
+
+    def get_appointments(self, customer_id):
+        """Return the appointments for a customer, oldest booking first."""
+        row = self._by_id.find(customer_id)
+        if row is None:
+            return []
+        appointments = [
+            self._appointment_row(int(i))
+            for i in self._appointments_by_customer.get(row)
+        ]
+        return appointments + self._new_appointments_by_customer.get(customer_id, [])
+
+    def get_orders(self, customer_id):
+        """Return the orders for a customer, oldest order first."""
+        row = self._by_id.find(customer_id)
+        if row is None:
+            return []
+        orders = [self._order_row(int(i)) for i in self._orders_by_customer.get(row)]
+        return orders + self._new_orders_by_customer.get(customer_id, [])
+
+    # Pages are cut from the customer's materialized rows, which are few next
+    # to the dataset; only the SQLite backend pages in the query
+
+    def get_appointments_page(self, customer_id, before=None, limit=10):
+        return newest_rows(self.get_appointments(customer_id), before, limit)
+
+    def get_orders_page(self, customer_id, before=None, limit=10):
+        return newest_rows(self.get_orders(customer_id), before, limit)
+
+    def count_appointments(self, customer_id, before=None):
+        return count_rows(self.get_appointments(customer_id), before)
+
+    def count_orders(self, customer_id, before=None):
+        return count_rows(self.get_orders(customer_id), before, "total")
+
+    def order_summary(self, customer_id=None):
+        """Order totals for a customer (or all orders), from the rollups."""
+        return self.order_rollups.summary(customer_id)
+
+    def add_order(self, order):
+        """Store a new order (kept as a dict) and update the rollups."""
+        with self._write_lock:
+            self._new_orders.append(order)
+            self._new_orders_by_customer[order["customer_id"]].append(order)
+            self._new_orders_by_id[order["id"]] = order
+            if self._rollups is not None:
+                self._rollups.add(order)
+        return order
+
+    def update_order_status(self, order_id, status):
+        """Change an order's status; returns the order, or None if there is none."""
+        with self._write_lock:
+            order = self._new_orders_by_id.get(order_id)
+            if order is not None:
+                old = dict(order)
+                order["status"] = status
+            else:
+                if self._order_ids is None:
+                    self._order_ids = string_index(self.order_columns["id"])
+                row = self._order_ids.find(order_id)
+                if row is None:
+                    return None
+                old = self._order_row(row)
+                self._order_status[row] = status
+                order = self._order_row(row)
+            if self._rollups is not None and old["status"] != status:
+                self._rollups.replace(old, order)
+        return order
+
+    def attach_log(self, log):
+        """Replay the bookings in a WriteAheadLog, then log new bookings to it.
+
+        Returns the number of unreadable records skipped.
+        """
+        skipped = replay_logged_appointments(self, log)
+        self.log = log
+        return skipped
+
+    def add_appointment(self, appointment):
+        """Store an appointment that already has an id and update the indexes.
+
+        Raises ValueError, storing nothing, if its date or duration is invalid.
+        """
+        interval = appointment_interval(appointment)
+        with self._write_lock:
+            self._insert_appointment(appointment, interval)
+        return appointment
+
+    def book_appointment(self, fields):
+        """Allocate the next APT id for a new appointment and store it atomically.
+
+        The date is checked before anything is logged or stored, so an invalid
+        one raises ValueError and leaves the store and the log untouched.
+        """
+        interval = appointment_interval(fields)
+        with self._write_lock:
+            appointment = {"id": f"APT{self._next_appointment_number:04d}", **fields}
+            if self.log is not None:
+                self.log.append(appointment)
+            self._insert_appointment(appointment, interval)
+        return appointment
+
+    def _insert_appointment(self, appointment, interval):
+        if self._slots is not None:
+            self._slots.add_appointment(appointment, interval)
+        self._new_appointments.append(appointment)
+        self._new_appointments_by_customer[appointment["customer_id"]].append(
+            appointment
+        )
+        self._next_appointment_number = max(
+            self._next_appointment_number,
+            appointment_number(appointment["id"]) + 1,
+        )
+
+    @property
+    def slots(self):
+        """Slot availability index, built on first use from the date columns."""
+        if self._slots is None:
+            a = self.appointment_columns
+            booked = np.asarray(
+                [status != "Cancelled" for status in a["status"].values], dtype=bool
+            )[a["status"].codes]
+            default = SlotIndex().default_duration
+            starts = a["date"][booked] / 1e6
+            durations = a["duration_minutes"][booked].astype(np.float64) * 60
+            durations[durations == 0] = default
+            providers = Categorical(a["provider"].codes[booked], a["provider"].values)
+            self._slots = ColumnarSlotIndex(
+                starts, starts + durations, providers, default
+            )
+            for appointment in self._new_appointments:
+                self._slots.add_appointment(appointment)
+        return self._slots
+
+    @property
+    def order_rollups(self):
+        """OrderRollups, built on first use by aggregating the order columns."""
+        with self._write_lock:
+            if self._rollups is None:
+                self._rollups = self._build_rollups()
+        return self._rollups
+
+    def _build_rollups(self):
+        o = self.order_columns
+        ids = self.customer_columns["id"]
+        n = len(ids)
+        customer = o["customer"].astype(np.int64)
+        cents = o["total_cents"].astype(np.int64)
+        status = o["status"]
+        k = len(status.values)
+        counts = np.bincount(customer, minlength=n)
+        totals = np.bincount(customer, weights=cents, minlength=n)
+        by_status = np.bincount(
+            customer * k + status.codes, minlength=n * k
+        ).reshape(n, k)
+
+        # Per-day buckets, only for the days the windows can reach
+        rollups = OrderRollups()
+        horizon = rollups._horizon()
+        days = o["date"] // _MICROS_PER_DAY + _EPOCH.toordinal()
+        recent = days >= horizon
+        span = int(days[recent].max()) - horizon + 1 if recent.any() else 1
+        keys, inverse, day_counts = np.unique(
+            customer[recent] * span + (days[recent] - horizon),
+            return_inverse=True,
+            return_counts=True,
+        )
+        day_cents = np.bincount(inverse, weights=cents[recent])
+        by_day = defaultdict(dict)
+        for key, count, total in zip(keys.tolist(), day_counts.tolist(), day_cents.tolist()):
+            by_day[key // span][horizon + key % span] = (count, round(total))
+
+        for row in np.flatnonzero(counts).tolist():
+            rollups.load(
+                ids[row],
+                int(counts[row]),
+                round(totals[row]),
+                {status.values[j]: int(c) for j, c in enumerate(by_status[row]) if c},
+                by_day.get(row, {}),
+            )
+        # Writes made before the first summary
+        for row in self._order_status:
+            order = self._order_row(row)
+            rollups.replace({**order, "status": status[row]}, order)
+        for order in self._new_orders:
+            rollups.add(order)
+        return rollups
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the columns and indexes."""
+        total = 0
+        for columns in (
+            self.customer_columns,
+            self.appointment_columns,
+            self.order_columns,
+        ):
+            total += sum(column.nbytes for column in columns.values())
+        for index in (
+            self._by_id,
+            self._by_phone,
+            self._by_email,
+            self._appointments_by_customer,
+            self._orders_by_customer,
+        ):
+            total += index.nbytes
+        return total
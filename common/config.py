@@ -4,6 +4,14 @@ ARTIFICIAL_DELAY = {
     "heavy_computation": 0.0 # Not in use in this reference implementation but left as an example for simulating different delays
 }
 
+# Random latency instead of the fixed delays above (see common/latency.py for the distributions).
+# Keys are a delay type, or "<delay type>:<function>" to override it for one function, e.g.
+#   "database": {"distribution": "lognormal", "median": 0.05, "sigma": 0.5},
+#   "database:get_customer_orders": {"distribution": "heavy_tail", "median": 0.05, "sigma": 0.25,
+#                                    "spike_probability": 0.02, "spike": 0.5},
+LATENCY_PROFILES = {}
+LATENCY_SEED = None  # Set to an int to make the sampled delays repeatable
+
 
 # Mock data settings
 MOCK_DATA_SIZE = {
@@ -11,10 +19,115 @@ MOCK_DATA_SIZE = {
     "appointments": 500,
     "orders": 2000
 }
+MOCK_DATA_SEED = 42  # Same seed and day always produce the same dataset
+MOCK_DATA_SNAPSHOT = True  # Reuse a binary snapshot in mock_data_outputs/ instead of regenerating on every start
+MOCK_DATA_JSON_DUMP = True  # Also write a readable JSON copy (in the background, off the startup path)
+
+# Data backend used by common.business_logic:
+# - "memory": lists of dicts with hash indexes (common/data_store.py)
+# - "columnar": NumPy column store with interned strings (common/columnar_store.py), requires numpy
+#   (in requirements.txt, or the "columnar" extra: pip install -e ".[columnar]")
+DATA_BACKEND = "memory"
+
+# Write-ahead log of new appointments for the in-memory backends, replayed at startup
+# so bookings survive restarts. The SQLite backend is durable on its own and ignores this.
+APPOINTMENT_LOG = {
+    "path": "mock_data_outputs/appointments.wal",
+    "enable": False,
+    "fsync": False  # fsync every booking; survives power loss but adds disk latency to each booking
+}
 
-# Database settings (if using SQLite)
-# Not in use in this reference implementation but left as an example for how to potentially integrate with a DB
+# Database settings (if using SQLite, see common/sqlite_store.py)
+# An empty database is seeded from the mock data on first use
 DATABASE_CONFIG = {
     "path": "business_data.db",
-    "enable": False  # Set to True to use actual SQLite instead of mock data
-} 
\ No newline at end of file
+    "enable": False,  # Set to True to use actual SQLite instead of mock data
+    "pool_size": 4  # Connections (and threads) serving queries off the event loop
+}
+
+# Full-text search over the documentation for the search_documentation function
+# (see common/doc_search.py). The index is saved to `index_path` and only changed
+# files are re-indexed on later starts.
+DOC_SEARCH = {
+    "index_path": "mock_data_outputs/doc_search.index",
+    "top_k": 3,
+    "max_passage_chars": 600  # Passages returned to the agent are trimmed to this length
+}
+
+# Paged responses of get_orders / get_appointments (see common/pagination.py). Everything a
+# function returns goes into the LLM's context, so large accounts are returned a page at a time.
+FUNCTION_RESPONSE = {
+    "page_size": 10,  # Rows per page when the agent doesn't ask for a limit
+    "max_page_size": 50,
+    "max_bytes": 4000  # A page stops early once its rows would encode to more than this
+}
+
+# Order totals kept current on every write (see common/order_rollups.py) for the
+# get_order_summary function: all-time, plus these last-N-days windows
+ORDER_ROLLUPS = {
+    "windows": [7, 30, 90]
+}
+
+# Recordings of the greeting and the canned filler/farewell lines (see common/audio_clips.py),
+# keyed by text, voice and sample rate. A cached greeting is played by the client as the
+# session starts instead of being synthesized by the agent again; when a function call takes
+# longer than `filler_after` seconds the cached filler is played while the caller waits.
+AUDIO_CLIPS = {
+    "enable": True,
+    "directory": "mock_data_outputs/audio_clips",
+    "filler_after": 0.7,
+    "prefetch": True  # Synthesize the fillers once with the Deepgram TTS API at startup
+}
+
+# Per-session conversation record (see common/transcripts.py): the last `recent_turns`
+# turns are kept in memory and every turn is appended, in batches, to a gzipped JSONL file.
+# /transcripts/<session id> streams a transcript back as NDJSON.
+TRANSCRIPTS = {
+    "enable": True,
+    # Serve /transcripts. Requests must also send "Authorization: Bearer <token>"
+    # with the token from the TRANSCRIPTS_TOKEN environment variable
+    "export": False,
+    "directory": "mock_data_outputs/transcripts",
+    "recent_turns": 50,
+    "batch_size": 64,  # Turns per write; a batch is also written after `flush_interval` seconds
+    "flush_interval": 1.0,
+    "compresslevel": 6
+}
+
+# Recording of both sides of each call for QA (see common/call_recorder.py): caller on the
+# left channel, agent on the right. "flac" requires the soundfile package.
+CALL_RECORDING = {
+    "enable": False,
+    "directory": "mock_data_outputs/recordings",
+    "format": "wav",
+    "max_buffered_seconds": 10,  # Per side; audio beyond this is dropped (and counted) rather than queued
+    "flush_interval": 1.0  # Seconds of audio per file write
+}
+
+# Cache of the aura-2 voices listed by /tts-models (see common/tts_models.py).
+# After `ttl` seconds the cached list is still served while it is refreshed in the background.
+TTS_MODELS_CACHE = {
+    "ttl": 300,
+    "connect_timeout": 3.05,
+    "read_timeout": 10
+}
+
+# Multi-process server started by serve.py (`python client.py` stays single-process).
+# Workers listen on worker_base_port + index behind a front end on `port` that keeps
+# each Socket.IO session on one worker. "local://" runs a built-in message queue broker;
+# a "redis://" or "amqp://" URL uses that service instead.
+SERVER_CONFIG = {
+    "host": "127.0.0.1",
+    "port": 5000,
+    "workers": 0,  # 0 = one per CPU core
+    "worker_base_port": 5100,
+    "message_queue": "local://127.0.0.1:5570"
+}
+
+# Process pool for agent functions marked @cpu_bound (see common/cpu_pool.py), so CPU-heavy
+# work doesn't stall audio on the event loop. The "heavy_computation" delay (from
+# ARTIFICIAL_DELAY or LATENCY_PROFILES) is spent as CPU time inside the pool.
+CPU_POOL = {
+    "workers": 0,  # 0 = one per CPU core
+    "timeout": 10.0  # Seconds before a call gives up with an error
+}
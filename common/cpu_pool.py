@@ -0,0 +1,113 @@
+"""Shared process pool for CPU-bound agent functions.
+
+Agent functions run on the event loop that also moves the session's audio,
+and threads don't help with work that holds the GIL. A function decorated
+with @cpu_bound is written as a plain (synchronous) function and runs in a
+ProcessPoolExecutor shared by all sessions instead. The decorator returns
+a coroutine function taking the same keyword arguments, so it registers
+like any other agent function.
+
+Parameters go to the worker and results come back as compact JSON. These
+are the same JSON values the agent exchanges anyway, so anything else
+fails early. A call that runs past its timeout raises TimeoutError; if it
+had not started, it is cancelled.
+"""
+
+import asyncio
+import atexit
+import functools
+import importlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from common.config import CPU_POOL
+from common.latency import sample_delay
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _dumps(value):
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def get_cpu_pool():
+    """Return the shared pool, starting it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # Forking a process that runs audio and socket threads is unsafe;
+                # forkserver/spawn workers import what they need instead
+                methods = multiprocessing.get_all_start_methods()
+                method = "forkserver" if "forkserver" in methods else "spawn"
+                _pool = ProcessPoolExecutor(
+                    max_workers=CPU_POOL["workers"] or os.cpu_count(),
+                    mp_context=multiprocessing.get_context(method),
+                )
+                atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+    return _pool
+
+
+def _discard_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def simulate_cpu_work(seconds=None, function=None):
+    """Busy-loop for a "heavy_computation" delay (a CPU-bound stand-in)."""
+    if seconds is None:
+        seconds = sample_delay("heavy_computation", function)
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _run(module, name, payload):
+    """Worker side: look up the decorated function and call the original."""
+    function = getattr(importlib.import_module(module), name).__wrapped__
+    simulate_cpu_work(function=name)
+    return _dumps(function(**json.loads(payload)))
+
+
+def cpu_bound(timeout=None):
+    """Run a module-level function in the shared process pool.
+
+    `timeout` defaults to CPU_POOL["timeout"] seconds.
+    """
+
+    def decorator(function):
+        @functools.wraps(function)
+        async def wrapper(**params):
+            limit = CPU_POOL["timeout"] if timeout is None else timeout
+            pool = get_cpu_pool()
+            future = asyncio.get_running_loop().run_in_executor(
+                pool,
+                _run,
+                function.__module__,
+                function.__name__,
+                _dumps(params),
+            )
+            try:
+                result = await asyncio.wait_for(future, limit)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory); start a fresh pool next time
+                _discard_pool(pool)
+                raise
+            except asyncio.TimeoutError:
+                raise TimeoutError(
+                    f"{function.__name__} did not finish within {limit}s"
+                ) from None
+            return json.loads(result)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,317 @@
+"""Approximate customer lookup for identifiers heard over the phone.
+
+get_customer needs an exact phone, email or id, but speech-to-text gives
+"five five five one two three...", drops or mishears a digit, or spells an
+email out ("j dot smith at example dot com"). CustomerMatcher normalizes
+what was heard and looks it up in hash indexes built once over the
+customers:
+
+- phones by their last 10 digits, and by the last 4 ("ending in 4567")
+- emails, whole
+- names by lowercase token
+- customer ids by number, read like phone digits ("four two" and "forty
+  two" are both CUST0042)
+
+Near misses are found by generating every string one edit away from the
+query (a missing, extra, wrong or swapped character) and probing the hash
+index with each. Digits have 10 symbols and emails a few dozen, so that
+is at most a few thousand O(1) probes, whatever the number of customers.
+An n-gram index or BK-tree would instead have to walk long posting lists
+or many tree nodes at a million customers. Indexes hold customer row
+numbers, so rows are only materialized for the returned candidates.
+"""
+
+import re
+from collections import defaultdict
+
+DIGIT_WORDS = {
+    "zero": "0", "oh": "0", "o": "0", "one": "1", "two": "2", "three": "3",
+    "four": "4", "five": "5", "six": "6", "seven": "7", "eight": "8", "nine": "9",
+}
+TEEN_WORDS = {
+    "ten": "10", "eleven": "11", "twelve": "12", "thirteen": "13", "fourteen": "14",
+    "fifteen": "15", "sixteen": "16", "seventeen": "17", "eighteen": "18", "nineteen": "19",
+}
+TENS_WORDS = {
+    "twenty": "2", "thirty": "3", "forty": "4", "fifty": "5", "sixty": "6",
+    "seventy": "7", "eighty": "8", "ninety": "9",
+}
+# Only "<digit> hundred" is read; "a hundred", "eleven hundred" and larger
+# scales are left unconverted
+SCALE_WORDS = {"hundred", "thousand", "million", "billion"}
+REPEAT_WORDS = {"double": 2, "triple": 3}
+# "o" and "oh" are letters when an email is spelled out
+EMAIL_DIGIT_WORDS = {word: d for word, d in DIGIT_WORDS.items() if word not in ("o", "oh")}
+EMAIL_WORDS = {
+    "at": "@", "dot": ".", "period": ".", "underscore": "_", "dash": "-",
+    "hyphen": "-", "plus": "+",
+}
+
+# Scores for how a candidate matched; a caller is identified when the best
+# candidate reaches EXACT and no other does. A number with words that
+# couldn't be read scores at most ONE_EDIT, so it is never an identification.
+EXACT = 1.0
+ONE_EDIT = 0.8
+NAME = 0.6
+PHONE_SUFFIX = 0.4
+
+# Name tokens shared by more customers than this don't narrow the search
+MAX_POSTINGS = 5000
+
+_WORD = re.compile(r"[a-z]+|\d+|[^\sa-z\d]")
+
+
+def _unit(token):
+    """The digit a single-digit token stands for, or None."""
+    if token.isdigit():
+        return token if len(token) == 1 else None
+    return DIGIT_WORDS.get(token)
+
+
+def read_digits(text):
+    """Digits in `text` and whether every number word in it was read.
+
+    Reads digit words ("five five five", "double two"), teens and tens
+    ("twelve thirty four" is 1234, "forty" is 40) and "<digit> hundred"
+    ("four hundred five" is 405, but "eight hundred five five five" is
+    800555, read on digit by digit).
+    """
+    digits = []
+    repeat = 1
+    tens = None  # A tens word waiting for its unit: "forty" [two]
+    hundred = False  # "<digit> hundred" waiting for its last two digits
+    complete = True
+    tokens = _WORD.findall(text.lower())
+    for i, token in enumerate(tokens):
+        unit = _unit(token)
+        if tens is not None:
+            tens, pending = None, tens
+            if unit not in (None, "0") and repeat == 1:
+                digits.append(pending + unit)
+                continue
+            digits.append(pending + "0")
+        if hundred:
+            if token == "and":
+                continue
+            hundred = False
+            if token in TENS_WORDS:
+                tens = TENS_WORDS[token]
+                continue
+            # A unit ends the number unless more digits follow it
+            following = _unit(tokens[i + 1]) if i + 1 < len(tokens) else None
+            if unit is not None and (tokens[i - 1] == "and" or following is None):
+                digits.append("0" + unit)
+                continue
+            if token not in TEEN_WORDS:
+                digits.append("00")
+        if token in REPEAT_WORDS:
+            repeat = REPEAT_WORDS[token]
+            continue
+        if token.isdigit():
+            digits.append(token[0] * repeat + token[1:])
+        elif unit is not None:
+            digits.append(unit * repeat)
+        elif token in TEEN_WORDS:
+            digits.append(TEEN_WORDS[token])
+        elif token in TENS_WORDS:
+            tens = TENS_WORDS[token]
+        elif token == "hundred" and repeat == 1 and digits and len(digits[-1]) == 1:
+            hundred = True
+        elif token in SCALE_WORDS:
+            complete = False
+        repeat = 1
+    if tens is not None:
+        digits.append(tens + "0")
+    if hundred:
+        digits.append("00")
+    return "".join(digits), complete
+
+
+def spoken_digits(text):
+    """Digits in `text`, reading number words (see read_digits)."""
+    return read_digits(text)[0]
+
+
+def _phone_digits(digits):
+    # Drop the +1 country code so the key is the 10-digit number
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return digits
+
+
+def normalize_phone(text):
+    return _phone_digits(spoken_digits(text))
+
+
+def _uncertain(matches):
+    """Cap the scores of matches on a number that wasn't fully read."""
+    return [(row, min(score, ONE_EDIT)) for row, score in matches]
+
+
+def normalize_email(text):
+    """Join a spelled-out email: "j o h n dot smith at example dot com"."""
+    parts = []
+    for token in _WORD.findall(text.lower()):
+        parts.append(EMAIL_WORDS.get(token) or EMAIL_DIGIT_WORDS.get(token, token))
+    return "".join(parts)
+
+
+def name_tokens(text):
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def one_edit(word, alphabet):
+    """Every string one insertion, deletion, substitution or transposition away."""
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    for left, right in splits:
+        if right:
+            yield left + right[1:]
+            if len(right) > 1:
+                yield left + right[1] + right[0] + right[2:]
+            for c in alphabet:
+                if c != right[0]:
+                    yield left + c + right[1:]
+        for c in alphabet:
+            yield left + c + right
+
+
+class CustomerMatcher:
+    def __init__(self, customers):
+        self.customers = customers
+        self._phones = {}
+        self._phone_suffixes = defaultdict(list)
+        self._emails = {}
+        self._domains = set()
+        self._names = defaultdict(list)
+        self._ids = {}
+        local_chars = set()
+        for row, customer in enumerate(customers):
+            phone = normalize_phone(customer["phone"])
+            self._phones[phone] = row
+            self._phone_suffixes[phone[-4:]].append(row)
+            email = customer["email"].lower()
+            self._emails[email] = row
+            local, _, domain = email.rpartition("@")
+            local_chars.update(local)
+            self._domains.add(domain)
+            for token in set(name_tokens(customer["name"])):
+                self._names[token].append(row)
+            number = re.sub(r"\D", "", customer["id"])
+            if number:
+                self._ids[int(number)] = row
+        self._local_alphabet = "".join(sorted(local_chars))
+        self._domain_alphabet = "".join(sorted({c for d in self._domains for c in d}))
+        self._name_alphabet = "".join(sorted({c for token in self._names for c in token}))
+
+    def _probe(self, index, key, alphabet, suffix="", always=False):
+        """(row, score) for an exact hit on key + suffix and, when there is
+        none (or `always`), for every key one edit away."""
+        exact = index.get(key + suffix)
+        if exact is not None and not always:
+            return [(exact, EXACT)]
+        hits = {}
+        for variant in one_edit(key, alphabet):
+            row = index.get(variant + suffix)
+            if row is not None:
+                hits[row] = ONE_EDIT
+        if exact is not None:
+            hits[exact] = EXACT
+        return list(hits.items())
+
+    def match_phone(self, text):
+        digits, complete = read_digits(text)
+        digits = _phone_digits(digits)
+        if 9 <= len(digits) <= 11:
+            # Neighbours too: a misheard digit can land on another real number,
+            # and the heard name or email then tells the two apart
+            matches = self._probe(self._phones, digits, "0123456789", always=True)
+            return matches if complete else _uncertain(matches)
+        if len(digits) == 4:
+            return [(row, PHONE_SUFFIX) for row in self._phone_suffixes.get(digits, ())]
+        return []
+
+    def match_email(self, text):
+        email = normalize_email(text)
+        row = self._emails.get(email)
+        if row is not None:
+            return [(row, EXACT)]
+        local, _, domain = email.rpartition("@")
+        if not local:
+            return []
+        if domain not in self._domains:
+            # Few distinct domains: fix the domain first, then only edit the local part
+            domain = next(
+                (d for d in one_edit(domain, self._domain_alphabet) if d in self._domains),
+                None,
+            )
+            if domain is None:
+                return []
+            row = self._emails.get(f"{local}@{domain}")
+            if row is not None:
+                return [(row, ONE_EDIT)]
+        return self._probe(self._emails, local, self._local_alphabet, "@" + domain)
+
+    def match_customer_id(self, text):
+        digits, complete = read_digits(text)
+        row = self._ids.get(int(digits)) if digits else None
+        if row is None:
+            return []
+        return [(row, EXACT)] if complete else _uncertain([(row, EXACT)])
+
+    def match_name(self, text):
+        """Customers whose name has every token (each allowing one typo).
+
+        Tokens shared by more than MAX_POSTINGS customers are skipped.
+        """
+        postings = []
+        for token in name_tokens(text):
+            rows = self._names.get(token)
+            if rows is None:
+                rows = [
+                    row
+                    for variant in one_edit(token, self._name_alphabet)
+                    for row in self._names.get(variant, ())
+                ]
+            if not rows:
+                return []
+            if len(rows) <= MAX_POSTINGS:
+                postings.append(rows)
+        if not postings:
+            return []
+        postings.sort(key=len)
+        matches = set(postings[0]).intersection(*postings[1:])
+        return [(row, NAME) for row in matches]
+
+    def match(self, phone=None, email=None, name=None, customer_id=None, limit=5):
+        """Ranked [(score, customer, matched fields)], best first.
+
+        Scores from different fields add up, so a candidate matching both
+        the heard name and phone outranks one matching either. A candidate
+        found through a partly read number stays below EXACT unless another
+        field matched it exactly.
+        """
+        scores = defaultdict(float)
+        matched = defaultdict(list)
+        exact = set()  # Rows with an EXACT match on a field that was read in full
+        partly_read = set()  # Rows matched on a number with unread words
+        for field, text, matcher in (
+            ("phone", phone, self.match_phone),
+            ("email", email, self.match_email),
+            ("name", name, self.match_name),
+            ("customer_id", customer_id, self.match_customer_id),
+        ):
+            if not text:
+                continue
+            complete = field not in ("phone", "customer_id") or read_digits(text)[1]
+            for row, score in matcher(text):
+                scores[row] += score
+                matched[row].append(field)
+                if not complete:
+                    partly_read.add(row)
+                elif score >= EXACT:
+                    exact.add(row)
+        # Other fields agreeing doesn't make a partly read number an identification
+        for row in partly_read - exact:
+            scores[row] = min(scores[row], ONE_EDIT)
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(score, self.customers[row], matched[row]) for row, score in best]
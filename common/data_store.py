@@ -0,0 +1,223 @@
+import asyncio
+import heapq
+import threading
+from collections import Counter, defaultdict
+
+from common.order_rollups import OrderRollups
+from common.slot_index import SlotIndex, appointment_interval
+
+
+async def call_store(method, *args):
+    """Await a data store call, running it on the store's executor if it has one.
+
+    Stores that block on I/O (the SQLite backend) expose an `executor`;
+    in-memory stores are called inline since their lookups are O(1).
+    """
+    executor = getattr(method.__self__, "executor", None)
+    if executor is None:
+        return method(*args)
+    return await asyncio.get_running_loop().run_in_executor(executor, method, *args)
+
+
+def appointment_number(appointment_id):
+    """Return N for an id of the form APT<N>, or -1 for any other id."""
+    digits = appointment_id[3:]
+    if appointment_id.startswith("APT") and digits.isdigit():
+        return int(digits)
+    return -1
+
+
+def replay_logged_appointments(store, log):
+    """Add the bookings in a WriteAheadLog to `store`; returns how many were skipped.
+
+    A record with an invalid date (logged before bookings were checked up
+    front) is skipped rather than failing every startup.
+    """
+    skipped = 0
+    for appointment in log.replay():
+        try:
+            store.add_appointment(appointment)
+        except (KeyError, TypeError, ValueError):
+            skipped += 1
+    return skipped
+
+
+def _row_key(row):
+    return (row["date"], row["id"])
+
+
+def newest_rows(rows, before=None, limit=10):
+    """Up to `limit` of `rows`, newest first, that sort before the (date, id) key `before`."""
+    if before is not None:
+        before = tuple(before)
+        rows = (row for row in rows if _row_key(row) < before)
+    return heapq.nlargest(limit, rows, key=_row_key)
+
+
+def count_rows(rows, before=None, amount_field=None):
+    """Count, status counts and date range of the rows before the key `before` (all if None)."""
+    if before is not None:
+        before = tuple(before)
+        rows = [row for row in rows if _row_key(row) < before]
+    totals = {
+        "count": len(rows),
+        "by_status": dict(Counter(row.get("status") for row in rows)),
+    }
+    if rows:
+        dates = [row["date"] for row in rows]
+        totals["oldest_date"] = min(dates)
+        totals["newest_date"] = max(dates)
+    if amount_field:
+        totals[f"{amount_field}_sum"] = round(sum(row.get(amount_field, 0) for row in rows), 2)
+    return totals
+
+
+class MockDataStore:
+    """In-memory data access layer over the mock dataset.
+
+    Keeps hash indexes by customer id, phone and email, plus per-customer
+    secondary indexes for appointments and orders, so every lookup is O(1)
+    regardless of the dataset size. Booked appointment times are kept in a
+    SlotIndex for availability range queries. The underlying lists are shared
+    with the original data dict, so existing readers still see every row.
+
+    New appointments go through book_appointment(), which allocates the id
+    and applies the insert under one lock, so concurrent sessions (each on
+    its own event loop thread) never share an id. With a WriteAheadLog
+    attached, each booking is logged before it is applied.
+
+    Order writes (add_order, update_order_status) also update the
+    OrderRollups behind order_summary(), so aggregates never need a scan.
+    """
+
+    def __init__(self, data):
+        self.customers = data["customers"]
+        self.appointments = data["appointments"]
+        self.orders = data["orders"]
+
+        self._customers_by_id = {}
+        self._customers_by_phone = {}
+        self._customers_by_email = {}
+        self._appointments_by_customer = defaultdict(list)
+        self._orders_by_customer = defaultdict(list)
+        self._orders_by_id = {}
+        self.slots = SlotIndex()
+
+        for customer in self.customers:
+            self._index_customer(customer)
+        for appointment in self.appointments:
+            self._appointments_by_customer[appointment["customer_id"]].append(
+                appointment
+            )
+        self.slots.add_appointments(self.appointments)
+        for order in self.orders:
+            self._orders_by_customer[order["customer_id"]].append(order)
+            self._orders_by_id[order["id"]] = order
+        self.order_rollups = OrderRollups.from_orders(self.orders)
+
+        self._write_lock = threading.Lock()
+        self._next_appointment_number = len(self.appointments)
+        self.log = None
+
+    def _index_customer(self, customer):
+        self._customers_by_id[customer["id"]] = customer
+        self._customers_by_phone[customer["phone"]] = customer
+        self._customers_by_email[customer["email"]] = customer
+
+    def get_customer_by_id(self, customer_id):
+        return self._customers_by_id.get(customer_id)
+
+    def get_customer_by_phone(self, phone):
+        return self._customers_by_phone.get(phone)
+
+    def get_customer_by_email(self, email):
+        return self._customers_by_email.get(email)
+
+    def get_appointments(self, customer_id):
+        """Return the appointments for a customer, oldest booking first."""
+        return list(self._appointments_by_customer.get(customer_id, ()))
+
+    def get_orders(self, customer_id):
+        """Return the orders for a customer, oldest order first."""
+        return list(self._orders_by_customer.get(customer_id, ()))
+
+    def get_appointments_page(self, customer_id, before=None, limit=10):
+        """Up to `limit` of a customer's appointments, newest first, before the key `before`."""
+        return newest_rows(self._appointments_by_customer.get(customer_id, ()), before, limit)
+
+    def get_orders_page(self, customer_id, before=None, limit=10):
+        """Up to `limit` of a customer's orders, newest first, before the key `before`."""
+        return newest_rows(self._orders_by_customer.get(customer_id, ()), before, limit)
+
+    def count_appointments(self, customer_id, before=None):
+        return count_rows(self._appointments_by_customer.get(customer_id, ()), before)
+
+    def count_orders(self, customer_id, before=None):
+        return count_rows(self._orders_by_customer.get(customer_id, ()), before, "total")
+
+    def order_summary(self, customer_id=None):
+        """Order totals for a customer (or all orders), from the rollups."""
+        return self.order_rollups.summary(customer_id)
+
+    def add_order(self, order):
+        """Store a new order and update the indexes and rollups."""
+        with self._write_lock:
+            self.orders.append(order)
+            self._orders_by_customer[order["customer_id"]].append(order)
+            self._orders_by_id[order["id"]] = order
+            self.order_rollups.add(order)
+        return order
+
+    def update_order_status(self, order_id, status):
+        """Change an order's status; returns the order, or None if there is none."""
+        with self._write_lock:
+            order = self._orders_by_id.get(order_id)
+            if order is not None and order["status"] != status:
+                old = dict(order)
+                order["status"] = status
+                self.order_rollups.replace(old, order)
+        return order
+
+    def attach_log(self, log):
+        """Replay the bookings in a WriteAheadLog, then log new bookings to it.
+
+        Returns the number of unreadable records skipped.
+        """
+        skipped = replay_logged_appointments(self, log)
+        self.log = log
+        return skipped
+
+    def add_appointment(self, appointment):
+        """Store an appointment that already has an id and update the indexes.
+
+        Raises ValueError, storing nothing, if its date or duration is invalid.
+        """
+        interval = appointment_interval(appointment)
+        with self._write_lock:
+            self._insert_appointment(appointment, interval)
+        return appointment
+
+    def book_appointment(self, fields):
+        """Allocate the next APT id for a new appointment and store it atomically.
+
+        The date is checked before anything is logged or stored, so an invalid
+        one raises ValueError and leaves the store and the log untouched.
+        """
+        interval = appointment_interval(fields)
+        with self._write_lock:
+            appointment = {"id": f"APT{self._next_appointment_number:04d}", **fields}
+            if self.log is not None:
+                self.log.append(appointment)
+            self._insert_appointment(appointment, interval)
+        return appointment
+
+    def _insert_appointment(self, appointment, interval):
+        self.slots.add_appointment(appointment, interval)
+        self.appointments.append(appointment)
+        self._appointments_by_customer[appointment["customer_id"]].append(
+            appointment
+        )
+        self._next_appointment_number = max(
+            self._next_appointment_number,
+            appointment_number(appointment["id"]) + 1,
+        )
@@ -0,0 +1,200 @@
+"""In-memory BM25 full-text index over the documentation corpus.
+
+Documents from a DocumentationCache are split into passages (by heading and
+paragraph, merged up to PASSAGE_CHARS) and indexed in an inverted index of
+term -> {passage id: term frequency}. The index tracks each document's
+mtime and size, so update() re-indexes only added, changed or removed
+files, and it can be pickled to disk so later starts skip indexing.
+"""
+
+import heapq
+import math
+import os
+import pickle
+import re
+import threading
+from collections import Counter, defaultdict
+
+from common.documentation import DOCS_DIR, get_documentation_cache
+
+PASSAGE_CHARS = 800
+INDEX_FORMAT_VERSION = 1
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_HEADING_RE = re.compile(r"^#{1,6}\s", re.MULTILINE)
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from how i if in into is it "
+    "its me my not of on or our so that the their them then there these this "
+    "to was we what when where which who why will with you your".split()
+)
+
+
+def tokenize(text):
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def split_passages(text, max_chars=PASSAGE_CHARS):
+    """Split a document into passages at headings and blank lines."""
+    passages = []
+    for section in _HEADING_RE.split(text):
+        current = ""
+        for paragraph in re.split(r"\n\s*\n", section):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if current and len(current) + len(paragraph) > max_chars:
+                passages.append(current)
+                current = ""
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+        if current:
+            passages.append(current)
+    return passages
+
+
+class DocumentSearchIndex:
+    """BM25 (k1=1.5, b=0.75) passage search with incremental updates."""
+
+    k1 = 1.5
+    b = 0.75
+
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.passages = {}  # passage id -> (topic, text, length)
+        self.topic_passages = {}  # topic -> [passage ids]
+        self.signatures = {}  # topic -> (mtime_ns, size) when indexed
+        self.total_length = 0
+        self.next_passage_id = 0
+        self.docs_version = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["postings"] = dict(self.postings)
+        return state
+
+    def __setstate__(self, state):
+        state["postings"] = defaultdict(dict, state["postings"])
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def add_document(self, topic, text):
+        ids = []
+        for passage in split_passages(text):
+            counts = Counter(tokenize(passage))
+            if not counts:
+                continue
+            passage_id = self.next_passage_id
+            self.next_passage_id += 1
+            length = sum(counts.values())
+            self.passages[passage_id] = (topic, passage, length)
+            self.total_length += length
+            for term, tf in counts.items():
+                self.postings[term][passage_id] = tf
+            ids.append(passage_id)
+        self.topic_passages[topic] = ids
+
+    def remove_document(self, topic):
+        for passage_id in self.topic_passages.pop(topic, ()):
+            _, passage, length = self.passages.pop(passage_id)
+            self.total_length -= length
+            for term in set(tokenize(passage)):
+                postings = self.postings.get(term)
+                if postings is not None:
+                    postings.pop(passage_id, None)
+                    if not postings:
+                        del self.postings[term]
+        self.signatures.pop(topic, None)
+
+    def update(self, docs):
+        """Bring the index in line with a DocumentationCache; returns True if it changed."""
+        with self._lock:
+            if self.docs_version == (id(docs), docs.version):
+                return False
+            changed = False
+            current = {topic: docs.signature(topic) for topic in docs}
+            for topic in list(self.topic_passages):
+                if topic not in current:
+                    self.remove_document(topic)
+                    changed = True
+            for topic, signature in current.items():
+                if self.signatures.get(topic) == signature:
+                    continue
+                self.remove_document(topic)
+                self.add_document(topic, docs[topic])
+                self.signatures[topic] = signature
+                changed = True
+            self.docs_version = (id(docs), docs.version)
+            return changed
+
+    def search(self, query, top_k=3):
+        """Return the top_k passages as (score, topic, text), best first."""
+        terms = set(tokenize(query))
+        count = len(self.passages)
+        if not terms or not count:
+            return []
+        avg_length = self.total_length / count
+        scores = defaultdict(float)
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for passage_id, tf in postings.items():
+                length = self.passages[passage_id][2]
+                norm = self.k1 * (1 - self.b + self.b * length / avg_length)
+                scores[passage_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return [
+            (score, self.passages[pid][0], self.passages[pid][1]) for pid, score in best
+        ]
+
+    def save(self, path):
+        # Only reached when an update changed the index, not on every search
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(
+                (INDEX_FORMAT_VERSION, self), f, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved index, or return None if it is missing or unreadable."""
+        try:
+            with open(path, "rb") as f:
+                version, index = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Warning: Could not load documentation index {path}: {e}")
+            return None
+        if version != INDEX_FORMAT_VERSION:
+            return None
+        # Saved signatures still let update() skip unchanged files
+        index.docs_version = None
+        return index
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index(docs_dir=DOCS_DIR, index_path=None):
+    """Return the shared index for `docs_dir`, updated for any changed files.
+
+    With `index_path` the index is loaded from disk on first use and saved
+    back whenever an update changed it.
+    """
+    global _index
+    docs = get_documentation_cache(docs_dir)
+    with _index_lock:
+        if _index is None:
+            _index = (index_path and DocumentSearchIndex.load(index_path)) or (
+                DocumentSearchIndex()
+            )
+        index = _index
+    if index.update(docs) and index_path:
+        index.save(index_path)
+    return index
@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+from collections.abc import Mapping
+
+# Default location of the Deepgram product docs used by the deepgram industry
+DOCS_DIR = "deepgram-docs/fern/docs"
+# How often a cache re-stats the docs directory for changes
+DOCS_RECHECK_SECONDS = 5.0
+
+
+class _Document:
+    __slots__ = ("path", "mtime_ns", "size", "text")
+
+    def __init__(self, path, mtime_ns, size):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.text = None
+
+    def close(self):
+        self.text = None
+
+
+class DocumentationCache(Mapping):
+    """Process-wide, change-aware cache of the .mdx files in a docs directory.
+
+    Maps topic (file name without extension) to file content. The directory
+    is re-scanned at most every `recheck_interval` seconds, comparing each
+    file's mtime and size, and only new or changed files are re-read. Content
+    is read and decoded once, on first access, and the str is kept until the
+    file changes. `version` increases whenever the set of files or their
+    contents change.
+    """
+
+    def __init__(self, docs_dir, recheck_interval=DOCS_RECHECK_SECONDS):
+        self.docs_dir = docs_dir
+        self.recheck_interval = recheck_interval
+        self.version = 0
+        self._documents = {}
+        self._last_check = None
+        self._lock = threading.RLock()
+
+    def refresh(self, force=False):
+        """Pick up added, changed and removed files; returns True if anything changed."""
+        now = time.monotonic()
+        with self._lock:
+            if (
+                not force
+                and self._last_check is not None
+                and now - self._last_check < self.recheck_interval
+            ):
+                return False
+            self._last_check = now
+
+            seen = {}
+            try:
+                with os.scandir(self.docs_dir) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(".mdx") and entry.is_file():
+                            stat = entry.stat()
+                            seen[entry.name[: -len(".mdx")]] = (
+                                entry.path,
+                                stat.st_mtime_ns,
+                                stat.st_size,
+                            )
+            except FileNotFoundError:
+                pass
+
+            changed = False
+            for key in list(self._documents):
+                if key not in seen:
+                    self._documents.pop(key).close()
+                    changed = True
+            for key, (path, mtime_ns, size) in seen.items():
+                document = self._documents.get(key)
+                if (
+                    document is None
+                    or document.mtime_ns != mtime_ns
+                    or document.size != size
+                ):
+                    if document is not None:
+                        document.close()
+                    self._documents[key] = _Document(path, mtime_ns, size)
+                    changed = True
+            if changed:
+                self.version += 1
+            return changed
+
+    def _load(self, document):
+        if document.text is not None:
+            return document.text
+        try:
+            with open(document.path, "r", encoding="utf-8") as f:
+                document.text = f.read()
+            return document.text
+        except Exception as e:
+            print(f"Error reading {document.path}: {e}")
+            return ""
+
+    def signature(self, key):
+        """Return (mtime_ns, size) of a topic's file as of the last refresh."""
+        with self._lock:
+            document = self._documents[key]
+            return document.mtime_ns, document.size
+
+    def __getitem__(self, key):
+        with self._lock:
+            return self._load(self._documents[key])
+
+    def __iter__(self):
+        with self._lock:
+            return iter(sorted(self._documents))
+
+    def __len__(self):
+        return len(self._documents)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_documentation_cache(docs_dir):
+    """Return the shared cache for `docs_dir`, refreshed if its recheck interval passed."""
+    key = os.path.abspath(docs_dir)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = DocumentationCache(docs_dir)
+    cache.refresh()
+    return cache
@@ -0,0 +1,213 @@
+"""Registry for the agent's function calls.
+
+Functions are registered with a decorator and written with ordinary keyword
+parameters:
+
+    registry = FunctionRegistry()
+
+    @registry.function(description="Look up a customer.")
+    async def find_customer(customer_id: Annotated[str, "Customer's ID."]):
+        ...
+
+The FUNCTION_DEFINITIONS entry (JSON schema) is generated from the
+signature. `Annotated[type, "description", {extra schema}]` adds a
+description and extra keywords ("minimum", "maximum", "minLength"). `Literal[...]` becomes an
+enum. Parameters without a default are required.
+
+Each schema is compiled into a list of checks at import. Arguments are
+checked before the function body runs, so a malformed call from the LLM
+fails in microseconds with an ArgumentError instead of partway through a
+backend call. The registry also counts calls, rejections and errors and
+times each function.
+"""
+
+import inspect
+import threading
+import time
+import typing
+from typing import Annotated, Literal
+
+JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean", list: "array", dict: "object"}
+
+# Python types accepted for each JSON type (bool is excluded from numbers below)
+PYTHON_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list,),
+    "object": (dict,),
+}
+
+
+class ArgumentError(ValueError):
+    """The LLM called a function with arguments that don't match its schema."""
+
+
+def _parameter_schema(name, annotation):
+    """Return the JSON schema for one annotated parameter."""
+    schema = {}
+    if typing.get_origin(annotation) is Annotated:
+        annotation, *extras = typing.get_args(annotation)
+        for extra in extras:
+            if isinstance(extra, str):
+                schema["description"] = extra
+            elif isinstance(extra, dict):
+                schema.update(extra)
+    if typing.get_origin(annotation) is Literal:
+        choices = typing.get_args(annotation)
+        annotation = type(choices[0])
+        schema["enum"] = list(choices)
+    if annotation not in JSON_TYPES:
+        raise TypeError(f"Parameter {name!r} has no JSON type for {annotation!r}")
+    return {"type": JSON_TYPES[annotation], **schema}
+
+
+def _compile_check(name, schema):
+    """Build one check from a property schema, resolved up front."""
+    json_type = schema["type"]
+    types = PYTHON_TYPES[json_type]
+    expected = ("an " if json_type[0] in "aeiou" else "a ") + json_type
+    # bool is an int subclass but not a JSON integer or number
+    reject_bool = json_type in ("integer", "number")
+    choices = frozenset(schema["enum"]) if "enum" in schema else None
+    minimum = schema.get("minimum")
+    maximum = schema.get("maximum")
+    min_length = schema.get("minLength")
+
+    def check(value):
+        if not isinstance(value, types) or (reject_bool and isinstance(value, bool)):
+            raise ArgumentError(f"{name} must be {expected}, got {type(value).__name__}")
+        if choices is not None and value not in choices:
+            raise ArgumentError(f"{name} must be one of {', '.join(map(str, schema['enum']))}")
+        if minimum is not None and value < minimum:
+            raise ArgumentError(f"{name} must be at least {minimum}")
+        if maximum is not None and value > maximum:
+            raise ArgumentError(f"{name} must be at most {maximum}")
+        if min_length is not None and len(value) < min_length:
+            raise ArgumentError(f"{name} must have at least {min_length} characters")
+
+    return check
+
+
+def compile_validator(function_name, schema):
+    """Turn a function's parameters schema into `validate(params) -> kwargs`.
+
+    Optional arguments sent as null are dropped so the function's default
+    applies.
+    """
+    properties = schema["properties"]
+    checks = {name: _compile_check(name, prop) for name, prop in properties.items()}
+    required = tuple(schema["required"])
+
+    def validate(params):
+        if not isinstance(params, dict):
+            raise ArgumentError(f"{function_name} arguments must be a JSON object")
+        kwargs = {}
+        for name, value in params.items():
+            check = checks.get(name)
+            if check is None:
+                raise ArgumentError(f"{function_name} got an unexpected argument {name!r}")
+            if value is None:
+                continue
+            check(value)
+            kwargs[name] = value
+        for name in required:
+            if name not in kwargs:
+                raise ArgumentError(f"{function_name} is missing required argument {name!r}")
+        return kwargs
+
+    return validate
+
+
+class FunctionStats:
+    __slots__ = ("calls", "rejected", "errors", "total_seconds", "max_seconds")
+
+    def __init__(self):
+        self.calls = self.rejected = self.errors = 0
+        self.total_seconds = self.max_seconds = 0.0
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "avg_ms": round(1000 * self.total_seconds / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(1000 * self.max_seconds, 3),
+        }
+
+
+class FunctionRegistry:
+    def __init__(self):
+        self.definitions = []
+        self.function_map = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def function(self, description=None):
+        """Register a coroutine function as an agent function.
+
+        The FUNCTION_MAP entry is an `async def f(params)` that validates
+        `params` and calls the function with them as keyword arguments.
+        """
+
+        def decorator(function):
+            name = function.__name__
+            schema = self.schema_for(function)
+            self.definitions.append(
+                {
+                    "name": name,
+                    "description": description or inspect.getdoc(function),
+                    "parameters": schema,
+                }
+            )
+            validate = compile_validator(name, schema)
+            stats = self._stats[name] = FunctionStats()
+
+            async def call(params):
+                try:
+                    kwargs = validate(params)
+                except ArgumentError:
+                    with self._lock:
+                        stats.rejected += 1
+                    raise
+                start = time.perf_counter()
+                failed = False
+                try:
+                    return await function(**kwargs)
+                except Exception:
+                    failed = True
+                    raise
+                finally:
+                    elapsed = time.perf_counter() - start
+                    with self._lock:
+                        stats.calls += 1
+                        stats.errors += failed
+                        stats.total_seconds += elapsed
+                        stats.max_seconds = max(stats.max_seconds, elapsed)
+
+            call.__name__ = name
+            call.validate = validate
+            self.function_map[name] = call
+            return function
+
+        return decorator
+
+    @staticmethod
+    def schema_for(function):
+        """JSON schema for the function's parameters (follows @cpu_bound)."""
+        hints = typing.get_type_hints(inspect.unwrap(function), include_extras=True)
+        properties = {}
+        required = []
+        for name, parameter in inspect.signature(function).parameters.items():
+            if name not in hints:
+                raise TypeError(f"Parameter {name!r} of {function.__name__} needs a type annotation")
+            properties[name] = _parameter_schema(name, hints[name])
+            if parameter.default is inspect.Parameter.empty:
+                required.append(name)
+        return {"type": "object", "properties": properties, "required": required}
+
+    def stats(self):
+        """Per-function counts and latency since startup."""
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in self._stats.items()}
@@ -0,0 +1,97 @@
+"""Latency profiles for the simulated backend delays (see simulate_delay).
+
+A profile describes how long one simulated call takes:
+
+    {"distribution": "constant", "value": 0.05}
+    {"distribution": "normal", "mean": 0.05, "stddev": 0.01}
+    {"distribution": "lognormal", "median": 0.05, "sigma": 0.5}
+    {"distribution": "heavy_tail", "median": 0.05, "sigma": 0.25,
+     "spike_probability": 0.02, "spike": 0.5, "alpha": 1.5}
+
+`heavy_tail` is a lognormal body plus, with `spike_probability`, an extra
+Pareto-distributed stall of at least `spike` seconds. That is the shape of
+a backend whose p99 is many times its p50. Profiles are looked up as
+"<delay type>:<function>" first, then "<delay type>". A delay type without
+a profile uses its fixed ARTIFICIAL_DELAY value.
+"""
+
+import math
+import random
+import threading
+
+from common.config import ARTIFICIAL_DELAY, LATENCY_PROFILES, LATENCY_SEED
+
+DISTRIBUTIONS = ("constant", "normal", "lognormal", "heavy_tail")
+
+
+class LatencyProfile:
+    def __init__(self, distribution="constant", **params):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown latency distribution {distribution!r}; "
+                f"expected one of {', '.join(DISTRIBUTIONS)}"
+            )
+        self.distribution = distribution
+        self.params = params
+        if distribution == "constant":
+            self.value = params.get("value", 0.0)
+        elif distribution == "normal":
+            self.mean = params["mean"]
+            self.stddev = params.get("stddev", 0.0)
+        else:
+            self.mu = math.log(params["median"]) if params["median"] > 0 else -math.inf
+            self.sigma = params.get("sigma", 0.5)
+            self.spike_probability = params.get("spike_probability", 0.0)
+            self.spike = params.get("spike", 0.0)
+            self.alpha = params.get("alpha", 1.5)
+
+    def sample(self, rng):
+        """Draw one delay in seconds (never negative)."""
+        if self.distribution == "constant":
+            return self.value
+        if self.distribution == "normal":
+            return max(0.0, rng.gauss(self.mean, self.stddev))
+        delay = rng.lognormvariate(self.mu, self.sigma) if self.mu > -math.inf else 0.0
+        if self.distribution == "heavy_tail" and rng.random() < self.spike_probability:
+            delay += self.spike * rng.paretovariate(self.alpha)
+        return delay
+
+    def to_dict(self):
+        return {"distribution": self.distribution, **self.params}
+
+
+_profiles = {}
+_rng = random.Random()
+_lock = threading.Lock()
+
+
+def configure(profiles=None, seed=None):
+    """Install latency profiles ({key: profile dict}) and reseed the generator.
+
+    A fixed `seed` makes the sequence of delays repeatable across runs.
+    """
+    global _profiles
+    built = {key: LatencyProfile(**spec) for key, spec in (profiles or {}).items()}
+    with _lock:
+        _profiles = built
+        _rng.seed(seed)
+
+
+def profile_for(delay_type, function=None):
+    if function is not None:
+        profile = _profiles.get(f"{delay_type}:{function}")
+        if profile is not None:
+            return profile
+    return _profiles.get(delay_type)
+
+
+def sample_delay(delay_type, function=None):
+    """Seconds to wait for one `delay_type` call made by `function`."""
+    profile = profile_for(delay_type, function)
+    if profile is None:
+        return ARTIFICIAL_DELAY[delay_type]
+    with _lock:
+        return profile.sample(_rng)
+
+
+configure(LATENCY_PROFILES, LATENCY_SEED)
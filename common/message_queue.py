@@ -0,0 +1,156 @@
+"""Socket.IO message queue for running the server as several processes.
+
+With more than one worker, an emit in one process has to reach clients
+connected to the others. Flask-SocketIO does this through a message queue
+(`redis://`, `amqp://`, ...). For a single machine without such a service,
+`local://host:port` uses MessageBroker, a small TCP pub/sub stand-in that
+serve.py starts next to the workers, and LocalQueueManager, the matching
+python-socketio client manager.
+
+Every message is one line of JSON. A connection first sends `PUB` or `SUB`.
+Lines from publishers are copied to every subscriber.
+"""
+
+import socket
+import socketserver
+import threading
+import time
+from urllib.parse import urlparse
+
+import socketio
+
+# A subscriber that cannot take a message within this time is dropped
+SUBSCRIBER_SEND_TIMEOUT = 5.0
+RECONNECT_DELAY = 0.5
+
+
+def parse_local_url(url):
+    parsed = urlparse(url)
+    return parsed.hostname or "127.0.0.1", parsed.port or 5570
+
+
+class MessageBroker(socketserver.ThreadingTCPServer):
+    """Fan-out broker for LocalQueueManager (the `local://` message queue)."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        super().__init__(address, _BrokerHandler)
+        self.subscribers = set()
+        self.subscribers_lock = threading.Lock()
+        # One fan-out at a time, so lines from different publishers never interleave
+        self._publish_lock = threading.Lock()
+
+    def publish(self, line):
+        with self._publish_lock:
+            with self.subscribers_lock:
+                subscribers = list(self.subscribers)
+            for conn in subscribers:
+                try:
+                    conn.sendall(line)
+                except OSError:
+                    with self.subscribers_lock:
+                        self.subscribers.discard(conn)
+                    conn.close()
+
+    def start(self):
+        thread = threading.Thread(
+            target=self.serve_forever, name="socketio-broker", daemon=True
+        )
+        thread.start()
+        return thread
+
+
+class _BrokerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        role = self.rfile.readline().strip()
+        if role == b"SUB":
+            self.request.settimeout(SUBSCRIBER_SEND_TIMEOUT)
+            with self.server.subscribers_lock:
+                self.server.subscribers.add(self.request)
+            try:
+                # Wait for the subscriber to disconnect; the timeout only bounds sends
+                while True:
+                    try:
+                        if not self.request.recv(1024):
+                            break
+                    except socket.timeout:
+                        continue
+            except OSError:
+                pass
+            finally:
+                with self.server.subscribers_lock:
+                    self.server.subscribers.discard(self.request)
+        elif role == b"PUB":
+            for line in self.rfile:
+                if line.endswith(b"\n"):
+                    self.server.publish(line)
+
+
+class LocalQueueManager(socketio.PubSubManager):
+    """python-socketio client manager backed by a MessageBroker."""
+
+    name = "local"
+
+    def __init__(
+        self,
+        url="local://127.0.0.1:5570",
+        channel="flask-socketio",
+        write_only=False,
+        logger=None,
+        json=None,
+    ):
+        super().__init__(
+            channel=channel, write_only=write_only, logger=logger, json=json
+        )
+        self.address = parse_local_url(url)
+        self._publisher = None
+        self._publish_lock = threading.Lock()
+
+    def _connect(self, role):
+        while True:
+            try:
+                conn = socket.create_connection(self.address)
+                conn.sendall(role + b"\n")
+                return conn
+            except OSError:
+                self._get_logger().warning(
+                    f"Message broker at {self.address} unavailable, retrying"
+                )
+                time.sleep(RECONNECT_DELAY)
+
+    def _publish(self, data):
+        line = self.json.dumps(data).encode("utf-8") + b"\n"
+        with self._publish_lock:
+            for _ in range(2):
+                if self._publisher is None:
+                    self._publisher = self._connect(b"PUB")
+                try:
+                    self._publisher.sendall(line)
+                    return
+                except OSError:
+                    # Broker restarted; reconnect and send once more
+                    self._publisher.close()
+                    self._publisher = None
+
+    def _listen(self):
+        while True:
+            conn = self._connect(b"SUB")
+            try:
+                with conn, conn.makefile("rb") as lines:
+                    for line in lines:
+                        yield line
+            except OSError:
+                pass
+            self._get_logger().warning("Lost the message broker, reconnecting")
+            time.sleep(RECONNECT_DELAY)
+
+
+def socketio_options(url):
+    """Keyword arguments for SocketIO() that connect it to the message queue at `url`."""
+    if not url:
+        return {}
+    if url.startswith("local://"):
+        return {"client_manager": LocalQueueManager(url)}
+    return {"message_queue": url}
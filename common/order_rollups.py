@@ -0,0 +1,165 @@
+"""Order totals kept up to date on every write.
+
+Aggregate questions ("how much have I spent", "how many orders are
+pending") would otherwise scan every order. OrderRollups keeps, per customer
+and for the whole store, the order count, the total in integer cents (so
+repeated adds and removes don't drift), a status histogram and per-day
+buckets for the last-N-days windows. Stores call add() / remove() inside
+their write lock. A summary costs O(days in the largest window), however
+many orders there are.
+
+Day buckets older than the largest window are not kept, since no window
+can reach them.
+"""
+
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+
+from common.config import ORDER_ROLLUPS
+
+
+def day_number(value):
+    """Day ordinal of an ISO date or datetime string."""
+    return date.fromisoformat(value[:10]).toordinal()
+
+
+def to_cents(amount):
+    return round(amount * 100)
+
+
+class Rollup:
+    __slots__ = ("count", "total_cents", "by_status", "by_day")
+
+    def __init__(self):
+        self.count = 0
+        self.total_cents = 0
+        self.by_status = Counter()
+        self.by_day = {}
+
+    def apply(self, day, status, cents, sign, horizon):
+        self.count += sign
+        self.total_cents += sign * cents
+        self.by_status[status] += sign
+        if self.by_status[status] <= 0:
+            del self.by_status[status]
+        if day >= horizon:
+            bucket = self.by_day.setdefault(day, [0, 0])
+            bucket[0] += sign
+            bucket[1] += sign * cents
+            if bucket[0] <= 0:
+                del self.by_day[day]
+
+    def summary(self, windows, today):
+        result = {
+            "order_count": self.count,
+            "total_spent": self.total_cents / 100,
+            "average_order": round(self.total_cents / self.count / 100, 2) if self.count else 0.0,
+            "by_status": dict(self.by_status),
+        }
+        for days in windows:
+            count = cents = 0
+            for day in range(today - days + 1, today + 1):
+                bucket = self.by_day.get(day)
+                if bucket:
+                    count += bucket[0]
+                    cents += bucket[1]
+            result[f"last_{days}_days"] = {"order_count": count, "total_spent": cents / 100}
+        return result
+
+
+class OrderRollups:
+    def __init__(self, windows=None):
+        self.windows = sorted(windows or ORDER_ROLLUPS["windows"])
+        self.customers = {}
+        self.all = Rollup()
+        self._days = {}
+
+    @classmethod
+    def from_orders(cls, orders, windows=None):
+        """Build the rollups in one pass, totalling plain tuples per customer first."""
+        rollups = cls(windows)
+        horizon = rollups._horizon()
+        day_of = rollups._day
+        totals = defaultdict(lambda: [0, 0])
+        statuses = Counter()
+        days = defaultdict(lambda: [0, 0])
+        for order in orders:
+            customer_id = order["customer_id"]
+            cents = round(order["total"] * 100)
+            total = totals[customer_id]
+            total[0] += 1
+            total[1] += cents
+            statuses[customer_id, order["status"]] += 1
+            day = day_of(order["date"])
+            if day >= horizon:
+                bucket = days[customer_id, day]
+                bucket[0] += 1
+                bucket[1] += cents
+
+        by_status = defaultdict(dict)
+        for (customer_id, status), count in statuses.items():
+            by_status[customer_id][status] = count
+        by_day = defaultdict(dict)
+        for (customer_id, day), bucket in days.items():
+            by_day[customer_id][day] = bucket
+        for customer_id, (count, cents) in totals.items():
+            rollups.load(
+                customer_id, count, cents, by_status[customer_id], by_day.get(customer_id, {})
+            )
+        return rollups
+
+    def _horizon(self):
+        return date.today().toordinal() - self.windows[-1] + 1
+
+    def _day(self, value):
+        # Many orders share a day, so parse each date prefix once
+        key = value[:10]
+        day = self._days.get(key)
+        if day is None:
+            day = self._days[key] = day_number(key)
+        return day
+
+    def _apply(self, order, sign, horizon):
+        day = self._day(order["date"])
+        cents = to_cents(order["total"])
+        customer = self.customers.get(order["customer_id"])
+        if customer is None:
+            customer = self.customers[order["customer_id"]] = Rollup()
+        customer.apply(day, order["status"], cents, sign, horizon)
+        self.all.apply(day, order["status"], cents, sign, horizon)
+
+    def add(self, order):
+        self._apply(order, 1, self._horizon())
+
+    def remove(self, order):
+        self._apply(order, -1, self._horizon())
+
+    def replace(self, old, new):
+        """Account for an order that changed (e.g. its status)."""
+        self.remove(old)
+        self.add(new)
+
+    def load(self, customer_id, count, total_cents, by_status, by_day):
+        """Add precomputed totals for one customer (bulk loads)."""
+        customer = self.customers.setdefault(customer_id, Rollup())
+        horizon = self._horizon()
+        for target in (customer, self.all):
+            target.count += count
+            target.total_cents += total_cents
+            target.by_status.update(by_status)
+            for day, (day_count, day_cents) in by_day.items():
+                if day >= horizon:
+                    bucket = target.by_day.setdefault(day, [0, 0])
+                    bucket[0] += day_count
+                    bucket[1] += day_cents
+
+    def summary(self, customer_id=None):
+        """Totals for one customer, or for every order when customer_id is None."""
+        rollup = self.all if customer_id is None else self.customers.get(customer_id, Rollup())
+        return rollup.summary(self.windows, date.today().toordinal())
+
+
+def day_range(days, today=None):
+    """(first, last) ISO dates of a last-`days`-days window, for SQL backends."""
+    today = today or date.today()
+    return (today - timedelta(days=days - 1)).isoformat(), today.isoformat()
@@ -0,0 +1,78 @@
+"""Pages of rows for function responses.
+
+A function response is sent to the agent as one JSON string and becomes
+part of the LLM's context, so a customer with hundreds of orders would
+make a large websocket frame and a slow next turn. `paginate` returns one
+page instead:
+
+- rows are ordered newest first; `next_cursor` continues after the last
+  returned row (keyset, so a booking made between pages doesn't shift them).
+  The store applies the cursor and the limit (in the query, for SQLite), so
+  only one page of rows is read
+- `fields` keeps only the listed keys of each row
+- the page stops at `limit` rows or when the encoded rows would pass
+  `max_bytes`, whichever comes first
+- a page that doesn't reach the end carries a summary of all matching rows
+  (counts by status, date range, totals), so the agent can answer "how many"
+  questions without fetching more pages
+"""
+
+import base64
+import binascii
+import json
+
+from common.function_registry import ArgumentError
+
+
+def _encode(value):
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+def encode_cursor(row):
+    key = _encode([row["date"], row["id"]]).encode("utf-8")
+    return base64.urlsafe_b64encode(key).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if isinstance(date, str) and isinstance(row_id, str):
+            return date, row_id
+    except (binascii.Error, ValueError, TypeError):
+        pass
+    raise ArgumentError("cursor is not valid; pass next_cursor from a previous page")
+
+
+def paginate(page, *, fields=None, max_bytes=None, item_name="items"):
+    """Shape a store page (business_logic.get_customer_orders_page) into a response."""
+    rows = page["rows"]
+    if fields is not None:
+        if not all(isinstance(field, str) for field in fields):
+            raise ArgumentError("fields must be a list of field names")
+        allowed = set().union(*rows) if rows else set(fields)
+        unknown = [field for field in fields if field not in allowed]
+        if unknown:
+            raise ArgumentError(
+                f"Unknown fields: {', '.join(unknown)}; available: {', '.join(sorted(allowed))}"
+            )
+
+    items = []
+    size = 0
+    for row in rows:
+        item = {field: row[field] for field in fields if field in row} if fields else row
+        item_size = len(_encode(item)) + 1
+        # Always return at least one row so the agent can make progress
+        if items and max_bytes is not None and size + item_size > max_bytes:
+            break
+        items.append(item)
+        size += item_size
+
+    totals = dict(page["totals"])
+    response = {item_name: items, "total": totals.pop("count"), "returned": len(items)}
+    remaining = page["older"] - len(items)
+    if remaining > 0:
+        response["next_cursor"] = encode_cursor(rows[len(items) - 1])
+        response["remaining"] = remaining
+        response["summary"] = totals
+    return response
@@ -0,0 +1,122 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+DEFAULT_APPOINTMENT_DURATION = timedelta(hours=1)
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_seconds(value):
+    """Convert an ISO string or datetime to seconds on a naive local timeline.
+
+    Parsing instead of comparing strings means "2025-01-01T10:00:00" and
+    "2025-01-01T10:00:00.000000" refer to the same instant.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return (value - _EPOCH).total_seconds()
+
+
+def appointment_interval(appointment, default_duration=None):
+    """(start, end) seconds of an appointment; ValueError if its date or duration is invalid.
+
+    Stores call this before logging or inserting a booking, so a bad date
+    never leaves a partial row or a record the log can't replay.
+    """
+    date = appointment.get("date")
+    try:
+        start = to_seconds(date)
+    except (TypeError, ValueError):
+        raise ValueError(
+            f"Invalid appointment date {date!r}; expected ISO format such as 2025-06-01T15:00:00"
+        ) from None
+    if default_duration is None:
+        default_duration = DEFAULT_APPOINTMENT_DURATION.total_seconds()
+    duration = appointment.get("duration_minutes")
+    if not duration:
+        return start, start + default_duration
+    if isinstance(duration, bool) or not isinstance(duration, (int, float)) or duration <= 0:
+        raise ValueError(f"Invalid appointment duration {duration!r}; expected positive minutes")
+    return start, start + duration * 60
+
+
+class SlotIndex:
+    """Sorted interval index of booked appointment slots, one per provider.
+
+    Each provider keeps its bookings as (start, end) pairs sorted by start,
+    plus the longest booking seen so far. Any booking overlapping a query
+    window must start within [window_start - longest, window_end), which is
+    found with two bisects, so range queries cost O(log n + k).
+    """
+
+    def __init__(self, default_duration=DEFAULT_APPOINTMENT_DURATION):
+        self.default_duration = default_duration.total_seconds()
+        self._bookings = defaultdict(list)
+        self._longest = defaultdict(float)
+
+    def add(self, start, end, provider=None):
+        insort(self._bookings[provider], (start, end))
+        self._longest[provider] = max(self._longest[provider], end - start)
+
+    def _interval(self, appointment):
+        return appointment_interval(appointment, self.default_duration)
+
+    def add_appointment(self, appointment, interval=None):
+        """Index an appointment dict; cancelled appointments do not hold a slot.
+
+        `interval` is its already validated appointment_interval(), if any.
+        """
+        if appointment.get("status") == "Cancelled":
+            return
+        start, end = interval or self._interval(appointment)
+        self.add(start, end, appointment.get("provider"))
+
+    def add_appointments(self, appointments):
+        """Bulk-index appointments with one sort per provider instead of n inserts."""
+        touched = set()
+        for appointment in appointments:
+            if appointment.get("status") == "Cancelled":
+                continue
+            provider = appointment.get("provider")
+            start, end = self._interval(appointment)
+            self._bookings[provider].append((start, end))
+            self._longest[provider] = max(self._longest[provider], end - start)
+            touched.add(provider)
+        for provider in touched:
+            self._bookings[provider].sort()
+
+    def _window(self, bookings, start, end, longest):
+        lo = bisect_right(bookings, (start - longest, float("inf")))
+        hi = bisect_left(bookings, (end, float("-inf")), lo)
+        return lo, hi
+
+    def overlapping(self, start, end, provider=None):
+        """Return the bookings that overlap [start, end), sorted by start."""
+        bookings = self._bookings.get(provider)
+        if not bookings:
+            return []
+        lo, hi = self._window(bookings, start, end, self._longest[provider])
+        return [b for b in bookings[lo:hi] if b[1] > start]
+
+    def is_free(self, start, end, provider=None):
+        return not self.overlapping(start, end, provider)
+
+    def free_slots(self, candidates, provider=None):
+        """Filter (start, end) candidate slots down to the unbooked ones.
+
+        Each candidate costs two bisects plus a scan of the bookings that
+        start inside its window, stopping at the first overlap, so bookings
+        outside the candidate windows are never touched.
+        """
+        bookings = self._bookings.get(provider)
+        if not bookings:
+            return list(candidates)
+        longest = self._longest[provider]
+        free = []
+        for start, end in candidates:
+            lo, hi = self._window(bookings, start, end, longest)
+            if not any(bookings[i][1] > start for i in range(lo, hi)):
+                free.append((start, end))
+        return free
@@ -0,0 +1,492 @@
+"""SQLite backend for the business_logic functions (DATABASE_CONFIG["enable"]).
+
+The database runs in WAL mode so readers never wait on the writer, every
+lookup is served by an index, and statements are constant SQL strings so
+sqlite3's per-connection statement cache keeps them prepared. Calls block,
+so the store carries a small thread pool (`executor`) with one connection
+per thread; business_logic runs every store call there, keeping the event
+loop free while SQLite works.
+
+Order totals (order_summary) come from rollup tables that triggers update on
+every insert, update and delete of an order, keyed by customer id and by "*"
+for all orders. The totals are always current without scanning orders.
+"""
+
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from common.config import ORDER_ROLLUPS
+from common.order_rollups import day_range
+from common.slot_index import SlotIndex, appointment_interval
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    email TEXT NOT NULL,
+    joined_date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS customers_phone ON customers (phone);
+CREATE INDEX IF NOT EXISTS customers_email ON customers (email);
+
+CREATE TABLE IF NOT EXISTS appointments (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    customer_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    start_ts REAL NOT NULL,
+    end_ts REAL NOT NULL,
+    service TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duration_minutes INTEGER,
+    provider TEXT
+);
+CREATE INDEX IF NOT EXISTS appointments_customer ON appointments (customer_id, seq);
+CREATE INDEX IF NOT EXISTS appointments_slots ON appointments (provider, start_ts);
+CREATE INDEX IF NOT EXISTS appointments_customer_date ON appointments (customer_id, date, id);
+-- How far before a window a booking overlapping it can start; kept by triggers,
+-- so every process sees bookings made by the others
+CREATE TABLE IF NOT EXISTS booking_stats (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    longest_booking REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS orders (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    customer_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    items INTEGER NOT NULL,
+    total REAL NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS orders_customer ON orders (customer_id, seq);
+CREATE INDEX IF NOT EXISTS orders_customer_date ON orders (customer_id, date, id);
+
+CREATE TABLE IF NOT EXISTS order_rollups (
+    customer_id TEXT PRIMARY KEY,
+    order_count INTEGER NOT NULL,
+    total_cents INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS order_status_counts (
+    customer_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    order_count INTEGER NOT NULL,
+    PRIMARY KEY (customer_id, status)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS order_days (
+    customer_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    order_count INTEGER NOT NULL,
+    total_cents INTEGER NOT NULL,
+    PRIMARY KEY (customer_id, day)
+) WITHOUT ROWID;
+"""
+
+
+def _rollup_statements(row, sign):
+    """Trigger statements adding (sign=1) or removing (-1) `row` (NEW or OLD)."""
+    keys = f"(SELECT {row}.customer_id AS k UNION ALL SELECT '*')"
+    cents = f"{sign} * CAST(round({row}.total * 100) AS INTEGER)"
+    # "WHERE true" lets SQLite parse the ON CONFLICT clause after a SELECT
+    return f"""
+    INSERT INTO order_rollups SELECT k, {sign}, {cents} FROM {keys} WHERE true
+        ON CONFLICT (customer_id) DO UPDATE SET
+            order_count = order_count + excluded.order_count,
+            total_cents = total_cents + excluded.total_cents;
+    INSERT INTO order_status_counts SELECT k, {row}.status, {sign} FROM {keys} WHERE true
+        ON CONFLICT (customer_id, status) DO UPDATE SET
+            order_count = order_count + excluded.order_count;
+    INSERT INTO order_days SELECT k, substr({row}.date, 1, 10), {sign}, {cents} FROM {keys} WHERE true
+        ON CONFLICT (customer_id, day) DO UPDATE SET
+            order_count = order_count + excluded.order_count,
+            total_cents = total_cents + excluded.total_cents;"""
+
+
+# A cancelled or shortened booking leaves the longest in place: a wider
+# window only costs a few extra rows, a narrower one would miss conflicts
+BOOKING_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS appointments_longest_insert AFTER INSERT ON appointments BEGIN
+    UPDATE booking_stats SET longest_booking = MAX(longest_booking, NEW.end_ts - NEW.start_ts)
+    WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS appointments_longest_update
+AFTER UPDATE OF start_ts, end_ts ON appointments BEGIN
+    UPDATE booking_stats SET longest_booking = MAX(longest_booking, NEW.end_ts - NEW.start_ts)
+    WHERE id = 1;
+END;
+"""
+BACKFILL_BOOKING_STATS = """
+INSERT OR REPLACE INTO booking_stats
+SELECT 1, COALESCE(MAX(end_ts - start_ts), 0) FROM appointments
+"""
+
+ROLLUP_TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS orders_rollup_insert AFTER INSERT ON orders BEGIN
+{_rollup_statements("NEW", 1)}
+END;
+CREATE TRIGGER IF NOT EXISTS orders_rollup_delete AFTER DELETE ON orders BEGIN
+{_rollup_statements("OLD", -1)}
+END;
+CREATE TRIGGER IF NOT EXISTS orders_rollup_update
+AFTER UPDATE OF customer_id, date, total, status ON orders BEGIN
+{_rollup_statements("OLD", -1)}
+{_rollup_statements("NEW", 1)}
+END;
+"""
+
+# Databases created before the rollup tables existed are backfilled once
+BACKFILL_ROLLUPS = """
+INSERT INTO order_rollups
+SELECT customer_id, COUNT(*), SUM(CAST(round(total * 100) AS INTEGER)) FROM orders GROUP BY customer_id
+UNION ALL
+SELECT '*', COUNT(*), COALESCE(SUM(CAST(round(total * 100) AS INTEGER)), 0) FROM orders;
+INSERT INTO order_status_counts
+SELECT customer_id, status, COUNT(*) FROM orders GROUP BY customer_id, status
+UNION ALL
+SELECT '*', status, COUNT(*) FROM orders GROUP BY status;
+INSERT INTO order_days
+SELECT customer_id, substr(date, 1, 10), COUNT(*), SUM(CAST(round(total * 100) AS INTEGER))
+FROM orders GROUP BY customer_id, substr(date, 1, 10)
+UNION ALL
+SELECT '*', substr(date, 1, 10), COUNT(*), SUM(CAST(round(total * 100) AS INTEGER))
+FROM orders GROUP BY substr(date, 1, 10);
+"""
+
+SELECT_CUSTOMER = "SELECT id, name, phone, email, joined_date FROM customers"
+SELECT_APPOINTMENT = """
+SELECT a.id, a.customer_id, c.name AS customer_name, a.date, a.service, a.status,
+       a.duration_minutes, a.provider
+FROM appointments a JOIN customers c ON c.id = a.customer_id
+"""
+SELECT_APPOINTMENTS = f"{SELECT_APPOINTMENT} WHERE a.customer_id = ? ORDER BY a.seq"
+SELECT_ORDER = """
+SELECT o.id, o.customer_id, c.name AS customer_name, o.date, o.items, o.total, o.status
+FROM orders o JOIN customers c ON c.id = o.customer_id
+"""
+SELECT_ORDERS = f"{SELECT_ORDER} WHERE o.customer_id = ? ORDER BY o.seq"
+# Keyset pages, newest first, on the (customer_id, date, id) indexes
+BEFORE_KEY = "AND ({0}date, {0}id) < (?, ?)"
+SELECT_APPOINTMENTS_PAGE = (
+    f"{SELECT_APPOINTMENT} WHERE a.customer_id = ? {{before}} "
+    "ORDER BY a.date DESC, a.id DESC LIMIT ?"
+)
+SELECT_ORDERS_PAGE = (
+    f"{SELECT_ORDER} WHERE o.customer_id = ? {{before}} ORDER BY o.date DESC, o.id DESC LIMIT ?"
+)
+COUNT_ROWS = """
+SELECT status, COUNT(*), MIN(date), MAX(date), {amount} FROM {table}
+WHERE customer_id = ? {before} GROUP BY status
+"""
+SELECT_BOOKINGS = """
+SELECT start_ts, end_ts FROM appointments
+WHERE provider IS ? AND status != 'Cancelled'
+    AND start_ts >= ? - (SELECT longest_booking FROM booking_stats WHERE id = 1)
+    AND start_ts < ?
+ORDER BY start_ts
+"""
+INSERT_CUSTOMER = "INSERT INTO customers VALUES (?, ?, ?, ?, ?)"
+INSERT_APPOINTMENT = """
+INSERT INTO appointments
+    (id, customer_id, date, start_ts, end_ts, service, status, duration_minutes, provider)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_ORDER = """
+INSERT INTO orders (id, customer_id, date, items, total, status)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+SELECT_ROLLUP = "SELECT order_count, total_cents FROM order_rollups WHERE customer_id = ?"
+SELECT_STATUS_COUNTS = """
+SELECT status, order_count FROM order_status_counts
+WHERE customer_id = ? AND order_count > 0
+"""
+SELECT_WINDOW = """
+SELECT COALESCE(SUM(order_count), 0), COALESCE(SUM(total_cents), 0) FROM order_days
+WHERE customer_id = ? AND day BETWEEN ? AND ?
+"""
+
+
+def _appointment_row(row):
+    appointment = dict(row)
+    # Match the dict rows of the in-memory backends: optional fields only when set
+    for key in ("duration_minutes", "provider"):
+        if appointment[key] is None:
+            del appointment[key]
+    return appointment
+
+
+class SQLiteSlotIndex:
+    """SlotIndex-compatible availability queries answered by the slots index."""
+
+    def __init__(self, store):
+        self._store = store
+        self.executor = store.executor
+
+    def overlapping(self, start, end, provider=None):
+        return self._store.booked_between(start, end, provider)
+
+    def is_free(self, start, end, provider=None):
+        return not self.overlapping(start, end, provider)
+
+    def free_slots(self, candidates, provider=None):
+        """Fetch the bookings in the candidates' span once, then filter in memory."""
+        if not candidates:
+            return []
+        local = SlotIndex()
+        for b_start, b_end in self.overlapping(
+            candidates[0][0], candidates[-1][1], provider
+        ):
+            local.add(b_start, b_end, provider)
+        return local.free_slots(candidates, provider)
+
+
+class SQLiteDataStore:
+    """Durable data store with the same lookup API as MockDataStore."""
+
+    def __init__(self, path, pool_size=4):
+        self.path = path
+        self._local = threading.local()
+        self.executor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix="sqlite"
+        )
+        self.slots = SQLiteSlotIndex(self)
+        self._default_duration = SlotIndex().default_duration
+
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            has_triggers = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'orders_rollup_insert'"
+            ).fetchone()
+            if not has_triggers:
+                # New database, or one from before the rollups: total what's there first
+                for statement in BACKFILL_ROLLUPS.split(";"):
+                    if statement.strip():
+                        conn.execute(statement)
+                for statement in ROLLUP_TRIGGERS.split("END;"):
+                    if statement.strip():
+                        conn.execute(statement + "END;")
+            has_booking_triggers = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'appointments_longest_insert'"
+            ).fetchone()
+            if not has_booking_triggers:
+                conn.execute(BACKFILL_BOOKING_STATS)
+                for statement in BOOKING_TRIGGERS.split("END;"):
+                    if statement.strip():
+                        conn.execute(statement + "END;")
+
+    def _connection(self):
+        """Return this thread's connection; the executor threads form the pool."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    def is_empty(self):
+        row = self._connection().execute("SELECT 1 FROM customers LIMIT 1").fetchone()
+        return row is None
+
+    def load_rows(self, data):
+        """Bulk-load the list-of-dicts layout (or row views) of MOCK_DATA.
+
+        Rows are streamed into executemany, so row views over the columnar
+        backend are materialized one at a time.
+        """
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                INSERT_CUSTOMER,
+                (
+                    (c["id"], c["name"], c["phone"], c["email"], c["joined_date"])
+                    for c in data["customers"]
+                ),
+            )
+            conn.executemany(
+                INSERT_APPOINTMENT,
+                (self._appointment_params(a) for a in data["appointments"]),
+            )
+            conn.executemany(
+                INSERT_ORDER,
+                (
+                    (
+                        o["id"],
+                        o["customer_id"],
+                        o["date"],
+                        o["items"],
+                        o["total"],
+                        o["status"],
+                    )
+                    for o in data["orders"]
+                ),
+            )
+        conn.execute("ANALYZE")
+
+    def _appointment_params(self, appointment):
+        start, end = appointment_interval(appointment, self._default_duration)
+        duration = appointment.get("duration_minutes")
+        return (
+            appointment["id"],
+            appointment["customer_id"],
+            appointment["date"],
+            start,
+            end,
+            appointment["service"],
+            appointment["status"],
+            duration,
+            appointment.get("provider"),
+        )
+
+    def _get_customer(self, column, value):
+        row = (
+            self._connection()
+            .execute(f"{SELECT_CUSTOMER} WHERE {column} = ? LIMIT 1", (value,))
+            .fetchone()
+        )
+        return dict(row) if row else None
+
+    def get_customer_by_id(self, customer_id):
+        return self._get_customer("id", customer_id)
+
+    def get_customer_by_phone(self, phone):
+        return self._get_customer("phone", phone)
+
+    def get_customer_by_email(self, email):
+        return self._get_customer("email", email)
+
+    def get_appointments(self, customer_id):
+        """Return the appointments for a customer, oldest booking first."""
+        rows = self._connection().execute(SELECT_APPOINTMENTS, (customer_id,))
+        return [_appointment_row(row) for row in rows]
+
+    def get_orders(self, customer_id):
+        """Return the orders for a customer, oldest order first."""
+        rows = self._connection().execute(SELECT_ORDERS, (customer_id,))
+        return [dict(row) for row in rows]
+
+    def _page(self, query, alias, customer_id, before, limit):
+        params = (customer_id, *before, limit) if before else (customer_id, limit)
+        before_clause = BEFORE_KEY.format(f"{alias}.") if before else ""
+        return self._connection().execute(query.format(before=before_clause), params)
+
+    def get_appointments_page(self, customer_id, before=None, limit=10):
+        """Up to `limit` of a customer's appointments, newest first, before the key `before`."""
+        rows = self._page(SELECT_APPOINTMENTS_PAGE, "a", customer_id, before, limit)
+        return [_appointment_row(row) for row in rows]
+
+    def get_orders_page(self, customer_id, before=None, limit=10):
+        """Up to `limit` of a customer's orders, newest first, before the key `before`."""
+        rows = self._page(SELECT_ORDERS_PAGE, "o", customer_id, before, limit)
+        return [dict(row) for row in rows]
+
+    def _count(self, table, customer_id, before, amount_field=None):
+        query = COUNT_ROWS.format(
+            amount=f"SUM({amount_field})" if amount_field else "NULL",
+            table=table,
+            before=BEFORE_KEY.format("") if before else "",
+        )
+        params = (customer_id, *before) if before else (customer_id,)
+        rows = self._connection().execute(query, params).fetchall()
+        totals = {
+            "count": sum(row[1] for row in rows),
+            "by_status": {row[0]: row[1] for row in rows},
+        }
+        if rows:
+            totals["oldest_date"] = min(row[2] for row in rows)
+            totals["newest_date"] = max(row[3] for row in rows)
+        if amount_field:
+            totals[f"{amount_field}_sum"] = round(sum(row[4] for row in rows), 2)
+        return totals
+
+    def count_appointments(self, customer_id, before=None):
+        return self._count("appointments", customer_id, before)
+
+    def count_orders(self, customer_id, before=None):
+        return self._count("orders", customer_id, before, "total")
+
+    def order_summary(self, customer_id=None):
+        """Order totals for a customer (or all orders), from the rollup tables."""
+        conn = self._connection()
+        key = "*" if customer_id is None else customer_id
+        count, cents = conn.execute(SELECT_ROLLUP, (key,)).fetchone() or (0, 0)
+        summary = {
+            "order_count": count,
+            "total_spent": cents / 100,
+            "average_order": round(cents / count / 100, 2) if count else 0.0,
+            "by_status": dict(conn.execute(SELECT_STATUS_COUNTS, (key,)).fetchall()),
+        }
+        for days in sorted(ORDER_ROLLUPS["windows"]):
+            count, cents = conn.execute(SELECT_WINDOW, (key, *day_range(days))).fetchone()
+            summary[f"last_{days}_days"] = {"order_count": count, "total_spent": cents / 100}
+        return summary
+
+    def add_order(self, order):
+        """Store a new order; the triggers update the rollups in the same statement."""
+        self._connection().execute(
+            INSERT_ORDER,
+            (
+                order["id"],
+                order["customer_id"],
+                order["date"],
+                order["items"],
+                order["total"],
+                order["status"],
+            ),
+        )
+        return order
+
+    def update_order_status(self, order_id, status):
+        """Change an order's status; returns the order, or None if there is none."""
+        conn = self._connection()
+        conn.execute("UPDATE orders SET status = ? WHERE id = ?", (status, order_id))
+        row = conn.execute(f"{SELECT_ORDER} WHERE o.id = ?", (order_id,)).fetchone()
+        return dict(row) if row else None
+
+    def add_appointment(self, appointment):
+        """Store an appointment that already has an id; SQLite maintains the indexes."""
+        params = self._appointment_params(appointment)
+        self._connection().execute(INSERT_APPOINTMENT, params)
+        return appointment
+
+    def book_appointment(self, fields):
+        """Allocate the next APT id and insert the appointment in one transaction.
+
+        BEGIN IMMEDIATE takes the write lock before the id is read, so
+        concurrent bookings (from any thread or process) serialize here.
+        """
+        # Checked before the transaction; an invalid date raises ValueError
+        appointment_interval(fields, self._default_duration)
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Rows are numbered from 1, ids from APT0000
+            last_seq = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM appointments"
+            ).fetchone()[0]
+            appointment = {"id": f"APT{last_seq:04d}", **fields}
+            params = self._appointment_params(appointment)
+            conn.execute(INSERT_APPOINTMENT, params)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return appointment
+
+    def booked_between(self, start, end, provider=None):
+        """Return (start, end) bookings that overlap [start, end), sorted by start."""
+        # The window reaches back by the longest booking any process has stored
+        rows = self._connection().execute(SELECT_BOOKINGS, (provider, start, end))
+        return [(b_start, b_end) for b_start, b_end in rows if b_end > start]
+
+    def close(self):
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,212 @@
+"""Precompressed, fingerprinted static files and a cached index page.
+
+Run `python -m common.static_assets` as a build step to write .gz (and .br,
+if the optional `brotli` package is installed) next to each file in static/.
+init_app() then serves the best precompressed variant the browser accepts,
+appends a content hash to every url_for('static', ...) URL and marks those
+URLs immutable, so browsers fetch each version of a file only once.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import sys
+import threading
+
+from flask import Response, abort, request, send_file
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Content-Encoding and file suffix, in order of preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg")
+MIN_COMPRESS_SIZE = 512
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def _compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _available_encodings():
+    return [(e, suffix) for e, suffix in ENCODINGS if e != "br" or brotli is not None]
+
+
+def _is_compressible(filename):
+    mimetype = mimetypes.guess_type(filename)[0] or ""
+    return mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+def precompress(static_dir):
+    """Write compressed variants of the static files that are missing or out of date."""
+    written = []
+    for root, _, files in os.walk(static_dir):
+        for name in files:
+            if name.endswith((".gz", ".br")) or not _is_compressible(name):
+                continue
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            if stat.st_size < MIN_COMPRESS_SIZE:
+                continue
+            data = None
+            for encoding, suffix in _available_encodings():
+                target = path + suffix
+                if _is_current(target, stat):
+                    continue
+                if data is None:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                with open(target + ".tmp", "wb") as f:
+                    f.write(_compress(data, encoding))
+                # Stamp the source's mtime so staleness is a plain comparison
+                os.utime(target + ".tmp", ns=(stat.st_atime_ns, stat.st_mtime_ns))
+                os.replace(target + ".tmp", target)
+                written.append(target)
+    return written
+
+
+def _is_current(compressed_path, source_stat):
+    try:
+        return os.stat(compressed_path).st_mtime_ns == source_stat.st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def _accepted(encoding):
+    return request.accept_encodings[encoding] > 0
+
+
+class StaticAssets:
+    """Content hashes and precompressed variants of the files in a static folder."""
+
+    def __init__(self, static_dir):
+        self.static_dir = static_dir
+        self._versions = {}  # filename -> (mtime_ns, size, hash)
+        self._lock = threading.Lock()
+
+    def _path(self, filename):
+        path = safe_join(self.static_dir, filename)
+        if path is None or not os.path.isfile(path):
+            return None
+        return path
+
+    def version(self, filename):
+        """Short content hash of a static file, recomputed only when it changes."""
+        path = self._path(filename)
+        if path is None:
+            return None
+        stat = os.stat(path)
+        with self._lock:
+            cached = self._versions.get(filename)
+            if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                return cached[2]
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+        with self._lock:
+            self._versions[filename] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def send(self, filename):
+        """Serve a static file, precompressed if possible, with cache headers."""
+        path = self._path(filename)
+        if path is None:
+            abort(404)
+        stat = os.stat(path)
+        send_path, encoding = path, None
+        for candidate, suffix in ENCODINGS:
+            if _accepted(candidate) and _is_current(path + suffix, stat):
+                send_path, encoding = path + suffix, candidate
+                break
+
+        response = send_file(
+            send_path,
+            mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+            conditional=True,
+        )
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        version = request.args.get("v")
+        if version and version == self.version(filename):
+            # The URL changes whenever the content does
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        return response
+
+    def fingerprint(self):
+        """Current hashes of every static file versioned so far, for keying rendered pages."""
+        with self._lock:
+            names = sorted(self._versions)
+        return tuple((name, self.version(name)) for name in names)
+
+
+class PageCache:
+    """Keeps one rendered page, compressed once per encoding, until its key changes."""
+
+    def __init__(self):
+        self._key = None
+        self._variants = None
+        self._etag = None
+        self._lock = threading.Lock()
+
+    def response(self, key, render):
+        with self._lock:
+            if self._key != key or self._variants is None:
+                body = render().encode("utf-8")
+                self._variants = {None: body}
+                for encoding, _ in _available_encodings():
+                    self._variants[encoding] = _compress(body, encoding)
+                self._etag = hashlib.sha256(body).hexdigest()[:16]
+                self._key = key
+            variants, etag = self._variants, self._etag
+
+        encoding = next(
+            (e for e, _ in ENCODINGS if e in variants and _accepted(e)), None
+        )
+        response = Response(variants[encoding], mimetype="text/html")
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        response.set_etag(f"{etag}-{encoding}" if encoding else etag)
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
+
+
+def init_app(app):
+    """Serve app.static_folder through StaticAssets and version its URLs."""
+    assets = StaticAssets(app.static_folder)
+    # Hash everything up front so fingerprint() is stable from the first request
+    for root, _, files in os.walk(app.static_folder):
+        for name in files:
+            if not name.endswith((".gz", ".br")):
+                path = os.path.relpath(os.path.join(root, name), app.static_folder)
+                assets.version(path.replace(os.sep, "/"))
+
+    @app.url_defaults
+    def add_static_version(endpoint, values):
+        if endpoint == "static" and "v" not in values:
+            version = assets.version(values.get("filename", ""))
+            if version:
+                values["v"] = version
+
+    app.view_functions["static"] = assets.send
+    return assets
+
+
+if __name__ == "__main__":
+    static_dir = sys.argv[1] if len(sys.argv) > 1 else "static"
+    if brotli is None:
+        print("brotli not installed; writing gzip variants only (pip install brotli)")
+    for path in precompress(static_dir):
+        print(f"Wrote {path}")
@@ -0,0 +1,188 @@
+"""Front end that keeps each Socket.IO session on the worker that created it.
+
+Every worker prefixes the Engine.IO session ids it issues with its index
+(`w3.<id>`, see tag_session_ids). StickyProxy routes each HTTP request on
+its own: a request carrying `sid=w<k>.` goes to worker k, and anything else
+(a new session's handshake, a page or a static file) goes to the next worker
+in turn. Browsers keep connections alive and reuse them for any request, so
+a connection is not tied to one worker. The proxy reads one request at a
+time, forwards it and its body to the chosen worker (over a connection kept
+per worker for this client connection) and relays the response back before
+reading the next one. A WebSocket upgrade pins the connection to its worker
+and from then on it is piped both ways unchanged.
+"""
+
+import asyncio
+import itertools
+import re
+
+_SID_RE = re.compile(rb"[?&]sid=w(\d+)\.")
+REQUEST_LINE_LIMIT = 16 * 1024
+PIPE_CHUNK = 64 * 1024
+
+
+def tag_session_ids(socketio, worker_index):
+    """Make a worker's Engine.IO session ids identify the worker for the proxy."""
+    eio = socketio.server.eio
+    generate_id = eio.generate_id
+    eio.generate_id = lambda: f"w{worker_index}.{generate_id()}"
+
+
+def worker_for(request_line, workers):
+    """Return the worker index named by the request's sid, or None for a new session."""
+    match = _SID_RE.search(request_line)
+    if match:
+        index = int(match.group(1))
+        if index < workers:
+            return index
+    return None
+
+
+async def _pipe(reader, writer):
+    try:
+        while True:
+            data = await reader.read(PIPE_CHUNK)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, OSError):
+        pass
+    finally:
+        # Closing one side ends the pipe in the other direction too
+        writer.close()
+
+
+async def _read_head(reader):
+    """Read a request or response head, up to the blank line; None at a clean EOF."""
+    try:
+        return await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise
+        return None
+
+
+def _headers(head):
+    headers = {}
+    for line in head.split(b"\r\n")[1:]:
+        name, sep, value = line.partition(b":")
+        if sep:
+            headers[name.strip().lower()] = value.strip().lower()
+    return headers
+
+
+async def _copy(reader, writer, size):
+    while size > 0:
+        data = await reader.read(min(size, PIPE_CHUNK))
+        if not data:
+            raise asyncio.IncompleteReadError(b"", size)
+        writer.write(data)
+        size -= len(data)
+        await writer.drain()
+
+
+async def _relay_body(reader, writer, headers, until_close=False):
+    """Copy one message body; returns False if it ended by closing the connection."""
+    if b"chunked" in headers.get(b"transfer-encoding", b""):
+        while True:
+            size_line = await reader.readuntil(b"\r\n")
+            writer.write(size_line)
+            size = int(size_line.split(b";", 1)[0], 16)
+            if size == 0:
+                # Trailers, then the blank line that ends the message
+                while (line := await reader.readuntil(b"\r\n")) != b"\r\n":
+                    writer.write(line)
+                writer.write(line)
+                break
+            await _copy(reader, writer, size + 2)
+        await writer.drain()
+        return True
+    if b"content-length" in headers:
+        await _copy(reader, writer, int(headers[b"content-length"]))
+        return True
+    if until_close:
+        while data := await reader.read(PIPE_CHUNK):
+            writer.write(data)
+            await writer.drain()
+        return False
+    return True
+
+
+class StickyProxy:
+    def __init__(self, backends):
+        self.backends = backends  # [(host, port)] indexed by worker
+        self._round_robin = itertools.cycle(range(len(self.backends)))
+
+    def route(self, request_line):
+        index = worker_for(request_line, len(self.backends))
+        return next(self._round_robin) if index is None else index
+
+    async def handle(self, reader, writer):
+        upstreams = {}  # worker index -> (reader, writer) for this client connection
+        try:
+            while True:
+                head = await _read_head(reader)
+                if head is None:
+                    break
+                request_line = head.split(b"\r\n", 1)[0]
+                index = self.route(request_line)
+                upstream = upstreams.get(index)
+                if upstream is None or upstream[0].at_eof():
+                    try:
+                        upstream = await asyncio.open_connection(*self.backends[index])
+                    except OSError:
+                        # Worker not (yet) listening; the client will retry
+                        break
+                    upstreams[index] = upstream
+                upstream_reader, upstream_writer = upstream
+
+                headers = _headers(head)
+                upstream_writer.write(head)
+                if b"upgrade" in headers:
+                    # WebSocket: the rest of the connection belongs to this worker
+                    await asyncio.gather(
+                        _pipe(reader, upstream_writer), _pipe(upstream_reader, writer)
+                    )
+                    return
+                await _relay_body(reader, upstream_writer, headers)
+                await upstream_writer.drain()
+
+                # Pass interim 1xx responses (e.g. 100 Continue) through
+                while True:
+                    response_head = await _read_head(upstream_reader)
+                    if response_head is None:
+                        raise ConnectionError("worker closed the connection")
+                    writer.write(response_head)
+                    status = int(response_head.split(b" ", 2)[1])
+                    if not 100 <= status < 200:
+                        break
+                response_headers = _headers(response_head)
+                keep_alive = True
+                if not (request_line.startswith(b"HEAD ") or status in (204, 304)):
+                    keep_alive = await _relay_body(
+                        upstream_reader, writer, response_headers, until_close=True
+                    )
+                await writer.drain()
+                if not keep_alive or b"close" in response_headers.get(b"connection", b""):
+                    break
+        except (
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,
+            ConnectionError,
+            OSError,
+            ValueError,
+            IndexError,
+        ):
+            pass
+        finally:
+            writer.close()
+            for _, upstream_writer in upstreams.values():
+                upstream_writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(
+            self.handle, host, port, limit=REQUEST_LINE_LIMIT
+        )
+        async with server:
+            await server.serve_forever()
@@ -0,0 +1,215 @@
+"""Server-side record of each session's conversation.
+
+Every ConversationText turn goes two places:
+
+- a ring of the last `recent_turns` turns per live session, for cheap access
+  to the recent conversation without the memory growing over a long call
+- TranscriptWriter, a background thread that batches turns and appends them
+  to `<directory>/<session id>.jsonl.gz`. Each batch is one gzip member
+  (gzip readers treat concatenated members as one stream), so a file is
+  only ever appended to and the receiver never waits on compression or disk.
+
+export() first waits for the writer to drain what was queued, then streams
+the session back as NDJSON, one turn per line, decompressing the file a
+block at a time and then adding any live turns taken after that.
+"""
+
+import gzip
+import json
+import os
+import queue
+import re
+import threading
+import time
+import zlib
+from collections import deque
+
+from common.config import TRANSCRIPTS
+
+# Session ids become file names
+SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+
+
+class TranscriptWriter:
+    def __init__(
+        self, directory, batch_size=64, flush_interval=1.0, compresslevel=6, max_pending=10000
+    ):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.compresslevel = compresslevel
+        self.dropped = 0  # Turns not written because the queue was full
+        self._queue = queue.Queue(max_pending)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def path(self, session_id):
+        return os.path.join(self.directory, f"{session_id}.jsonl.gz")
+
+    def submit(self, session_id, turn):
+        """Queue a turn for writing; never blocks."""
+        self._start()
+        try:
+            self._queue.put_nowait((session_id, turn))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout=5.0):
+        """Wait until everything submitted so far is on disk."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put((None, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="transcripts", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            # A flush marker writes the batch right away
+            while len(batch) < self.batch_size and batch[-1][0] is not None:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                self._write([item for item in batch if item[0] is not None])
+            except OSError:
+                self.dropped += sum(1 for item in batch if item[0] is not None)
+            for session_id, item in batch:
+                if session_id is None:
+                    item.set()
+
+    def _write(self, batch):
+        lines = {}
+        for session_id, turn in batch:
+            lines.setdefault(session_id, []).append(json.dumps(turn, separators=(",", ":")))
+        if lines:
+            os.makedirs(self.directory, exist_ok=True)
+        for session_id, session_lines in lines.items():
+            data = ("\n".join(session_lines) + "\n").encode("utf-8")
+            with open(self.path(session_id), "ab") as f:
+                f.write(gzip.compress(data, self.compresslevel))
+
+
+class Transcript:
+    """One session's transcript: the recent-turns ring plus the on-disk log."""
+
+    def __init__(self, session_id, writer, recent_turns):
+        self.session_id = session_id
+        self.recent = deque(maxlen=recent_turns)
+        self._writer = writer
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def add(self, role, content):
+        # Under the lock, so turns reach the writer in seq order
+        with self._lock:
+            self._seq += 1
+            turn = {"seq": self._seq, "time": time.time(), "role": role, "content": content}
+            self.recent.append(turn)
+            self._writer.submit(self.session_id, turn)
+        return turn
+
+    def snapshot(self):
+        """The recent turns; safe to call while the session adds more."""
+        with self._lock:
+            return list(self.recent)
+
+
+class TranscriptStore:
+    def __init__(self, directory, recent_turns=50, **writer_options):
+        self.recent_turns = recent_turns
+        self.writer = TranscriptWriter(directory, **writer_options)
+        self._live = {}
+        self._lock = threading.Lock()
+
+    def open(self, session_id):
+        if not SESSION_ID.match(session_id):
+            raise ValueError(f"Invalid session id: {session_id!r}")
+        transcript = Transcript(session_id, self.writer, self.recent_turns)
+        with self._lock:
+            self._live[session_id] = transcript
+        return transcript
+
+    def close(self, transcript):
+        """Forget a finished session's ring; its turns are still written."""
+        with self._lock:
+            if self._live.get(transcript.session_id) is transcript:
+                del self._live[transcript.session_id]
+
+    def sessions(self):
+        """Ids of the sessions with a transcript on disk or in progress."""
+        try:
+            names = os.listdir(self.writer.directory)
+        except FileNotFoundError:
+            names = []
+        ids = {name[: -len(".jsonl.gz")] for name in names if name.endswith(".jsonl.gz")}
+        with self._lock:
+            ids.update(self._live)
+        return sorted(ids)
+
+    def export(self, session_id, chunk_size=64 * 1024):
+        """Yield the session's turns as NDJSON lines, or None if there is no such session."""
+        if not SESSION_ID.match(session_id):
+            return None
+        with self._lock:
+            live = self._live.get(session_id)
+        path = self.writer.path(session_id)
+        # Turns still queued (also those of a session closed just now) reach
+        # the file first; if the writer is stuck, the live ring still has them
+        self.writer.flush()
+        if live is None and not os.path.exists(path):
+            return None
+        recent = live.snapshot() if live is not None else []
+        return self._export(path, recent, chunk_size)
+
+    def _export(self, path, recent, chunk_size):
+        last_seq = 0
+        pending = b""
+        try:
+            with open(path, "rb") as f:
+                decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                while block := f.read(chunk_size):
+                    data = decompressor.decompress(block)
+                    # Each gzip member ends its stream; start on the next one
+                    while decompressor.eof:
+                        block = decompressor.unused_data
+                        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                        data += decompressor.decompress(block)
+                    lines = (pending + data).split(b"\n")
+                    pending = lines.pop()
+                    for line in lines:
+                        last_seq = json.loads(line)["seq"]
+                        yield line + b"\n"
+        except FileNotFoundError:
+            pass
+        except zlib.error:
+            # A member torn by a crash mid-write ends the readable log
+            pass
+        # Live turns added since the flush
+        for turn in recent:
+            if turn["seq"] > last_seq:
+                yield json.dumps(turn, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def transcript_store():
+    return TranscriptStore(
+        TRANSCRIPTS["directory"],
+        recent_turns=TRANSCRIPTS["recent_turns"],
+        batch_size=TRANSCRIPTS["batch_size"],
+        flush_interval=TRANSCRIPTS["flush_interval"],
+        compresslevel=TRANSCRIPTS["compresslevel"],
+    )
@@ -0,0 +1,138 @@
+"""Cached list of the aura-2 TTS models served by the /tts-models route.
+
+The Deepgram models API is called through one pooled requests.Session with
+connect/read timeouts. The filtered model list is kept for `ttl` seconds;
+after that the stale list is still served while a background thread
+revalidates it with If-None-Match, so a page load only waits on the network
+when nothing has been fetched yet.
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+MODELS_URL = "https://api.deepgram.com/v1/models"
+
+
+def format_tts_models(data):
+    """Reduce the models API response to the aura-2 voices shown in the UI."""
+    formatted_models = []
+
+    # Check if 'tts' key exists in the response
+    if "tts" in data:
+        # Filter for only aura-2 models
+        for model in data["tts"]:
+            if model.get("architecture") == "aura-2":
+                # Extract language from languages array if available
+                language = "en"
+                if model.get("languages") and len(model.get("languages")) > 0:
+                    language = model["languages"][0]
+
+                # Extract metadata for additional information
+                metadata = model.get("metadata", {})
+                accent = metadata.get("accent", "")
+                tags = ", ".join(metadata.get("tags", []))
+
+                formatted_models.append(
+                    {
+                        "name": model.get("canonical_name", model.get("name")),
+                        "display_name": model.get("name"),
+                        "language": language,
+                        "accent": accent,
+                        "tags": tags,
+                        "description": f"{accent} accent. {tags}",
+                    }
+                )
+    return formatted_models
+
+
+class TTSModelCache:
+    """TTL cache of the formatted model list with stale-while-revalidate."""
+
+    def __init__(self, api_key_getter, ttl=300, timeout=(3.05, 10), url=MODELS_URL):
+        self.api_key_getter = api_key_getter
+        self.ttl = ttl
+        self.timeout = timeout
+        self.url = url
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+        self.models = None
+        self.etag = None  # ETag of the served list, for the browser's If-None-Match
+        self.fetched_at = None
+        self.last_error = None
+        self._upstream_etag = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _fetch(self):
+        """Fetch and format the model list; returns True if it changed."""
+        api_key = self.api_key_getter()
+        if not api_key:
+            raise RuntimeError("DEEPGRAM_API_KEY not set")
+        headers = {"Authorization": f"Token {api_key}"}
+        if self._upstream_etag and self.models is not None:
+            headers["If-None-Match"] = self._upstream_etag
+
+        response = self.session.get(self.url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            self.fetched_at = time.monotonic()
+            return False
+        if response.status_code != 200:
+            raise RuntimeError(f"API request failed with status {response.status_code}")
+
+        models = format_tts_models(response.json())
+        body = json.dumps(models, sort_keys=True).encode("utf-8")
+        etag = hashlib.sha1(body).hexdigest()
+        with self._lock:
+            changed = etag != self.etag
+            self.models = models
+            self.etag = etag
+            self._upstream_etag = response.headers.get("ETag")
+            self.fetched_at = time.monotonic()
+            self.last_error = None
+        return changed
+
+    def _refresh_in_background(self):
+        try:
+            self._fetch()
+        except Exception as e:
+            # Keep serving the stale list; the next request retries
+            self.last_error = str(e)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def get(self):
+        """Return (models, etag), fetching synchronously only on the first call.
+
+        Raises if nothing has been fetched yet and the fetch fails.
+        """
+        with self._lock:
+            models, etag, fetched_at = self.models, self.etag, self.fetched_at
+            stale = fetched_at is None or time.monotonic() - fetched_at >= self.ttl
+            start_refresh = models is not None and stale and not self._refreshing
+            if start_refresh:
+                self._refreshing = True
+        if models is None:
+            self._fetch()
+            return self.models, self.etag
+        if start_refresh:
+            threading.Thread(
+                target=self._refresh_in_background, name="tts-models", daemon=True
+            ).start()
+        return models, etag
+
+    def prefetch(self):
+        """Warm the cache in the background, e.g. at server start."""
+        with self._lock:
+            if self._refreshing or self.models is not None:
+                return
+            self._refreshing = True
+        threading.Thread(
+            target=self._refresh_in_background, name="tts-models", daemon=True
+        ).start()
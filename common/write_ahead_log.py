@@ -0,0 +1,55 @@
+import json
+import os
+import pathlib
+import threading
+
+
+class WriteAheadLog:
+    """Append-only JSON-lines log of writes to the in-memory data stores.
+
+    Each record is appended and flushed before the write is acknowledged, and
+    replay() yields the records back at startup so bookings survive a restart.
+    With `fsync` every append also waits for the disk, trading latency for
+    durability across power loss.
+    """
+
+    def __init__(self, path, fsync=False):
+        self.path = pathlib.Path(path)
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = None
+
+    def replay(self):
+        """Yield the logged records in write order, skipping torn lines."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # A crash mid-append can leave a partial line
+                        continue
+        except FileNotFoundError:
+            return
+
+    def append(self, record):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a+", encoding="utf-8")
+                # Terminate a torn last line so the next record starts cleanly
+                if self._file.tell() > 0:
+                    self._file.seek(self._file.tell() - 1)
+                    if self._file.read(1) != "\n":
+                        self._file.write("\n")
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
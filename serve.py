@@ -0,0 +1,147 @@
+"""Run the voice agent server as several worker processes.
+
+    python serve.py --workers 4 --port 5000
+
+`python client.py` runs everything in one process, so all sessions share
+one GIL. This runner loads the mock data once, forks the workers (which
+share it copy-on-write), and puts a front end on --port that keeps each
+Socket.IO session on the worker that created it (common/sticky_proxy.py).
+Emits reach clients on every worker through the message queue in
+SERVER_CONFIG (common/message_queue.py). Workers that exit are restarted.
+Only the first workers are forked: by then the proxy's event loop and the
+broker's threads are running, and a fork would copy their locks in whatever
+state they were in, so replacements are spawned and load the data again.
+
+Bookings are only shared between workers with the SQLite backend
+(DATABASE_CONFIG["enable"]); the in-memory stores are per worker.
+"""
+
+import argparse
+import asyncio
+import gc
+import multiprocessing
+import os
+import threading
+
+from common.config import DATABASE_CONFIG, SERVER_CONFIG
+from common.message_queue import MessageBroker, parse_local_url
+from common.sticky_proxy import StickyProxy
+
+WORKER_CHECK_SECONDS = 1.0
+
+
+def preload():
+    """Load the shared startup state before forking, so workers don't repeat it."""
+    from common.business_logic import MOCK_DATA, get_customer_matcher, get_data_store
+    from common.static_assets import precompress
+
+    MOCK_DATA["customers"]
+    # SQLite connections must not cross a fork; workers open their own
+    if not DATABASE_CONFIG["enable"]:
+        get_data_store()
+        get_customer_matcher()
+    precompress(os.path.join(os.path.dirname(os.path.abspath(__file__)), "static"))
+    # Let the snapshot writer finish before forking
+    for thread in threading.enumerate():
+        if thread.name.startswith("mock-data"):
+            thread.join()
+    # Keep the preloaded objects out of GC passes, whose refcount writes would
+    # copy their pages into every worker
+    gc.freeze()
+
+
+def run_worker(index, port, message_queue):
+    os.environ["VOICE_AGENT_WORKER"] = str(index)
+    if message_queue:
+        os.environ["SOCKETIO_MESSAGE_QUEUE"] = message_queue
+    import client
+
+    client.tts_models.prefetch()
+    client.socketio.run(
+        client.app,
+        host="127.0.0.1",
+        port=port,
+        debug=False,
+        use_reloader=False,
+        allow_unsafe_werkzeug=True,
+    )
+
+
+class Supervisor:
+    def __init__(self, workers, base_port, message_queue):
+        # fork shares the preloaded data; elsewhere workers load the snapshot
+        method = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+        self.context = multiprocessing.get_context(method)
+        # Restarts happen once threads are running, where forking is unsafe
+        self.restart_context = multiprocessing.get_context("spawn")
+        self.ports = [base_port + i for i in range(workers)]
+        self.message_queue = message_queue
+        self.processes = [None] * workers
+
+    def start(self, index, context=None):
+        process = (context or self.context).Process(
+            target=run_worker,
+            args=(index, self.ports[index], self.message_queue),
+            name=f"voice-agent-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        self.processes[index] = process
+
+    async def watch(self):
+        while True:
+            await asyncio.sleep(WORKER_CHECK_SECONDS)
+            for index, process in enumerate(self.processes):
+                if not process.is_alive():
+                    print(f"Worker {index} exited ({process.exitcode}), restarting")
+                    self.start(index, self.restart_context)
+
+    def stop(self):
+        for process in self.processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        for process in self.processes:
+            if process is not None:
+                process.join(timeout=5)
+
+
+async def serve(supervisor, host, port):
+    proxy = StickyProxy([("127.0.0.1", p) for p in supervisor.ports])
+    await asyncio.gather(proxy.serve(host, port), supervisor.watch())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the server as several processes")
+    parser.add_argument("--workers", type=int, default=SERVER_CONFIG["workers"])
+    parser.add_argument("--host", default=SERVER_CONFIG["host"])
+    parser.add_argument("--port", type=int, default=SERVER_CONFIG["port"])
+    parser.add_argument(
+        "--worker-base-port", type=int, default=SERVER_CONFIG["worker_base_port"]
+    )
+    parser.add_argument("--message-queue", default=SERVER_CONFIG["message_queue"])
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
+
+    if workers > 1 and not DATABASE_CONFIG["enable"]:
+        print("Note: each worker keeps its own in-memory bookings; enable DATABASE_CONFIG to share them")
+
+    preload()
+    supervisor = Supervisor(workers, args.worker_base_port, args.message_queue)
+    for index in range(workers):
+        supervisor.start(index)
+
+    # The broker starts after the fork so workers don't inherit its threads
+    if args.message_queue and args.message_queue.startswith("local://"):
+        MessageBroker(parse_local_url(args.message_queue)).start()
+
+    print(f"Serving {workers} workers on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(serve(supervisor, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        supervisor.stop()
+
+
+if __name__ == "__main__":
+    main()
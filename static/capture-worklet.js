@@ -0,0 +1,56 @@
+/**
+ * AudioWorklet capture for the voice agent (see common/audio_frames.py).
+ *
+ * Collects the 128-sample render quanta into fixed frames (20 ms by default),
+ * converts them to 16-bit PCM and posts each frame to the main thread as an
+ * ArrayBuffer with an 8-byte header: format id (u8, filled in by the page),
+ * reserved (u8), sequence (u16), capture timestamp in ms (u32), little-endian.
+ */
+const HEADER_BYTES = 8;
+
+class CaptureProcessor extends AudioWorkletProcessor {
+    constructor(options) {
+        super();
+        const frameMs = (options.processorOptions && options.processorOptions.frameMs) || 20;
+        this.frameSamples = Math.round(sampleRate * frameMs / 1000);
+        this.sequence = 0;
+        this.newFrame();
+    }
+
+    newFrame() {
+        this.buffer = new ArrayBuffer(HEADER_BYTES + this.frameSamples * 2);
+        this.samples = new Int16Array(this.buffer, HEADER_BYTES);
+        this.filled = 0;
+    }
+
+    process(inputs) {
+        const input = inputs[0] && inputs[0][0];
+        if (!input) return true;
+
+        let offset = 0;
+        while (offset < input.length) {
+            // Timestamp of the frame's first sample
+            if (this.filled === 0) this.frameTime = currentTime + offset / sampleRate;
+            const count = Math.min(input.length - offset, this.frameSamples - this.filled);
+            for (let i = 0; i < count; i++) {
+                const s = input[offset + i];
+                this.samples[this.filled + i] = s < 0 ? Math.max(-32768, s * 32768) : Math.min(32767, s * 32767);
+            }
+            this.filled += count;
+            offset += count;
+
+            if (this.filled === this.frameSamples) {
+                const header = new DataView(this.buffer, 0, HEADER_BYTES);
+                header.setUint16(2, this.sequence, true);
+                header.setUint32(4, Math.round(this.frameTime * 1000) >>> 0, true);
+                this.sequence = (this.sequence + 1) & 0xffff;
+                // Transfer the buffer instead of copying it to the main thread
+                this.port.postMessage(this.buffer, [this.buffer]);
+                this.newFrame();
+            }
+        }
+        return true;
+    }
+}
+
+registerProcessor('capture-processor', CaptureProcessor);
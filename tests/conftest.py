@@ -0,0 +1,80 @@
+import pytest
+
+from common import business_logic
+from common.data_store import MockDataStore
+from common.sqlite_store import SQLiteDataStore
+
+
+def make_dataset(customers=5, appointments=3, orders=30):
+    """A small fixed dataset shaped like generate_mock_data()."""
+    customer_rows = [
+        {
+            "id": f"CUST{i:04d}",
+            "name": f"Customer {i}",
+            "phone": f"+1555{i:07d}",
+            "email": f"customer{i}@example.com",
+            "joined_date": "2024-01-01T09:00:00",
+        }
+        for i in range(customers)
+    ]
+    appointment_rows = [
+        {
+            "id": f"APT{i:04d}",
+            "customer_id": customer_rows[i % customers]["id"],
+            "customer_name": customer_rows[i % customers]["name"],
+            "date": f"2025-03-{i + 1:02d}T10:00:00",
+            "service": "Consultation",
+            "status": "Scheduled",
+        }
+        for i in range(appointments)
+    ]
+    order_rows = [
+        {
+            "id": f"ORD{i:04d}",
+            "customer_id": customer_rows[i % customers]["id"],
+            "customer_name": customer_rows[i % customers]["name"],
+            "date": f"2025-01-{i % 28 + 1:02d}T12:00:00",
+            "items": i % 5 + 1,
+            "total": 10.0 + i,
+            "status": ["Pending", "Shipped", "Delivered"][i % 3],
+        }
+        for i in range(orders)
+    ]
+    return {
+        "customers": customer_rows,
+        "appointments": appointment_rows,
+        "orders": order_rows,
+        "sample_data": [],
+    }
+
+
+def memory_store(tmp_path, data=None):
+    return MockDataStore(data or make_dataset())
+
+
+def columnar_store(tmp_path, data=None):
+    pytest.importorskip("numpy")
+    from common.columnar_store import ColumnarDataStore
+
+    return ColumnarDataStore.from_rows(data or make_dataset())
+
+
+def sqlite_store(tmp_path, data=None):
+    store = SQLiteDataStore(str(tmp_path / "business.db"), pool_size=1)
+    store.load_rows(data or make_dataset())
+    return store
+
+
+STORES = [memory_store, columnar_store, sqlite_store]
+
+
+@pytest.fixture
+def use_store(monkeypatch):
+    """Serve business_logic from the given store for one test."""
+
+    def use(store):
+        monkeypatch.setattr(business_logic, "_data_store", store)
+        monkeypatch.setattr(business_logic, "_customer_matcher", None)
+        return store
+
+    return use
@@ -0,0 +1,14 @@
+import json
+
+from common.agent_templates import AgentTemplates
+
+
+def test_settings_without_greeting_omit_the_key():
+    templates = AgentTemplates("deepgram", "aura-2-thalia-en", "")
+
+    with_greeting = json.loads(templates.settings_payload)["agent"]
+    without = json.loads(templates.settings_payload_without_greeting)["agent"]
+
+    assert with_greeting["greeting"] == templates.first_message
+    assert "greeting" not in without
+    assert without["think"] == with_greeting["think"]
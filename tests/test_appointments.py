@@ -0,0 +1,115 @@
+import asyncio
+import json
+
+import pytest
+
+from common import business_logic
+from common.slot_index import appointment_interval
+from common.sqlite_store import SQLiteDataStore
+from common.write_ahead_log import WriteAheadLog
+from tests.conftest import STORES, columnar_store, make_dataset, memory_store, sqlite_store
+
+BAD_DATES = ["tomorrow at 3pm", "bad", "2026-13-01T10:00:00", ""]
+
+
+def schedule(date, **fields):
+    return asyncio.run(
+        business_logic.schedule_appointment("CUST0001", date, "Consultation", **fields)
+    )
+
+
+@pytest.mark.parametrize("make_store", STORES)
+@pytest.mark.parametrize("date", BAD_DATES)
+def test_bad_date_returns_error_and_stores_nothing(make_store, date, tmp_path, use_store):
+    store = use_store(make_store(tmp_path))
+    before = len(store.get_appointments("CUST0001"))
+
+    result = schedule(date)
+
+    assert "error" in result
+    assert len(store.get_appointments("CUST0001")) == before
+    # The id a bad booking would have taken is still the next one handed out
+    assert schedule("2025-06-01T15:00:00")["id"] == "APT0003"
+
+
+@pytest.mark.parametrize("make_store", STORES)
+def test_bad_duration_returns_error(make_store, tmp_path, use_store):
+    use_store(make_store(tmp_path))
+    assert "error" in schedule("2025-06-01T15:00:00", duration_minutes=-30)
+    assert schedule("2025-06-01T15:00:00", duration_minutes=30)["id"] == "APT0003"
+
+
+@pytest.mark.parametrize("make_store", [memory_store, columnar_store])
+def test_bad_date_is_not_logged(make_store, tmp_path, use_store):
+    store = use_store(make_store(tmp_path))
+    log_path = tmp_path / "appointments.wal"
+    store.attach_log(WriteAheadLog(log_path))
+
+    assert "error" in schedule("tomorrow at 3pm")
+    booked = schedule("2025-06-01T15:00:00")
+
+    assert [record["id"] for record in WriteAheadLog(log_path).replay()] == [booked["id"]]
+
+
+@pytest.mark.parametrize("make_store", [memory_store, columnar_store])
+def test_replay_skips_invalid_logged_booking(make_store, tmp_path):
+    log_path = tmp_path / "appointments.wal"
+    good = {
+        "id": "APT0004",
+        "customer_id": "CUST0002",
+        "customer_name": "Customer 2",
+        "date": "2025-06-02T10:00:00",
+        "service": "Review",
+        "status": "Scheduled",
+    }
+    with open(log_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({**good, "id": "APT0003", "date": "tomorrow at 3pm"}) + "\n")
+        f.write(json.dumps(good) + "\n")
+
+    store = make_store(tmp_path)
+    assert store.attach_log(WriteAheadLog(log_path)) == 1
+
+    assert [a["id"] for a in store.get_appointments("CUST0002")][-1] == "APT0004"
+    fields = {key: value for key, value in good.items() if key != "id"}
+    assert store.book_appointment(fields)["id"] == "APT0005"
+
+
+def available(day):
+    return asyncio.run(
+        business_logic.get_available_appointment_slots(f"{day}T09:00:00", f"{day}T16:00:00")
+    )["available_slots"]
+
+
+@pytest.mark.parametrize("make_store", STORES)
+def test_booked_slot_is_taken(make_store, tmp_path, use_store):
+    use_store(make_store(tmp_path))
+    # Builds the slot index before the booking, which then has to update it
+    assert "2025-06-01T15:00:00" in available("2025-06-01")
+
+    schedule("2025-06-01T15:00:00")
+
+    assert "2025-06-01T15:00:00" not in available("2025-06-01")
+    assert "2025-06-01T14:00:00" in available("2025-06-01")
+
+
+def test_sqlite_sees_long_bookings_made_by_another_process(tmp_path):
+    # Two stores on one file stand in for two serve.py workers
+    sqlite_store(tmp_path)
+    worker_a = SQLiteDataStore(str(tmp_path / "business.db"), pool_size=1)
+    worker_b = SQLiteDataStore(str(tmp_path / "business.db"), pool_size=1)
+    booked = worker_b.book_appointment(
+        {
+            "customer_id": "CUST0001",
+            "customer_name": "Customer 1",
+            "date": "2025-06-01T09:00:00",
+            "service": "Consultation",
+            "status": "Scheduled",
+            "duration_minutes": 300,
+        }
+    )
+
+    # 13:00 is four hours into the five-hour booking made by the other worker
+    start, end = appointment_interval({"date": "2025-06-01T13:00:00"})
+    assert worker_a.booked_between(start, end)
+    assert not worker_a.slots.is_free(start, end)
+    assert booked["id"] == "APT0003"
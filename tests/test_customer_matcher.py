@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from common.agent_functions import FUNCTION_MAP
+from common.customer_matcher import EXACT, CustomerMatcher, read_digits
+from tests.conftest import make_dataset, memory_store
+
+
+@pytest.mark.parametrize(
+    "text, digits",
+    [
+        ("four two", "42"),
+        ("forty two", "42"),
+        ("forty", "40"),
+        ("twelve thirty four", "1234"),
+        ("double two", "22"),
+        ("four hundred and five", "405"),
+        ("four hundred forty two", "442"),
+        ("one eight hundred five five five one two one two", "18005551212"),
+        ("twenty oh five", "2005"),
+        ("CUST0042", "0042"),
+    ],
+)
+def test_read_digits(text, digits):
+    assert read_digits(text) == (digits, True)
+
+
+@pytest.mark.parametrize("text", ["two thousand", "eleven hundred", "a hundred and two"])
+def test_unread_number_words_are_reported(text):
+    assert read_digits(text)[1] is False
+
+
+@pytest.fixture
+def matcher():
+    return CustomerMatcher(make_dataset(customers=1300)["customers"])
+
+
+@pytest.mark.parametrize("heard", ["forty two", "four two", "CUST0042", "zero zero forty two"])
+def test_customer_id_number_words(matcher, heard):
+    [(row, score)] = matcher.match_customer_id(heard)
+    assert matcher.customers[row]["id"] == "CUST0042"
+    assert score == EXACT
+
+
+def test_teens_and_tens(matcher):
+    [(row, score)] = matcher.match_customer_id("twelve thirty four")
+    assert (matcher.customers[row]["id"], score) == ("CUST1234", EXACT)
+
+
+def test_partly_read_number_is_never_exact(matcher):
+    # "two thousand" reads as 2; CUST0002 exists but must not be an exact hit
+    [(row, score)] = matcher.match_customer_id("two thousand")
+    assert matcher.customers[row]["id"] == "CUST0002"
+    assert score < EXACT
+    # Nor does a matching name lift it to one
+    [(score, customer, fields)] = matcher.match(name="Customer 2", customer_id="two thousand")
+    assert customer["id"] == "CUST0002"
+    assert score < EXACT
+
+
+def test_find_customer_does_not_identify_on_a_partly_read_number(use_store):
+    use_store(memory_store(None, make_dataset(customers=50)))
+    find = FUNCTION_MAP["find_customer"]
+
+    assert asyncio.run(find({"customer_id": "forty two"}))["customer"]["id"] == "CUST0042"
+    result = asyncio.run(find({"customer_id": "two thousand"}))
+    assert "customer" not in result
+    assert result["candidates"][0]["customer"]["id"] == "CUST0002"
@@ -0,0 +1,37 @@
+import os
+
+from common.documentation import DocumentationCache
+
+
+def write(path, text, mtime_ns):
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_content_is_decoded_once_and_reloaded_on_change(tmp_path):
+    large = "# Streaming\n\n" + "word " * 300_000
+    write(tmp_path / "streaming.mdx", large, 1_000_000_000)
+    cache = DocumentationCache(str(tmp_path), recheck_interval=0)
+    cache.refresh()
+
+    first = cache["streaming"]
+    assert first == large
+    # Served from the cached str, not read and decoded again
+    assert cache["streaming"] is first
+
+    write(tmp_path / "streaming.mdx", "# Streaming\n\nchanged", 2_000_000_000)
+    assert cache.refresh()
+    assert cache["streaming"] == "# Streaming\n\nchanged"
+
+
+def test_removed_files_are_dropped(tmp_path):
+    write(tmp_path / "a.mdx", "alpha", 1_000_000_000)
+    write(tmp_path / "b.mdx", "beta", 1_000_000_000)
+    cache = DocumentationCache(str(tmp_path), recheck_interval=0)
+    cache.refresh()
+    version = cache.version
+
+    (tmp_path / "b.mdx").unlink()
+    assert cache.refresh()
+    assert list(cache) == ["a"]
+    assert cache.version == version + 1
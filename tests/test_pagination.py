@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from common import business_logic
+from common.agent_functions import FUNCTION_MAP
+from common.config import FUNCTION_RESPONSE
+from common.function_registry import ArgumentError
+from tests.conftest import STORES, make_dataset, sqlite_store
+
+# CUST0000 gets every other order: 20 orders, two pairs of them on the same date
+DATASET = dict(customers=2, appointments=6, orders=40)
+
+
+def call(name, **params):
+    return asyncio.run(FUNCTION_MAP[name]({"customer_id": "CUST0000", **params}))
+
+
+def all_pages(name, **params):
+    pages = [call(name, **params)]
+    while "next_cursor" in pages[-1]:
+        pages.append(call(name, cursor=pages[-1]["next_cursor"], **params))
+    return pages
+
+
+def newest_first(rows):
+    return sorted(rows, key=lambda row: (row["date"], row["id"]), reverse=True)
+
+
+@pytest.mark.parametrize("make_store", STORES)
+def test_pages_cover_every_order_once_newest_first(make_store, tmp_path, use_store):
+    data = make_dataset(**DATASET)
+    expected = newest_first([o for o in data["orders"] if o["customer_id"] == "CUST0000"])
+    use_store(make_store(tmp_path, data))
+
+    pages = all_pages("get_orders", limit=6)
+
+    assert [o["id"] for page in pages for o in page["orders"]] == [o["id"] for o in expected]
+    assert [page["returned"] for page in pages] == [6, 6, 6, 2]
+    assert [page.get("remaining") for page in pages] == [14, 8, 2, None]
+    assert all(page["total"] == 20 for page in pages)
+    summary = pages[0]["summary"]
+    assert sum(summary["by_status"].values()) == 20
+    assert summary["total_sum"] == round(sum(o["total"] for o in expected), 2)
+    assert summary["oldest_date"] == expected[-1]["date"]
+    assert summary["newest_date"] == expected[0]["date"]
+
+
+@pytest.mark.parametrize("make_store", STORES)
+def test_booking_between_pages_does_not_shift_them(make_store, tmp_path, use_store):
+    use_store(make_store(tmp_path, make_dataset(**DATASET)))
+    first = call("get_appointments", limit=2)
+    asyncio.run(
+        business_logic.schedule_appointment("CUST0000", "2025-12-01T10:00:00", "Consultation")
+    )
+
+    second = call("get_appointments", limit=2, cursor=first["next_cursor"])
+
+    # CUST0000 had APT0000, APT0002 and APT0004; the new booking is newer than all
+    assert [a["id"] for a in first["appointments"]] == ["APT0004", "APT0002"]
+    assert [a["id"] for a in second["appointments"]] == ["APT0000"]
+    assert second["total"] == 4
+
+
+@pytest.mark.parametrize("make_store", STORES)
+def test_byte_budget_ends_the_page_early(make_store, tmp_path, use_store, monkeypatch):
+    use_store(make_store(tmp_path, make_dataset(**DATASET)))
+    monkeypatch.setitem(FUNCTION_RESPONSE, "max_bytes", 300)
+
+    page = call("get_orders", limit=10, fields=["id", "date", "status"])
+
+    assert 1 <= page["returned"] < 10
+    assert set(page["orders"][0]) == {"id", "date", "status"}
+    assert page["remaining"] == 20 - page["returned"]
+    ids = [o["id"] for p in all_pages("get_orders", limit=10) for o in p["orders"]]
+    assert len(ids) == len(set(ids)) == 20
+
+
+def test_bad_cursor_and_fields_are_argument_errors(tmp_path, use_store):
+    use_store(sqlite_store(tmp_path, make_dataset(**DATASET)))
+    with pytest.raises(ArgumentError):
+        call("get_orders", cursor="not a cursor")
+    with pytest.raises(ArgumentError):
+        call("get_orders", fields=["id", "colour"])
+
+
+def test_sqlite_pages_with_the_index(tmp_path):
+    store = sqlite_store(tmp_path, make_dataset(**DATASET))
+    rows = store.get_orders_page("CUST0000", ("2025-01-10T12:00:00", "ORD0010"), 3)
+    assert [row["id"] for row in rows] == ["ORD0036", "ORD0008", "ORD0034"]
+
+    plan = store._connection().execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM orders WHERE customer_id = ? "
+        "AND (date, id) < (?, ?) ORDER BY date DESC, id DESC LIMIT 3",
+        ("CUST0000", "2025-01-10T12:00:00", "ORD0010"),
+    )
+    details = " ".join(row[3] for row in plan)
+    assert "orders_customer_date" in details
+    assert "TEMP B-TREE" not in details
@@ -0,0 +1,107 @@
+import asyncio
+
+from common.sticky_proxy import StickyProxy, worker_for
+
+
+async def _backend(index):
+    """A keep-alive HTTP server answering `worker<index> <path> <body>`."""
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                path = head.split(b" ")[1]
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                if b"transfer-encoding: chunked" in head.lower():
+                    body = await reader.readuntil(b"0\r\n\r\n")
+                else:
+                    body = await reader.readexactly(length)
+                reply = b"worker%d %s %s" % (index, path, body)
+                if b"chunked" in path:
+                    writer.write(
+                        b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+                        + b"%x\r\n%s\r\n0\r\n\r\n" % (len(reply), reply)
+                    )
+                else:
+                    writer.write(
+                        b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s" % (len(reply), reply)
+                    )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    if b"Transfer-Encoding: chunked" in head:
+        size = int(await reader.readuntil(b"\r\n"), 16)
+        body = await reader.readexactly(size)
+        await reader.readuntil(b"0\r\n\r\n")
+        return body
+    length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+    return await reader.readexactly(length)
+
+
+def _run_through_proxy(requests):
+    """Send `requests` on one client connection; return the response bodies."""
+
+    async def scenario():
+        backends = [await _backend(i) for i in range(2)]
+        proxy = StickyProxy([s.sockets[0].getsockname()[:2] for s in backends])
+        server = await asyncio.start_server(proxy.handle, "127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+        bodies = []
+        for request in requests:
+            writer.write(request)
+            bodies.append(await asyncio.wait_for(_read_response(reader), 5))
+        writer.close()
+        server.close()
+        for backend in backends:
+            backend.close()
+        return bodies
+
+    return asyncio.run(scenario())
+
+
+def test_worker_for():
+    assert worker_for(b"GET /socket.io/?EIO=4&transport=polling&sid=w1.abc HTTP/1.1", 2) == 1
+    assert worker_for(b"GET /socket.io/?EIO=4&transport=polling HTTP/1.1", 2) is None
+    # A sid naming a worker that doesn't exist is treated as a new session
+    assert worker_for(b"GET /?sid=w7.abc HTTP/1.1", 2) is None
+
+
+def test_each_keep_alive_request_is_routed_by_its_sid():
+    bodies = _run_through_proxy(
+        [
+            b"GET /?sid=w1.abc HTTP/1.1\r\nHost: x\r\n\r\n",
+            b"GET /?sid=w0.def HTTP/1.1\r\nHost: x\r\n\r\n",
+            b"GET /?sid=w1.abc HTTP/1.1\r\nHost: x\r\n\r\n",
+        ]
+    )
+    assert [body.split()[0] for body in bodies] == [b"worker1", b"worker0", b"worker1"]
+
+
+def test_new_sessions_take_turns():
+    bodies = _run_through_proxy(
+        [b"GET / HTTP/1.1\r\nHost: x\r\n\r\n", b"GET / HTTP/1.1\r\nHost: x\r\n\r\n"]
+    )
+    assert sorted(body.split()[0] for body in bodies) == [b"worker0", b"worker1"]
+
+
+def test_request_bodies_and_chunked_responses_are_relayed():
+    bodies = _run_through_proxy(
+        [
+            b"POST /?sid=w1.abc HTTP/1.1\r\nHost: x\r\nContent-Length: 5\r\n\r\nhello",
+            b"POST /?sid=w0.def HTTP/1.1\r\nHost: x\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n3\r\nabc\r\n0\r\n\r\n",
+            b"GET /chunked?sid=w1.abc HTTP/1.1\r\nHost: x\r\n\r\n",
+        ]
+    )
+    assert bodies[0] == b"worker1 /?sid=w1.abc hello"
+    assert bodies[1] == b"worker0 /?sid=w0.def 3\r\nabc\r\n0\r\n\r\n"
+    assert bodies[2] == b"worker1 /chunked?sid=w1.abc "
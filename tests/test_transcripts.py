@@ -0,0 +1,37 @@
+import json
+
+from common.transcripts import TranscriptStore
+
+
+def exported(store, session_id):
+    return [json.loads(line) for line in store.export(session_id)]
+
+
+def test_export_right_after_close_has_every_turn(tmp_path):
+    # A long flush interval keeps turns queued until export drains them
+    store = TranscriptStore(str(tmp_path), recent_turns=2, flush_interval=30)
+    transcript = store.open("session1")
+    for i in range(5):
+        transcript.add("user", f"turn {i}")
+    store.close(transcript)
+
+    turns = exported(store, "session1")
+
+    assert [turn["seq"] for turn in turns] == [1, 2, 3, 4, 5]
+    assert turns[-1]["content"] == "turn 4"
+
+
+def test_live_export_has_no_duplicates(tmp_path):
+    store = TranscriptStore(str(tmp_path), recent_turns=10, flush_interval=30)
+    transcript = store.open("session2")
+    for i in range(3):
+        transcript.add("assistant", f"turn {i}")
+    assert [turn["seq"] for turn in exported(store, "session2")] == [1, 2, 3]
+    transcript.add("user", "more")
+    assert [turn["seq"] for turn in exported(store, "session2")] == [1, 2, 3, 4]
+
+
+def test_unknown_and_invalid_sessions(tmp_path):
+    store = TranscriptStore(str(tmp_path))
+    assert store.export("nobody") is None
+    assert store.export("../etc/passwd") is None